@@ -20,11 +20,17 @@ import sys
 import os
 import subprocess
 import tempfile
-import threading
-import queue
+import time
 import json
 import re
+import string
 import platform
+import shutil
+import atexit
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
@@ -32,31 +38,37 @@ from typing import Optional, Dict, List, Tuple
 try:
     from PySide6.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-        QPushButton, QLabel, QTextEdit, QGroupBox, QMessageBox, QProgressBar,
+        QPushButton, QLabel, QPlainTextEdit, QGroupBox, QMessageBox, QProgressBar,
         QTabWidget, QComboBox, QCheckBox, QLineEdit, QFileDialog, QSplitter,
         QMenuBar, QMenu, QFontDialog, QDialog, QListWidget, QListWidgetItem,
         QDialogButtonBox, QSizePolicy
     )
-    from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QSettings
-    from PySide6.QtGui import QFont, QTextCursor, QColor, QPalette, QIcon, QPixmap
+    from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QSettings, QEvent, QRunnable, QThreadPool, QSocketNotifier, QProcess, QSaveFile, QBuffer, QIODevice
+    from PySide6.QtGui import QFont, QColor, QPalette, QIcon, QPixmap, QTextDocumentWriter
     QT_LIB = "PySide6"
 except ImportError:
     try:
         from PyQt6.QtWidgets import (
             QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-            QPushButton, QLabel, QTextEdit, QGroupBox, QMessageBox, QProgressBar,
+            QPushButton, QLabel, QPlainTextEdit, QGroupBox, QMessageBox, QProgressBar,
             QTabWidget, QComboBox, QCheckBox, QLineEdit, QFileDialog, QSplitter,
         QMenuBar, QMenu, QFontDialog, QDialog, QListWidget, QListWidgetItem,
         QDialogButtonBox, QSizePolicy
         )
-        from PyQt6.QtCore import Qt, QThread, pyqtSignal as Signal, QTimer, QSize, QSettings
-        from PyQt6.QtGui import QFont, QTextCursor, QColor, QPalette, QIcon, QPixmap
+        from PyQt6.QtCore import Qt, QThread, pyqtSignal as Signal, QTimer, QSize, QSettings, QEvent, QRunnable, QThreadPool, QSocketNotifier, QProcess, QSaveFile, QBuffer, QIODevice
+        from PyQt6.QtGui import QFont, QColor, QPalette, QIcon, QPixmap, QTextDocumentWriter
         QT_LIB = "PyQt6"
     except ImportError:
         print("Błąd: Wymagany PySide6 lub PyQt6")
         print("Zainstaluj: pip install PySide6")
         sys.exit(1)
 
+# Opcjonalnie: bindingi NVML (pakiet nvidia-ml-py) – odczyt parametrów GPU bez uruchamiania nvidia-smi
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
 
 # ============================================================================
 # KONFIGURACJA I ŚCIEŻKI
@@ -146,7 +158,13 @@ BUNDLE_DIR = Path(__file__).resolve().parent
 BACKUP_DIR = CACHE_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 MAX_BACKUPS = 10  # trzymaj tylko N najnowszych; starsze są usuwane przy nowym backupie
-HISTORY_FILE = CACHE_STATE_DIR / "install_history.json"
+HISTORY_FILE = CACHE_STATE_DIR / "install_history.jsonl"  # JSON Lines – jeden wpis na linię, tylko dopisywanie
+LEGACY_HISTORY_FILE = CACHE_STATE_DIR / "install_history.json"  # stary format (tablica), migrowany przy odczycie
+_SAVE_LOG_PREFIX = str(LOG_DIR) + os.sep + "log-"  # domyślna nazwa w „Zapisz logi”: prefiks + czas + ".txt"
+_SAVE_LOG_FILTER = "Text Files (*.txt);;All Files (*)"
+
+# Linie lsmod z modułami nvidia – jeden przebieg regex zamiast split + lower() na każdej linii
+_NVIDIA_LSMOD_RE = re.compile(r"^.*nvidia.*$", re.IGNORECASE | re.MULTILINE)
 
 # Tłumaczenia UI (język wybierany w menu Ustawienia → Język)
 TRANSLATIONS = {
@@ -318,6 +336,7 @@ TRANSLATIONS = {
         "log_settings_saved": "Ustawienia zapisane",
         "log_error_report_saved": "Raport błędu zapisany: {0}",
         "log_error_report_failed": "Nie można zapisać raportu błędu: {0}",
+        "log_file_write_failed": "Zapis do pliku logu nie powiódł się ({0}) – dalsze wpisy tylko w oknie",
         "log_sudo_ok": "✓ Uprawnienia sudo już aktywne (bez pytania o hasło)",
         "log_install_cancelled": "Instalacja anulowana - brak uprawnień sudo",
         "log_sudo_granted": "✓ Uprawnienia sudo uzyskane",
@@ -600,6 +619,7 @@ TRANSLATIONS = {
         "log_settings_saved": "Settings saved",
         "log_error_report_saved": "Error report saved: {0}",
         "log_error_report_failed": "Could not save error report: {0}",
+        "log_file_write_failed": "Writing to the log file failed ({0}) – further entries only in the window",
         "log_sudo_ok": "✓ Sudo privileges already active (no password prompt)",
         "log_install_cancelled": "Installation cancelled - no sudo privileges",
         "log_sudo_granted": "✓ Sudo privileges granted",
@@ -716,20 +736,23 @@ TRANSLATIONS = {
     },
 }
 
+# Płaskie tabele tłumaczeń: brakujące klucze uzupełnione z angielskiego raz przy imporcie (_tr = jedno .get)
+_TR_TABLES = {lang: {**TRANSLATIONS["en"], **table} for lang, table in TRANSLATIONS.items()}
+
 
 def _get_app_icon_path() -> Optional[Path]:
-    """Ścieżka do ikony aplikacji: app_icon.* (onefile) lub *_icon.png obok programu."""
+    """Ścieżka do ikony aplikacji: app_icon.* (onefile) lub *_icon.png obok programu – zawsze istniejący plik."""
     # Onefile: ikona dołączona przez Nuitka obok binarki (katalog tymczasowy lub katalog z exe)
     if getattr(sys, "frozen", False) or _is_onefile_tmp():
         exe_dir = Path(sys.executable).resolve().parent
         for ext in (".png", ".ico"):
             p = exe_dir / f"app_icon{ext}"
-            if p.exists():
+            if p.is_file():
                 return p
     # Ikona obok skryptu / w katalogu programu
     for name in ("app_icon.png", "app_icon.ico", "nvidia_driver_manager_icon.png"):
         p = SCRIPT_DIR / name
-        if p.exists():
+        if p.is_file():
             return p
     for p in SCRIPT_DIR.glob("*_icon.png"):
         if p.is_file():
@@ -760,13 +783,99 @@ NEW_FEATURE_VERSION = "590.48.01"
 BETA_VERSION = "575.54.14"
 LEGACY_VERSION = "470.256.02"
 
+# Etykiety kanałów sterownika .run (klucz jak w self.versions)
+_VERSION_LABELS = {
+    "production": "Production",
+    "new_feature": "New Feature",
+    "beta": "Beta",
+    "legacy": "Legacy",
+}
+
+
+# ESC [ ... (CSI, m.in. kolory SGR) oraz dwuznakowe sekwencje ESC
+_ANSI_RE = re.compile(r"\x1b(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
 
 def strip_ansi(text: str) -> str:
     """Usuwa kody ANSI (kolory/formatowanie) z tekstu – dla wyjścia inxi w skompilowanym programie (brak TTY)."""
-    if not text:
+    if not text or "\x1b" not in text:
         return text
-    # ESC [ ... m (SGR) oraz inne sekwencje CSI
-    return re.sub(r"\x1b\[[0-9;]*m", "", text)
+    return _ANSI_RE.sub("", text)
+
+
+def _write_fd(path, data: bytes, flags: int):
+    """Zapisuje gotowy rekord bajtów przez os.write (zwykle jedno wywołanie systemowe)."""
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _atomic_append(path, data: bytes):
+    """Dopisuje rekord na koniec pliku (O_APPEND – rekord nie przeplata się z innymi zapisami)."""
+    _write_fd(path, data, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+
+
+def _write_bytes(path, data: bytes):
+    """Zastępuje zawartość pliku jednym zapisem."""
+    _write_fd(path, data, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_ver(v: str) -> Tuple[int, ...]:
+    """Wersja sterownika "580.126.09" -> (580, 126, 9) do porównań; (0, 0, 0) gdy nie da się odczytać."""
+    try:
+        return tuple(int(x) for x in v.split(".")[:3])
+    except ValueError:
+        return (0, 0, 0)
+
+
+@functools.lru_cache(maxsize=1)
+def _kernel_release() -> str:
+    """Wersja działającego kernela (uname -r) – nie zmienia się do restartu, odczyt raz."""
+    try:
+        return os.uname().release
+    except (AttributeError, OSError):
+        return "unknown"
+
+
+@functools.lru_cache(maxsize=1)
+def _kernel_major() -> Optional[int]:
+    """Główny numer wersji kernela (np. 6) lub None, gdy nie da się odczytać."""
+    try:
+        return int(_kernel_release().split(".")[0])
+    except ValueError:
+        return None
+
+
+def _find_nvidia_modules(root: str) -> List[str]:
+    """Pliki nvidia.ko* w drzewie modułów kernela – iteracyjny os.scandir, bez katalogów i2c/forcedeth i dowiązań (build/source)."""
+    found = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name != "i2c" and "forcedeth" not in e.name:
+                        stack.append(e.path)
+                elif e.name.startswith("nvidia.ko"):
+                    found.append(e.path)
+    return sorted(found)
+
+
+def _unlink_quiet(path: str):
+    """Usuwa plik, ignorując błędy (np. sprzątanie w atexit)."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
 
 # ============================================================================
@@ -786,6 +895,19 @@ class SystemManager:
         self.current_driver = "brak"
         self._fedora_repo_version_cache = None  # po pierwszym wywołaniu: "" lub "570.144"
         self._dnf_cmd: Optional[str] = None  # "dnf5" lub "dnf" (Fedora)
+        # Wyniki sond zapamiętane do invalidate(): dystrybucja i GPU nie zmieniają się w trakcie sesji,
+        # sterownik – najwyżej po instalacji, więc krótki TTL
+        self._distro_detected = False
+        self._gpu_checked = False
+        self._driver_cache: Optional[Tuple[str, float]] = None  # (sterownik, time.monotonic())
+
+    DRIVER_TTL = 10.0  # s
+
+    def invalidate(self):
+        """Unieważnia zapamiętane wyniki sond (po instalacji i przy „Odśwież informacje”)."""
+        self._distro_detected = False
+        self._gpu_checked = False
+        self._driver_cache = None
 
     def get_dnf_cmd(self) -> str:
         """Na Fedorze zwraca dnf5 jeśli jest dostępny (szybszy), inaczej dnf."""
@@ -821,6 +943,9 @@ class SystemManager:
             self.distro_name = "Windows"
             self.distro_family = "windows"
             return
+        if self._distro_detected:
+            return
+        self._distro_detected = True
         
         try:
             with open("/etc/os-release", "r") as f:
@@ -849,6 +974,9 @@ class SystemManager:
             self.gpu_present = True
             self.gpu_model = "NVIDIA GeForce RTX 3060"
             return
+        if self._gpu_checked:
+            return
+        self._gpu_checked = True
         
         try:
             result = self.run_command(["lspci"], sudo=True)
@@ -876,7 +1004,15 @@ class SystemManager:
         self.gpu_model = ""
     
     def get_current_driver(self) -> str:
-        """Zwraca aktualnie zainstalowany sterownik"""
+        """Zwraca aktualnie zainstalowany sterownik (wynik ważny DRIVER_TTL s)."""
+        now = time.monotonic()
+        if self._driver_cache is not None and now - self._driver_cache[1] < self.DRIVER_TTL:
+            return self._driver_cache[0]
+        driver = self._probe_current_driver()
+        self._driver_cache = (driver, now)
+        return driver
+
+    def _probe_current_driver(self) -> str:
         if self.demo_mode:
             return "550.90.07"
         
@@ -898,8 +1034,10 @@ class SystemManager:
     
     def run_command(self, cmd: List[str], sudo: bool = False,
                     timeout: int = 300,
-                    sudo_password: Optional[str] = None) -> Tuple[int, str, str]:
-        """Wykonuje komendę systemową. Gdy sudo=True i podano sudo_password, używa sudo -S (stdin) – potrzebne m.in. przy sudo-rs, gdzie cache nie jest współdzielony z procesami potomnymi."""
+                    sudo_password: Optional[str] = None,
+                    input_text: Optional[str] = None) -> Tuple[int, str, str]:
+        """Wykonuje komendę systemową. Gdy sudo=True i podano sudo_password, używa sudo -S (stdin) – potrzebne m.in. przy sudo-rs, gdzie cache nie jest współdzielony z procesami potomnymi.
+        input_text: dane na stdin komendy (nie łączyć z sudo -S – stdin zajmuje wtedy hasło)."""
         if self.demo_mode:
             return (0, f"Komenda: {' '.join(cmd)}", "")
         
@@ -918,6 +1056,8 @@ class SystemManager:
             )
             if sudo and sudo_password is not None:
                 kwargs["input"] = (sudo_password + "\n")
+            elif input_text is not None:
+                kwargs["input"] = input_text
             process = subprocess.run(cmd, **kwargs)
             return (process.returncode, process.stdout or "", process.stderr or "")
         except subprocess.TimeoutExpired:
@@ -1062,10 +1202,7 @@ class SystemManager:
             if result[0] != 0:
                 missing.append("gcc")
             return missing
-        try:
-            kernel = os.uname().release
-        except Exception:
-            kernel = "unknown"
+        kernel = _kernel_release()
         result = self.run_command(["dpkg", "-l", f"linux-headers-{kernel}"], sudo=False)
         if result[0] != 0:
             missing.append(f"linux-headers-{kernel}")
@@ -1077,32 +1214,23 @@ class SystemManager:
             missing.append("build-essential")
         return missing
 
+    def query_installed_packages(self, pattern: str) -> List[str]:
+        """Zainstalowane pakiety pasujące do wzorca glob (filtr po nazwie w rpm/dpkg-query). Fedora: NEVRA, Debian: nazwy
+        z kwalifikatorem architektury, gdy potrzebny (np. libnvidia-gl-535:i386 – jak w dpkg -l)."""
+        if self.distro_family == "fedora":
+            result = self.run_command(["rpm", "-qa", pattern], sudo=False)
+            return result[1].split() if result[0] == 0 else []
+        # dpkg-query zwraca 1, gdy nic nie pasuje – wtedy po prostu pusta lista
+        result = self.run_command(["dpkg-query", "-W", "-f=${db:Status-Abbrev}${binary:Package}\n", pattern], sudo=False)
+        return [line[3:] for line in result[1].split("\n") if line.startswith("ii")]
+
     def get_installed_nvidia_packages(self) -> List[str]:
         """Zwraca listę zainstalowanych pakietów NVIDIA (do backupu)."""
         if self.demo_mode:
             return []
+        packages = self.query_installed_packages("*nvidia*")
         if self.distro_family == "fedora":
-            result = self.run_command(["rpm", "-qa"], sudo=False)
-            if result[0] != 0:
-                return []
-            packages = []
-            for line in result[1].split("\n"):
-                if line and ("nvidia" in line.lower() or "akmod-nvidia" in line):
-                    pkg = line.strip()
-                    if "nvidia-gpu-firmware" in pkg:
-                        continue
-                    packages.append(pkg)
-            return packages
-        result = self.run_command(["dpkg", "-l"], sudo=False)
-        if result[0] != 0:
-            return []
-        packages = []
-        for line in result[1].split("\n"):
-            if line.startswith("ii") and ("nvidia" in line.lower() or
-                                          "libnvidia" in line.lower() or
-                                          "linux-modules-nvidia" in line.lower()):
-                pkg = line.split()[1]
-                packages.append(pkg)
+            return [pkg for pkg in packages if "nvidia-gpu-firmware" not in pkg]
         return packages
 
     def get_installed_nvidia_driver_package(self) -> Optional[str]:
@@ -1114,13 +1242,8 @@ class SystemManager:
             if result[0] == 0 and result[1].strip():
                 return "akmod-nvidia"
             return None
-        result = self.run_command(["dpkg", "-l"], sudo=False)
-        if result[0] != 0:
-            return None
-        for line in result[1].split("\n"):
-            if line.startswith("ii") and "nvidia-driver-" in line and "-open" in line:
-                return line.split()[1]
-        return None
+        packages = self.query_installed_packages("nvidia-driver-*-open")
+        return packages[0] if packages else None
 
 
 # ============================================================================
@@ -1183,213 +1306,672 @@ class FetchFedoraRepoThread(QThread):
 
 
 # ============================================================================
-# WĄTEK INSTALACJI
+# WĄTEK WYKRYWANIA SYSTEMU (start i „Odśwież informacje”)
 # ============================================================================
 
-class InstallationThread(QThread):
-    """Wątek do wykonywania instalacji sterowników"""
-    output = Signal(str, str)  # (message, level)
-    finished = Signal(int)  # kod wyjścia
-    ask_restart = Signal()  # pyta o restart
-    progress = Signal(int)  # 0–100, szacowany postęp instalacji (testowo)
-    
-    def __init__(self, window, install_type: str, params: Dict):
+class SystemInfoThread(QThread):
+    """Wykrywa dystrybucję, GPU i sterownik oraz pobiera wersje .run/repo w tle – okno rysuje się od razu."""
+    info_ready = Signal(dict)
+
+    def __init__(self, system):
         super().__init__()
-        self.window = window
-        self.system = window.system
-        self.install_type = install_type
-        self.params = params
-        self.restart_needed = False
-    
-    def _ensure_dependencies(self):
-        """Sprawdza i doinstalowuje linux-headers, dkms, build-essential (Debian) lub kernel-devel, gcc (Fedora) przed instalacją repo/run."""
-        missing = self.system.get_missing_dependency_packages(self.install_type)
-        if not missing:
-            return True
-        self.log(self.window._tr("log_installing_deps").format(", ".join(missing)), "INFO")
-        if self.system.distro_family == "fedora":
-            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + missing, sudo=True, silent=True)
-        else:
-            rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
-            if rc != 0:
-                self.log(self.window._tr("log_update_repo_failed"), "WARN")
-            rc, _ = self.run_cmd(["apt-get", "install", "-y"] + missing, sudo=True, silent=True)
-        if rc != 0:
-            self.log(self.window._tr("log_install_deps_failed"), "ERROR")
-            return False
-        self.log(self.window._tr("log_deps_installed"), "SUCCESS")
-        return True
+        self.system = system
 
-    def install_uninstall(self):
-        """Usuwa sterownik NVIDIA i przywraca nouveau (bez instalacji NVK)."""
-        if self.system.demo_mode:
-            self.output.emit(self.window._tr("log_linux_only_short"), "WARN")
-            self.finished.emit(0)
-            return
-        self.log(self.window._tr("log_remove_nvidia_header"), "INFO")
-        self.progress.emit(15)
-        self.log(self.window._tr("log_cleaning_nvidia"), "INFO")
-        self.clean_nvidia_artifacts()
-        self.purge_nvidia_packages()
-        self.remove_dkms_modules()
-        self.remove_nvidia_configs()
-        self.remove_nvidia_libraries()
-        self.progress.emit(50)
-        if not self.verify_nvidia_removal():
-            self.log(self.window._tr("log_nvidia_libs_visible"), "WARN")
-        self.log(self.window._tr("log_config_nouveau"), "INFO")
-        self.configure_nouveau_for_nvk()
-        self.rebuild_initramfs()
-        self.progress.emit(100)
-        self.log(self.window._tr("log_nvidia_removed"), "SUCCESS")
-        self.restart_needed = True
-        self.ask_restart.emit()
-        self.finished.emit(0)
+    def run(self):
+        system = self.system
+        system.detect_distro()
+        system.check_gpu()
+        info = {
+            "driver": system.get_current_driver(),
+            "versions": system.fetch_versions(),
+            "repo_ver": None,
+            "repo_latest": None,
+        }
+        # Fedora: dnf bywa wolny – wersję repo pobiera osobno FetchFedoraRepoThread
+        if system.distro_family != "fedora":
+            info["repo_ver"] = system.highest_repo_driver()
+            info["repo_latest"] = system.highest_repo_driver_latest()
+        self.info_ready.emit(info)
 
-    def install_upgrade_repo(self):
-        """Aktualizuje sterownik NVIDIA z repo (apt/dnf update + upgrade pakietu)."""
-        if self.system.demo_mode:
-            self.output.emit(self.window._tr("log_linux_only_short"), "WARN")
-            self.finished.emit(0)
-            return
-        pkg = self.system.get_installed_nvidia_driver_package()
-        if not pkg:
-            self.log(self.window._tr("log_no_driver_repo"), "WARN")
-            self.finished.emit(0)
-            return
-        self.log(self.window._tr("log_updating_repo_pkg").format(pkg), "INFO")
-        self.progress.emit(20)
-        self._ensure_network()
-        if self.system.distro_family == "fedora":
-            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "upgrade", "-y", pkg], sudo=True, silent=True)
-        else:
-            rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
-            if rc != 0:
-                self.log(self.window._tr("log_update_repo_failed"), "ERROR")
-                self.finished.emit(1)
-                return
-            rc, _ = self.run_cmd(["apt-get", "install", "--only-upgrade", "-y", pkg], sudo=True, silent=True)
-        if rc == 0:
-            self.progress.emit(100)
-            self.log(self.window._tr("log_driver_updated").format(pkg), "SUCCESS")
-            self.restart_needed = True
-            self.ask_restart.emit()
-            self.finished.emit(0)
-        else:
-            self.log(self.window._tr("log_update_failed"), "ERROR")
-            self.finished.emit(1)
+
+# ============================================================================
+# WĄTEK OCZEKIWANIA NA SUDO (fallback z terminalem)
+# ============================================================================
+
+class SudoPollerThread(QThread):
+    """Co 1,5 s sprawdza `sudo -n true` poza wątkiem GUI; sudo_ready gdy użytkownik poda hasło w terminalu."""
+    sudo_ready = Signal()
+
+    POLL_MS = 1500
+
+    def __init__(self):
+        super().__init__()
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
 
     def run(self):
-        """Główna metoda wątku"""
-        try:
-            if self.install_type == "nvk":
-                self.install_nvk()
-            elif self.install_type == "uninstall":
-                self.install_uninstall()
-            elif self.install_type == "repo":
-                if not self._ensure_dependencies():
-                    self.finished.emit(1)
-                    return
-                self.install_repo()
-            elif self.install_type == "run":
-                if not self._ensure_dependencies():
-                    self.finished.emit(1)
-                    return
-                self.install_nvidia_run()
-            elif self.install_type == "upgrade_repo":
-                self.install_upgrade_repo()
-            else:
-                self.output.emit(self.window._tr("log_unknown_install"), "ERROR")
-                self.finished.emit(1)
-        except Exception as e:
-            self.output.emit(self.window._tr("log_error_exception").format(str(e)), "ERROR")
-            
-            # Zbierz szczegółowy raport błędu
+        while not self._stop:
             try:
-                report = self.window.collect_error_report(str(e), f"InstallationThread: {self.install_type}")
-                error_file = self.window.save_error_report(report)
-                if error_file:
-                    self.output.emit(self.window._tr("log_error_report_saved").format(error_file), "INFO")
-            except:
+                r = subprocess.run(["sudo", "-n", "true"], capture_output=True, timeout=5)
+                if r.returncode == 0:
+                    self.sudo_ready.emit()
+                    return
+            except (subprocess.TimeoutExpired, OSError):
                 pass
-            
-            self.finished.emit(1)
-    
-    def log(self, message: str, level: str = "INFO"):
-        """Wysyła wiadomość do głównego okna"""
-        self.output.emit(message, level)
+            # krótkie kroki – stop() działa od razu, a nie po całym interwale
+            for _ in range(self.POLL_MS // 100):
+                if self._stop:
+                    return
+                self.msleep(100)
 
-    def _ensure_network(self):
-        """Sprawdza sieć (jak ensure_network w driver-manager-v2.sh) – tylko ostrzeżenie."""
-        rc, _ = self.run_cmd(["ping", "-c", "1", "-W", "2", "8.8.8.8"], sudo=False, silent=True, timeout=5)
-        if rc != 0:
-            self.log(self.window._tr("log_no_network"), "WARN")
 
-    def _check_secure_boot(self):
-        """Ostrzeżenie jeśli Secure Boot włączony (jak check_secure_boot w .sh)."""
-        rc, out = self.run_cmd(["mokutil", "--sb-state"], sudo=False, silent=True, timeout=5)
-        if rc == 0 and out and "enabled" in (out or "").lower():
-            self.log(self.window._tr("log_secure_boot"), "WARN")
-            self.log(self.window._tr("log_secure_boot_advice"), "WARN")
-    
-    def _ensure_build_requirements(self) -> bool:
-        """Sprawdza dkms, linux-headers, build-essential (Debian) lub kernel-devel, gcc (Fedora); doinstalowuje brakujące. Zwraca True jeśli ok."""
-        if self.system.distro_family == "fedora":
-            to_install = []
-            rc, _ = self.run_cmd(["rpm", "-q", "kernel-devel"], sudo=False, silent=True)
-            if rc != 0:
-                to_install.append("kernel-devel")
-            rc, _ = self.run_cmd(["rpm", "-q", "gcc"], sudo=False, silent=True)
-            if rc != 0:
-                to_install.append("gcc")
-            if not to_install:
-                return True
-            self.log(self.window._tr("log_installing_missing").format(", ".join(to_install)), "INFO")
-            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + to_install, sudo=True, silent=True, timeout=300)
-            if rc != 0:
-                self.log(self.window._tr("log_deps_install_failed"), "ERROR")
-                return False
-            self.log(self.window._tr("log_deps_install_ok"), "SUCCESS")
-            return True
-        try:
-            kernel = os.uname().release
-        except Exception:
-            kernel = "unknown"
-        to_install = []
-        rc, _ = self.run_cmd(["which", "dkms"], sudo=False, silent=True)
-        if rc != 0:
-            to_install.append("dkms")
-        rc, _ = self.run_cmd(["dpkg", "-l", f"linux-headers-{kernel}"], sudo=False, silent=True)
-        if rc != 0:
-            to_install.append(f"linux-headers-{kernel}")
-        rc, _ = self.run_cmd(["dpkg", "-l", "build-essential"], sudo=False, silent=True)
-        if rc != 0:
-            to_install.append("build-essential")
-        if not to_install:
-            return True
-        self.log(self.window._tr("log_installing_missing").format(", ".join(to_install)), "INFO")
-        rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True, timeout=120)
-        if rc != 0:
-            self.log(self.window._tr("log_update_repo_failed"), "ERROR")
-            return False
-        rc, _ = self.run_cmd(["apt-get", "install", "-y"] + to_install, sudo=True, silent=True, timeout=300)
-        if rc != 0:
-            self.log(self.window._tr("log_deps_install_failed"), "ERROR")
-            return False
-        self.log(self.window._tr("log_deps_install_ok"), "SUCCESS")
-        return True
-    
-    def run_cmd(self, cmd: List[str], sudo: bool = False, 
-                timeout: int = 300, silent: bool = False,
-                ignore_missing_unit: bool = False,
-                ignore_stderr_contains: Optional[str] = None) -> Tuple[int, str]:
-        """Wykonuje komendę i loguje wynik.
-        ignore_missing_unit: nie traktuj jako błąd gdy systemctl zwraca „unit not loaded”/„does not exist”.
-        ignore_stderr_contains: nie traktuj jako błąd gdy stderr zawiera ten tekst (np. DKMS „not located in the DKMS tree”)."""
-        sudo_password = self.params.get("sudo_password")
-        result = self.system.run_command(cmd, sudo=sudo, timeout=timeout, sudo_password=sudo_password)
-        rc, stdout, stderr = result[0], result[1], result[2] or ""
-        
+# ============================================================================
+# SZABLONY SKRYPTÓW INSTALACJI .run (parsowane raz przy imporcie)
+# ============================================================================
+
+class _BashTemplate(string.Template):
+    """Szablon ze znacznikiem @{nazwa} – w bashu $ i klamry są wszędzie; dosłowne @ zapisujemy jako @@."""
+    delimiter = "@"
+
+
+# Fedora: .run bez --dkms (instalator buduje moduł sam), potem dracut
+_FEDORA_SCRIPT_TMPL = _BashTemplate("""#!/bin/bash
+set -o pipefail
+
+RUN_FILE="@{run_file}"
+VERSION="@{version}"
+LABEL="@{label}"
+LOG_FILE="@{log_file}"
+kernel_ver=$(uname -r)
+
+mkdir -p "${LOG_FILE%/*}" || true
+# Log otwierany raz (fd 3) – bez ponownego open() przy każdej linii
+{ exec 3>>"$LOG_FILE"; } 2>/dev/null || exec 3>/dev/null
+
+log() {
+  local full_msg
+  printf -v full_msg '[%(%Y-%m-%d %H:%M:%S)T] %s' -1 "$1"
+  printf '%s\\n' "$full_msg" >&3
+  printf '%s\\n' "$full_msg"
+}
+
+log "========================================="
+log "NVIDIA DRIVER INSTALLATION (Fedora)"
+log "========================================="
+log "Wersja: $VERSION ($LABEL)"
+log ""
+
+if [ ! -f "$RUN_FILE" ]; then
+  log "BŁĄD: Plik .run nie istnieje: $RUN_FILE"
+  exit 1
+fi
+
+systemctl disable nvidia-run-install.service 2>/dev/null || true
+
+log "FAZA 1: Przygotowanie..."
+log_command() {
+  log "Wykonuję: $*"
+  "$@@" >&3 2>&1
+  local rc=$?
+  [ $rc -ne 0 ] && log "BŁĄD (kod $rc): $*"
+  return $rc
+}
+
+log_command rm -f /etc/modprobe.d/blacklist-nouveau.conf /etc/modprobe.d/nvidia*.conf
+for dm in sddm gdm lightdm; do log_command systemctl stop $dm 2>/dev/null || true; done
+log_command modprobe -r nouveau 2>/dev/null || true
+
+log ""
+log "FAZA 2: Instalator NVIDIA (bez DKMS – budowa modułu wewnętrzna)..."
+log_command "$RUN_FILE" --silent --no-questions --accept-license --disable-nouveau --run-nvidia-xconfig
+install_exit=$?
+log "Instalator zakończony z kodem: $install_exit"
+
+log_command depmod -a
+
+log ""
+log "FAZA 3: Konfiguracja..."
+log_command bash -c 'echo "options nvidia-drm modeset=1 fbdev=1" | tee /etc/modprobe.d/nvidia-drm.conf > /dev/null'
+log_command bash -c 'echo -e "blacklist nouveau\\noptions nouveau modeset=0" | tee /etc/modprobe.d/blacklist-nouveau.conf > /dev/null'
+
+log "Aktualizacja initramfs (dracut)..."
+log_command dracut --force
+
+nvidia_modules=$(find "/lib/modules/$kernel_ver" -name "nvidia.ko*" ! -path "*i2c*" ! -path "*forcedeth*" ! -path "*typec*" ! -path "*hid*" -print -quit 2>/dev/null)
+if [ -z "$nvidia_modules" ]; then
+  log "BŁĄD: Moduły NVIDIA nie są w kernelu"
+  exit 1
+fi
+log "SUKCES: Moduły w: $nvidia_modules"
+
+if [ -f /etc/X11/xorg.conf ]; then
+  log_command cp /etc/X11/xorg.conf /etc/X11/xorg.conf.nvidia-boot-backup
+  log_command rm -f /etc/X11/xorg.conf
+fi
+
+log_command systemctl disable nvidia-run-install.service 2>/dev/null || true
+log "Restart za 5 sekund..."
+sleep 5
+reboot
+""")
+
+# Debian/Ubuntu: pełny skrypt 5-fazowy z DKMS
+_DEBIAN_SCRIPT_TMPL = _BashTemplate("""#!/bin/bash
+set -o pipefail
+
+RUN_FILE="@{run_file}"
+VERSION="@{version}"
+LABEL="@{label}"
+LOG_FILE="@{log_file}"
+kernel_ver=$(uname -r)
+
+mkdir -p "${LOG_FILE%/*}" || true
+# Log otwierany raz (fd 3) – bez ponownego open() przy każdej linii
+{ exec 3>>"$LOG_FILE"; } 2>/dev/null || exec 3>/dev/null
+
+log() {
+  local full_msg
+  printf -v full_msg '[%(%Y-%m-%d %H:%M:%S)T] %s' -1 "$1"
+  printf '%s\\n' "$full_msg" >&3
+  printf '%s\\n' "$full_msg"
+}
+
+log "========================================="
+log "NVIDIA DRIVER INSTALLATION v2"
+log "========================================="
+log "Wersja: $VERSION ($LABEL)"
+log "Plik: $RUN_FILE"
+log ""
+
+if [ ! -f "$RUN_FILE" ]; then
+  log "BŁĄD: Plik .run nie istnieje: $RUN_FILE"
+  exit 1
+fi
+
+# Od razu wyłącz serwis, żeby przy następnym starcie nie uruchomił się ponownie (zapobiega zapętleniu)
+log "Wyłączanie serwisu nvidia-run-install (jednorazowe uruchomienie)..."
+systemctl disable nvidia-run-install.service 2>/dev/null || true
+
+# FAZA 1: Przygotowanie
+log "FAZA 1: Przygotowanie systemu..."
+log_command() {
+  log "Wykonuję: $*"
+  local output
+  output=$("$@@" >&3 2>&1)
+  local rc=$?
+  if [ $rc -ne 0 ]; then
+    log "BŁĄD (kod $rc): $*"
+    [ -n "$output" ] && echo "$output" | while IFS= read -r line; do
+      if ! echo "$line" | LC_ALL=C grep -qE "Unit.*not loaded|Unit.*does not exist"; then
+        log "  $line"
+      fi
+    done
+    return $rc
+  fi
+  return 0
+}
+
+log_command rm -f /etc/modprobe.d/blacklist-nouveau.conf /etc/modprobe.d/nvidia*.conf
+log_command sh -c 'systemctl stop display-manager 2>/dev/null || true'
+for dm in sddm gdm3 gdm lightdm; do
+  log_command sh -c "systemctl stop $dm 2>/dev/null || true"
+done
+log_command sh -c 'modprobe -r nouveau 2>/dev/null || true'
+
+# FAZA 2: Instalacja
+log ""
+log "FAZA 2: Uruchamianie instalatora NVIDIA..."
+log_command "$RUN_FILE" --silent --no-questions --accept-license --dkms --disable-nouveau --run-nvidia-xconfig
+install_exit=$?
+log "Instalator zakończony z kodem: $install_exit"
+
+# FAZA 3: Weryfikacja i naprawa
+log ""
+log "FAZA 3: Weryfikacja instalacji..."
+
+if [ ! -d "/usr/src/nvidia-$VERSION" ]; then
+  log "Źródła nie są w /usr/src - wyodrębnianie..."
+  extract_dir=$(mktemp -d)
+  if "$RUN_FILE" --extract-only --target "$extract_dir" >&3 2>&1; then
+    if [ -f "$extract_dir/kernel-open/dkms.conf" ]; then
+      log "Kopiowanie źródeł do /usr/src/nvidia-$VERSION..."
+      log_command mkdir -p "/usr/src/nvidia-$VERSION"
+      log_command cp -r "$extract_dir/kernel-open"/* "/usr/src/nvidia-$VERSION/"
+      log_command rm -rf "$extract_dir"
+      if ! dkms status 2>/dev/null | LC_ALL=C grep -Fq "nvidia/$VERSION"; then
+        log "Rejestrowanie w DKMS..."
+        log_command dkms add "/usr/src/nvidia-$VERSION"
+      fi
+    fi
+  fi
+fi
+
+dkms_status=$(dkms status 2>/dev/null | LC_ALL=C grep -F -m 1 nvidia)
+if [ -z "$dkms_status" ]; then
+  log "BŁĄD: Moduły nie są zarejestrowane w DKMS"
+  log "Instalacja nie powiodła się"
+  exit 1
+fi
+
+log "DKMS status: $dkms_status"
+read -r _ dkms_ver _ <<<"$dkms_status"
+dkms_ver=${dkms_ver%%,*}
+
+log "Sprawdzanie czy moduły są zbudowane..."
+dkms_built=0
+if [ -d "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver" ]; then
+  arch=$(uname -m)
+  if [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/$arch/module/nvidia.ko" ] || \\
+     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/$arch/module/nvidia.ko.xz" ] || \\
+     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/x86_64/module/nvidia.ko" ] || \\
+     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/x86_64/module/nvidia.ko.xz" ]; then
+    dkms_built=1
+    log "Moduły są zbudowane w DKMS"
+  fi
+fi
+
+nvidia_modules=$(find "/lib/modules/$kernel_ver" -name "nvidia.ko*" ! -path "*i2c*" ! -path "*forcedeth*" ! -path "*typec*" ! -path "*hid*" -print -quit 2>/dev/null)
+if [ -z "$nvidia_modules" ]; then
+  log "Moduły NIE są w kernelu - wymuszam budowanie..."
+  if [ $dkms_built -eq 0 ]; then
+    log "Budowanie modułów przez DKMS..."
+    log_command dkms build "nvidia/$dkms_ver" -k "$kernel_ver"
+    build_rc=$?
+    if [ $build_rc -ne 0 ]; then
+      log "BŁĄD podczas budowania modułów (kod: $build_rc)"
+      log "Sprawdź czy linux-headers-$kernel_ver są zainstalowane"
+      exit 1
+    fi
+  fi
+  log "Instalowanie modułów do kernela..."
+  log_command dkms install "nvidia/$dkms_ver" -k "$kernel_ver"
+  install_rc=$?
+  if [ $install_rc -ne 0 ]; then
+    log "BŁĄD podczas instalacji modułów (kod: $install_rc)"
+    exit 1
+  fi
+  sleep 2
+  nvidia_modules=$(find "/lib/modules/$kernel_ver" -name "nvidia.ko*" ! -path "*i2c*" ! -path "*forcedeth*" ! -path "*typec*" ! -path "*hid*" -print -quit 2>/dev/null)
+  if [ -z "$nvidia_modules" ]; then
+    log "BŁĄD: Moduły nadal nie są w kernelu po instalacji DKMS"
+    exit 1
+  fi
+fi
+
+log "Moduły są w kernelu: $nvidia_modules"
+
+# FAZA 4: Konfiguracja
+log ""
+log "FAZA 4: Konfiguracja systemu..."
+log_command bash -c 'echo "options nvidia-drm modeset=1 fbdev=1" | tee /etc/modprobe.d/nvidia-drm.conf > /dev/null'
+
+# Blokowanie nouveau na kolejny start (w FAZIE 1 usunęliśmy blacklist; teraz go przywracamy)
+log "Blokowanie nouveau na kolejny start..."
+log_command bash -c 'echo -e "blacklist nouveau\\noptions nouveau modeset=0" | tee /etc/modprobe.d/blacklist-nouveau.conf > /dev/null'
+
+log "Aktualizacja initramfs..."
+if [ -f /etc/initramfs-tools/modules ]; then
+  sed -i '/^nouveau$/d' /etc/initramfs-tools/modules 2>/dev/null || true
+  for mod in nvidia nvidia_drm nvidia_modeset nvidia_uvm; do
+    if ! LC_ALL=C grep -Fxq -m 1 "$mod" /etc/initramfs-tools/modules 2>/dev/null; then
+      echo "$mod" >> /etc/initramfs-tools/modules
+    fi
+  done
+fi
+log_command update-initramfs -u -k all >/dev/null 2>&1 || true
+
+# FAZA 5: Weryfikacja końcowa
+log ""
+log "FAZA 5: Weryfikacja końcowa..."
+final_modules=$(find "/lib/modules/$kernel_ver" -name "nvidia.ko*" ! -path "*i2c*" ! -path "*forcedeth*" ! -path "*typec*" ! -path "*hid*" -print -quit 2>/dev/null)
+if [ -n "$final_modules" ]; then
+  log "SUKCES: Moduły NVIDIA są zainstalowane"
+  log "Lokalizacja: $final_modules"
+else
+  log "BŁĄD: Moduły NVIDIA nie są zainstalowane"
+  exit 1
+fi
+
+log ""
+log "========================================="
+log "INSTALACJA ZAKOŃCZONA POMYŚLNIE"
+log "========================================="
+log ""
+
+# xorg.conf z --run-nvidia-xconfig powstał przy starcie (bez monitora) i wymusza niską rozdzielczość.
+# Usuwamy go, żeby po restarcie X/Wayland wykrył monitor i ustawił natywną rozdzielczość.
+if [ -f /etc/X11/xorg.conf ]; then
+  log "Kopia xorg.conf -> xorg.conf.nvidia-boot-backup (przywróć ręcznie jeśli potrzeba)"
+  log_command cp /etc/X11/xorg.conf /etc/X11/xorg.conf.nvidia-boot-backup
+  log_command rm -f /etc/X11/xorg.conf
+  log "Usunięto xorg.conf – po restarcie rozdzielczość będzie wykryta automatycznie."
+fi
+
+log_command sh -c 'systemctl disable nvidia-run-install.service 2>/dev/null || true'
+log "Restart systemu za 5 sekund..."
+sleep 5
+reboot
+""")
+
+
+# ============================================================================
+# ZADANIA W TLE (QThreadPool): RAPORT BŁĘDU, DIAGNOSTYKA, PORZĄDKOWANIE BACKUPÓW, ZAPIS LOGU
+# ============================================================================
+
+class _ErrorReportRunnable(QRunnable):
+    """Zbiera i zapisuje raport błędu poza wątkiem GUI (dkms/lsmod + zapis JSON); wynik sygnałem okna."""
+    
+    def __init__(self, window, message: str):
+        super().__init__()
+        self._window = window
+        self._message = message
+    
+    def run(self):
+        try:
+            report = self._window.collect_error_report(self._message, "Log error")
+            path = self._window._write_error_report(report)
+        except Exception as e:
+            self._window.error_report_saved.emit("", str(e))
+            return
+        self._window.error_report_saved.emit(path, "")
+
+
+class _DiagnosticRunnable(QRunnable):
+    """Ręczna diagnostyka (dkms, skan modułów, /proc/modules) poza wątkiem GUI; wynik sygnałem okna."""
+    
+    def __init__(self, window, path: str):
+        super().__init__()
+        self._window = window
+        self._path = path
+    
+    def run(self):
+        try:
+            self._window._write_diagnostic(self._path)
+        except Exception as e:
+            self._window.diagnostic_done.emit(self._path, str(e))
+            return
+        self._window.diagnostic_done.emit(self._path, "")
+
+
+class _PruneBackupsRunnable(QRunnable):
+    """Usuwa backupy ponad MAX_BACKUPS (najstarsze) poza wątkiem GUI; nazwy usuniętych – sygnałem okna."""
+    
+    def __init__(self, window):
+        super().__init__()
+        self._window = window
+    
+    def run(self):
+        try:
+            with os.scandir(BACKUP_DIR) as it:
+                # backup-RRRRMMDD-GGMMSS.json – kolejność nazw = kolejność utworzenia
+                names = sorted(e.name for e in it if e.name.startswith("backup-") and e.name.endswith(".json"))
+        except OSError:
+            return
+        removed = []
+        for name in names[: max(0, len(names) - MAX_BACKUPS)]:
+            try:
+                os.unlink(os.path.join(BACKUP_DIR, name))
+                removed.append(name)
+            except OSError:
+                pass
+        if removed:
+            self._window.backups_pruned.emit(removed)
+
+
+class _SaveLogRunnable(QRunnable):
+    """Zapisuje gotowy tekst logu (QByteArray) przez QSaveFile poza wątkiem GUI; wynik sygnałem okna."""
+    
+    def __init__(self, window, path: str, data):
+        super().__init__()
+        self._window = window
+        self._path = path
+        self._data = data
+    
+    def run(self):
+        sf = QSaveFile(self._path)  # zapis do pliku tymczasowego, commit() podmienia plik atomowo
+        if not sf.open(QIODevice.OpenModeFlag.WriteOnly):
+            self._window.log_saved.emit(self._path, sf.errorString())
+            return
+        if sf.write(self._data) != len(self._data) or not sf.commit():
+            error = sf.errorString()
+            sf.cancelWriting()
+            self._window.log_saved.emit(self._path, error)
+            return
+        self._window.log_saved.emit(self._path, "")
+
+
+# ============================================================================
+# WĄTEK INSTALACJI
+# ============================================================================
+
+class InstallationThread(QThread):
+    """Wątek do wykonywania instalacji sterowników"""
+    output = Signal(str, str)  # (message, level)
+    finished = Signal(int)  # kod wyjścia
+    ask_restart = Signal()  # pyta o restart
+    progress = Signal(int)  # 0–100, szacowany postęp instalacji (testowo)
+
+    # Reinstalacja środowiska graficznego przy NVK: (prefiks nazwy pakietu, pakiety); pierwsze trafienie wygrywa
+    _DE_TABLE = {
+        "fedora": (
+            ("plasma-workspace", ("sddm", "plasma-workspace", "kwin-wayland", "qt6-qtbase", "qt6-qtwayland")),
+            ("cinnamon", ("cinnamon", "cinnamon-desktop-environment", "qt6-qtbase", "qt6-qtwayland")),
+            ("mate-desktop", ("mate-desktop-environment", "qt6-qtbase", "qt6-qtwayland")),
+            ("xfce4-session", ("xfce4-session", "qt6-qtbase", "qt6-qtwayland")),
+            ("gnome-shell", ("gnome-shell", "gnome-session", "qt6-qtbase", "qt6-qtwayland")),
+        ),
+        "debian": (
+            ("plasma-workspace", ("sddm", "plasma-workspace", "kwin-wayland", "libqt6opengl6", "qt6-qpa-plugins")),
+            ("cinnamon", ("cinnamon", "cinnamon-desktop-environment", "libqt6opengl6", "qt6-qpa-plugins")),
+            ("mate-desktop", ("mate-desktop-environment", "mate-desktop-environment-core",
+                              "libqt6opengl6", "qt6-qpa-plugins")),
+            ("xfce4", ("xfce4", "xfce4-session", "libqt6opengl6", "qt6-qpa-plugins")),
+            ("gnome-shell", ("gnome-shell", "gnome-session", "libqt6opengl6", "qt6-qpa-plugins")),
+        ),
+    }
+    _MESA_REINSTALL = {
+        "fedora": ("mesa-dri-drivers", "mesa-libEGL", "mesa-libGL"),
+        "debian": ("libgl1-mesa-dri", "libegl-mesa0", "libgles2", "libglx-mesa0"),
+    }
+    
+    def __init__(self, window, install_type: str, params: Dict):
+        super().__init__()
+        self.window = window
+        self.system = window.system
+        self.install_type = install_type
+        self.params = params
+        self.restart_needed = False
+    
+    def _ensure_dependencies(self):
+        """Sprawdza i doinstalowuje linux-headers, dkms, build-essential (Debian) lub kernel-devel, gcc (Fedora) przed instalacją repo/run."""
+        missing = self.system.get_missing_dependency_packages(self.install_type)
+        if not missing:
+            return True
+        self.log(self.window._tr("log_installing_deps").format(", ".join(missing)), "INFO")
+        if self.system.distro_family == "fedora":
+            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + missing, sudo=True, silent=True)
+        else:
+            rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
+            if rc != 0:
+                self.log(self.window._tr("log_update_repo_failed"), "WARN")
+            rc, _ = self.run_cmd(["apt-get", "install", "-y"] + missing, sudo=True, silent=True)
+        if rc != 0:
+            self.log(self.window._tr("log_install_deps_failed"), "ERROR")
+            return False
+        self.log(self.window._tr("log_deps_installed"), "SUCCESS")
+        return True
+
+    def install_uninstall(self):
+        """Usuwa sterownik NVIDIA i przywraca nouveau (bez instalacji NVK)."""
+        if self.system.demo_mode:
+            self.output.emit(self.window._tr("log_linux_only_short"), "WARN")
+            self.finished.emit(0)
+            return
+        self.log(self.window._tr("log_remove_nvidia_header"), "INFO")
+        self.progress.emit(15)
+        self.log(self.window._tr("log_cleaning_nvidia"), "INFO")
+        self.clean_nvidia_artifacts()
+        self.purge_nvidia_packages()
+        self.remove_dkms_modules()
+        self.remove_nvidia_configs()
+        self.remove_nvidia_libraries()
+        self.progress.emit(50)
+        if not self.verify_nvidia_removal():
+            self.log(self.window._tr("log_nvidia_libs_visible"), "WARN")
+        self.log(self.window._tr("log_config_nouveau"), "INFO")
+        self.configure_nouveau_for_nvk()
+        self.rebuild_initramfs()
+        self.progress.emit(100)
+        self.log(self.window._tr("log_nvidia_removed"), "SUCCESS")
+        self.restart_needed = True
+        self.ask_restart.emit()
+        self.finished.emit(0)
+
+    def install_upgrade_repo(self):
+        """Aktualizuje sterownik NVIDIA z repo (apt/dnf update + upgrade pakietu)."""
+        if self.system.demo_mode:
+            self.output.emit(self.window._tr("log_linux_only_short"), "WARN")
+            self.finished.emit(0)
+            return
+        pkg = self.system.get_installed_nvidia_driver_package()
+        if not pkg:
+            self.log(self.window._tr("log_no_driver_repo"), "WARN")
+            self.finished.emit(0)
+            return
+        self.log(self.window._tr("log_updating_repo_pkg").format(pkg), "INFO")
+        self.progress.emit(20)
+        self._ensure_network()
+        if self.system.distro_family == "fedora":
+            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "upgrade", "-y", pkg], sudo=True, silent=True)
+        else:
+            rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
+            if rc != 0:
+                self.log(self.window._tr("log_update_repo_failed"), "ERROR")
+                self.finished.emit(1)
+                return
+            rc, _ = self.run_cmd(["apt-get", "install", "--only-upgrade", "-y", pkg], sudo=True, silent=True)
+        if rc == 0:
+            self.progress.emit(100)
+            self.log(self.window._tr("log_driver_updated").format(pkg), "SUCCESS")
+            self.restart_needed = True
+            self.ask_restart.emit()
+            self.finished.emit(0)
+        else:
+            self.log(self.window._tr("log_update_failed"), "ERROR")
+            self.finished.emit(1)
+
+    def run(self):
+        """Główna metoda wątku"""
+        try:
+            if self.install_type == "nvk":
+                self.install_nvk()
+            elif self.install_type == "uninstall":
+                self.install_uninstall()
+            elif self.install_type == "repo":
+                if not self._ensure_dependencies():
+                    self.finished.emit(1)
+                    return
+                self.install_repo()
+            elif self.install_type == "run":
+                if not self._ensure_dependencies():
+                    self.finished.emit(1)
+                    return
+                self.install_nvidia_run()
+            elif self.install_type == "upgrade_repo":
+                self.install_upgrade_repo()
+            else:
+                self.output.emit(self.window._tr("log_unknown_install"), "ERROR")
+                self.finished.emit(1)
+        except Exception as e:
+            self.output.emit(self.window._tr("log_error_exception").format(str(e)), "ERROR")
+            
+            # Zbierz szczegółowy raport błędu
+            try:
+                report = self.window.collect_error_report(str(e), f"InstallationThread: {self.install_type}")
+                error_file = self.window._write_error_report(report)
+                if error_file:
+                    self.output.emit(self.window._tr("log_error_report_saved").format(error_file), "INFO")
+            except:
+                pass
+            
+            self.finished.emit(1)
+    
+    def log(self, message: str, level: str = "INFO"):
+        """Wysyła wiadomość do głównego okna"""
+        self.output.emit(message, level)
+
+    def _ensure_network(self):
+        """Sprawdza sieć (jak ensure_network w driver-manager-v2.sh) – tylko ostrzeżenie."""
+        rc, _ = self.run_cmd(["ping", "-c", "1", "-W", "2", "8.8.8.8"], sudo=False, silent=True, timeout=5)
+        if rc != 0:
+            self.log(self.window._tr("log_no_network"), "WARN")
+
+    def _check_secure_boot(self):
+        """Ostrzeżenie jeśli Secure Boot włączony (jak check_secure_boot w .sh)."""
+        rc, out = self.run_cmd(["mokutil", "--sb-state"], sudo=False, silent=True, timeout=5)
+        if rc == 0 and out and "enabled" in (out or "").lower():
+            self.log(self.window._tr("log_secure_boot"), "WARN")
+            self.log(self.window._tr("log_secure_boot_advice"), "WARN")
+    
+    def _ensure_build_requirements(self) -> bool:
+        """Sprawdza dkms, linux-headers, build-essential (Debian) lub kernel-devel, gcc (Fedora); doinstalowuje brakujące. Zwraca True jeśli ok."""
+        if self.system.distro_family == "fedora":
+            to_install = []
+            rc, _ = self.run_cmd(["rpm", "-q", "kernel-devel"], sudo=False, silent=True)
+            if rc != 0:
+                to_install.append("kernel-devel")
+            rc, _ = self.run_cmd(["rpm", "-q", "gcc"], sudo=False, silent=True)
+            if rc != 0:
+                to_install.append("gcc")
+            if not to_install:
+                return True
+            self.log(self.window._tr("log_installing_missing").format(", ".join(to_install)), "INFO")
+            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + to_install, sudo=True, silent=True, timeout=300)
+            if rc != 0:
+                self.log(self.window._tr("log_deps_install_failed"), "ERROR")
+                return False
+            self.log(self.window._tr("log_deps_install_ok"), "SUCCESS")
+            return True
+        kernel = _kernel_release()
+        to_install = []
+        rc, _ = self.run_cmd(["which", "dkms"], sudo=False, silent=True)
+        if rc != 0:
+            to_install.append("dkms")
+        rc, _ = self.run_cmd(["dpkg", "-l", f"linux-headers-{kernel}"], sudo=False, silent=True)
+        if rc != 0:
+            to_install.append(f"linux-headers-{kernel}")
+        rc, _ = self.run_cmd(["dpkg", "-l", "build-essential"], sudo=False, silent=True)
+        if rc != 0:
+            to_install.append("build-essential")
+        if not to_install:
+            return True
+        self.log(self.window._tr("log_installing_missing").format(", ".join(to_install)), "INFO")
+        rc, _ = self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True, timeout=120)
+        if rc != 0:
+            self.log(self.window._tr("log_update_repo_failed"), "ERROR")
+            return False
+        rc, _ = self.run_cmd(["apt-get", "install", "-y"] + to_install, sudo=True, silent=True, timeout=300)
+        if rc != 0:
+            self.log(self.window._tr("log_deps_install_failed"), "ERROR")
+            return False
+        self.log(self.window._tr("log_deps_install_ok"), "SUCCESS")
+        return True
+    
+    def run_cmd(self, cmd: List[str], sudo: bool = False, 
+                timeout: int = 300, silent: bool = False,
+                ignore_missing_unit: bool = False,
+                ignore_stderr_contains: Optional[str] = None,
+                input_text: Optional[str] = None) -> Tuple[int, str]:
+        """Wykonuje komendę i loguje wynik.
+        ignore_missing_unit: nie traktuj jako błąd gdy systemctl zwraca „unit not loaded”/„does not exist”.
+        ignore_stderr_contains: nie traktuj jako błąd gdy stderr zawiera ten tekst (np. DKMS „not located in the DKMS tree”)."""
+        sudo_password = self.params.get("sudo_password")
+        result = self.system.run_command(cmd, sudo=sudo, timeout=timeout, sudo_password=sudo_password,
+                                         input_text=input_text)
+        rc, stdout, stderr = result[0], result[1], result[2] or ""
+        
         if rc == 0:
             return rc, stdout
         
@@ -1405,6 +1987,43 @@ class InstallationThread(QThread):
                     self.log(f"  {line}", "ERROR")
         
         return rc, stdout
+
+    @staticmethod
+    def _file_is_current(dest: str, content: str, mode: str = "644") -> bool:
+        """Czy plik docelowy ma już dokładnie tę treść i uprawnienia (wtedy zapis, chmod i daemon-reload można pominąć)."""
+        try:
+            path = Path(dest)
+            return (path.stat().st_mode & 0o777) == int(mode, 8) and path.read_bytes() == content.encode("utf-8")
+        except OSError:
+            return False
+
+    def _install_file(self, content: str, dest: str, mode: str = "644") -> Optional[int]:
+        """Zapisuje plik systemowy jednym `install -m` (kopia + uprawnienia w jednym exec).
+        Zwraca kod wyjścia lub None, gdy plik ma już tę treść i uprawnienia (nic nie zapisano)."""
+        if self._file_is_current(dest, content, mode):
+            return None
+        if self.params.get("sudo_password") is None:
+            # Treść prosto na stdin – bez pliku tymczasowego w /tmp
+            rc, _ = self.run_cmd(["install", "-m", mode, "/dev/stdin", dest], sudo=True, silent=True,
+                                 input_text=content)
+            return rc
+        # sudo -S czyta hasło ze stdin – treść przez prywatny plik tymczasowy
+        fd, tmp = tempfile.mkstemp(prefix="nvidia_manager_", suffix=".tmp")
+        os.close(fd)
+        try:
+            Path(tmp).write_text(content, encoding="utf-8")
+            rc, _ = self.run_cmd(["install", "-m", mode, tmp, dest], sudo=True, silent=True)
+        finally:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        return rc
+    
+    def _enable_unit(self, unit: str):
+        """systemctl enable tylko gdy unit nie jest jeszcze włączony (is-enabled działa bez sudo)."""
+        if self.system.run_command(["systemctl", "is-enabled", "--quiet", unit], sudo=False)[0] != 0:
+            self.run_cmd(["systemctl", "enable", unit], sudo=True, silent=True)
     
     def install_nvk(self):
         """Instaluje NVK"""
@@ -1413,6 +2032,7 @@ class InstallationThread(QThread):
             self.finished.emit(0)
             return
         
+        is_fedora = self.system.distro_family == "fedora"
         self.log(self.window._tr("log_install_nvk_header"), "INFO")
         self.progress.emit(5)
         # Czyszczenie (kolejność jak w driver-manager-v2.sh)
@@ -1423,7 +2043,7 @@ class InstallationThread(QThread):
         self.remove_nvidia_configs()
         self.remove_nvidia_libraries()
         if not self.verify_nvidia_removal():
-            if self.system.distro_family == "fedora":
+            if is_fedora:
                 self.log(self.window._tr("log_nvidia_libs_cache_info"), "INFO")
             else:
                 self.log(self.window._tr("log_nvidia_libs_visible"), "WARN")
@@ -1440,10 +2060,10 @@ class InstallationThread(QThread):
             return
         self.progress.emit(55)
         # Na Fedorze: dracut dopiero po instalacji pakietów (firmware GSP musi być w systemie przed budową initramfs)
-        if self.system.distro_family == "fedora":
+        if is_fedora:
             self.rebuild_initramfs()
         # Reinstalacja środowiska graficznego – tylko na Debian/Ubuntu (na Fedorze pomijamy, żeby nie nadpisać działającej konfiguracji z czystej instalacji)
-        if self.system.distro_family != "fedora":
+        if not is_fedora:
             self.reinstall_plasma_and_mesa()
             self.configure_sddm_for_wayland()
         self.progress.emit(75)
@@ -1473,16 +2093,9 @@ RemainAfterExit=no
 [Install]
 WantedBy=multi-user.target
 """
-        tmp = Path("/tmp/nvk-check-reboot.service")
-        with open(tmp, "w") as f:
-            f.write(content)
-        self.run_cmd(["cp", str(tmp), service_path], sudo=True, silent=True)
-        self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
-        self.run_cmd(["systemctl", "enable", "nvk-check-reboot.service"], sudo=True, silent=True)
-        try:
-            tmp.unlink()
-        except OSError:
-            pass
+        if self._install_file(content, service_path, "644") is not None:
+            self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
+        self._enable_unit("nvk-check-reboot.service")
     
     def install_repo(self):
         """Instaluje z repo (zgodnie z driver-manager-v2.sh: ensure_network, check_secure_boot, clean, headers, PPA, update, install)"""
@@ -1549,10 +2162,7 @@ WantedBy=multi-user.target
         self.purge_nvidia_packages()
         self.progress.emit(25)
         # Instalacja headers (ensure_headers)
-        try:
-            kernel = os.uname().release
-        except:
-            kernel = "unknown"
+        kernel = _kernel_release()
         self.run_cmd(["apt-get", "install", "-y", f"linux-headers-{kernel}"], 
                     sudo=True, silent=True)
         
@@ -1619,16 +2229,14 @@ WantedBy=multi-user.target
         # Kopiuj plik
         system_run = INSTALL_DIR / f"NVIDIA-{version}.run"
         self.run_cmd(["mkdir", "-p", str(INSTALL_DIR)], sudo=True, silent=True)
-        self.run_cmd(["cp", str(run_file), str(system_run)], sudo=True)
-        self.run_cmd(["chmod", "755", str(system_run)], sudo=True)
+        self.run_cmd(["install", "-m", "755", str(run_file), str(system_run)], sudo=True)
         self.progress.emit(75)
         # Generuj skrypt instalacyjny (log w /var/log przy starcie – SELinux i brak user dir)
         self.generate_install_script(version, label, system_run, log_file="/var/log/nvidia-run-install.log")
         # Skrypt w katalogu systemowym – żeby SELinux nie blokował wykonania przy starcie
         if IS_LINUX and SYSTEM_RUN_INSTALL_DIR:
             self.run_cmd(["mkdir", "-p", SYSTEM_RUN_INSTALL_DIR], sudo=True, silent=True)
-            self.run_cmd(["cp", str(INSTALL_SCRIPT_DIR / "run-install-v2.sh"), f"{SYSTEM_RUN_INSTALL_DIR}/run-install-v2.sh"], sudo=True, silent=True)
-            self.run_cmd(["chmod", "+x", f"{SYSTEM_RUN_INSTALL_DIR}/run-install-v2.sh"], sudo=True, silent=True)
+            self.run_cmd(["install", "-m", "755", str(INSTALL_SCRIPT_DIR / "run-install-v2.sh"), f"{SYSTEM_RUN_INSTALL_DIR}/run-install-v2.sh"], sudo=True, silent=True)
             if self.system.distro_family == "fedora":
                 self.run_cmd(["restorecon", "-v", f"{SYSTEM_RUN_INSTALL_DIR}/run-install-v2.sh"], sudo=True, silent=True)
         # Generuj systemd service
@@ -1671,586 +2279,244 @@ WantedBy=multi-user.target
         # Dodatkowe ścieżki jak w skrypcie .sh (globy przez sh -c)
         self.run_cmd(["sh", "-c", "rm -f /etc/ld.so.conf.d/*nvidia*"], sudo=True, silent=True)
         self.run_cmd(["sh", "-c", "rm -f /etc/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
-        self.run_cmd(["sh", "-c", "rm -f /usr/share/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
-        
-        # Systemd services (brak usługi = OK, nie przerywamy)
-        services = ["nvidia-persistenced", "nvidia-powerd", "nvidia-suspend", 
-                   "nvidia-resume", "nvidia-hibernate", "nvidia-driver-install", "nvidia-run-install", "nvk-install"]
-        for svc in services:
-            self.run_cmd(["systemctl", "stop", f"{svc}.service"], sudo=True, silent=True, ignore_missing_unit=True)
-            self.run_cmd(["systemctl", "disable", f"{svc}.service"], sudo=True, silent=True, ignore_missing_unit=True)
-            self.run_cmd(["rm", "-f", f"/etc/systemd/system/{svc}.service"], sudo=True, silent=True)
-        
-        self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
-        self.run_cmd(["ldconfig"], sudo=True, silent=True)
-    
-    def remove_dkms_modules(self):
-        """Usuwa moduły DKMS (brak modułu w DKMS = OK, nie przerywamy). Na Fedorze brak dkms – usuwa tylko moduły nvidia z .run z /lib/modules."""
-        try:
-            kernel = os.uname().release
-        except Exception:
-            kernel = "unknown"
-        if self.system.distro_family == "fedora":
-            # Fedora: .run instaluje moduły do /lib/modules/$kernel – usuń je przy przejściu na NVK
-            self.run_cmd(["find", f"/lib/modules/{kernel}", "-name", "nvidia*.ko*", "-delete"], sudo=True, silent=True)
-            self.run_cmd(["depmod", "-a"], sudo=True, silent=True)
-            return
-        rc, output = self.run_cmd(["dkms", "status"], sudo=False, silent=True)
-        if rc == 0:
-            for line in output.split("\n"):
-                if "nvidia" in line.lower():
-                    entry = line.split(",")[0].strip()
-                    if entry:
-                        self.run_cmd(
-                            ["dkms", "remove", entry, "--all"],
-                            sudo=True,
-                            silent=True,
-                            ignore_stderr_contains="not located in the DKMS tree",
-                        )
-        
-        self.run_cmd(["rm", "-rf", "/var/lib/dkms/nvidia*", "/usr/src/nvidia*", "/usr/src/NVIDIA*"], 
-                    sudo=True, silent=True)
-        self.run_cmd(["find", f"/lib/modules/{kernel}", "-name", "nvidia*.ko*", 
-                     "!", "-path", "*/updates/dkms/*", "-delete"], sudo=True, silent=True)
-        self.run_cmd(["depmod", "-a"], sudo=True, silent=True)
-    
-    def purge_nvidia_packages(self):
-        """Usuwa pakiety NVIDIA"""
-        if self.system.distro_family == "fedora":
-            packages = self.system.get_installed_nvidia_packages()
-            if packages:
-                self.run_cmd([self.system.get_dnf_cmd(), "remove", "-y"] + packages, sudo=True, silent=True)
-            return
-        rc, output = self.run_cmd(["dpkg", "-l"], sudo=False, silent=True)
-        if rc == 0:
-            packages = []
-            for line in output.split("\n"):
-                if line.startswith("ii") and ("nvidia" in line.lower() or 
-                                             "libnvidia" in line.lower() or
-                                             "linux-modules-nvidia" in line.lower()):
-                    pkg = line.split()[1]
-                    packages.append(pkg)
-            
-            if packages:
-                self.run_cmd(["apt-get", "remove", "--purge", "-y"] + packages, 
-                           sudo=True, silent=True)
-                self.run_cmd(["apt-get", "autoremove", "--purge", "-y"], sudo=True, silent=True)
-    
-    def remove_nvidia_configs(self):
-        """Usuwa konfiguracje NVIDIA (zgodnie z driver-manager-v2.sh)"""
-        configs = [
-            "/etc/modprobe.d/nvidia*.conf",
-            "/etc/modprobe.d/blacklist-nouveau.conf",
-            "/etc/modprobe.d/disable-nvidia.conf",
-            "/etc/X11/xorg.conf",
-            "/etc/X11/xorg.conf.nvidia-xconfig-original",
-        ]
-        for cfg in configs:
-            self.run_cmd(["rm", "-f", cfg], sudo=True, silent=True)
-        self.run_cmd(["sh", "-c", "rm -f /etc/ld.so.conf.d/*nvidia*"], sudo=True, silent=True)
-        self.run_cmd(["sh", "-c", "rm -f /etc/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
-        self.run_cmd(["sh", "-c", "rm -f /usr/share/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
-
-    def remove_nvidia_libraries(self):
-        """Usuwa biblioteki NVIDIA (zgodnie z driver-manager-v2.sh – pełna lista). Na Fedorze także /usr/lib64 (instalator .run)."""
-        paths_rf = [
-            "/usr/lib/x86_64-linux-gnu/libnvidia*",
-            "/usr/lib/i386-linux-gnu/libnvidia*",
-            "/usr/lib32/libnvidia*",
-            "/usr/lib/nvidia*",
-            "/usr/lib32/nvidia*",
-            "/lib/x86_64-linux-gnu/libnvidia*",
-            "/lib/i386-linux-gnu/libnvidia*",
-        ]
-        if self.system.distro_family == "fedora":
-            paths_rf.extend(["/usr/lib64/libnvidia*", "/usr/lib64/nvidia*"])
-        for path in paths_rf:
-            self.run_cmd(["rm", "-rf", path], sudo=True, silent=True)
-        paths_f = [
-            "/lib/x86_64-linux-gnu/*nvidia*.so*",
-            "/lib/i386-linux-gnu/*nvidia*.so*",
-            "/usr/lib/x86_64-linux-gnu/*nvidia*.so*",
-            "/usr/lib/i386-linux-gnu/*nvidia*.so*",
-            "/lib/x86_64-linux-gnu/libvdpau_nvidia*",
-            "/lib/i386-linux-gnu/libvdpau_nvidia*",
-            "/usr/lib/x86_64-linux-gnu/vdpau/libvdpau_nvidia*",
-            "/usr/lib/i386-linux-gnu/vdpau/libvdpau_nvidia*",
-            "/lib/libGL.so*",
-            "/lib/libEGL.so*",
-            "/lib/libGLX.so*",
-            "/lib/libGLES*.so*",
-            "/usr/bin/nvidia*",
-            "/usr/sbin/nvidia*",
-        ]
-        if self.system.distro_family == "fedora":
-            paths_f.extend(["/usr/lib64/*nvidia*.so*", "/usr/lib64/libvdpau_nvidia*"])
-        for path in paths_f:
-            self.run_cmd(["sh", "-c", f"rm -f {path}"], sudo=True, silent=True)
-        self.run_cmd(["ldconfig"], sudo=True, silent=True)
-
-    def verify_nvidia_removal(self) -> bool:
-        """Weryfikuje usunięcie NVIDIA (ldconfig) – jak w .sh. Zwraca True jeśli OK."""
-        self.run_cmd(["ldconfig"], sudo=True, silent=True)
-        rc, output = self.run_cmd(["ldconfig", "-p"], sudo=False, silent=True)
-        if rc == 0 and "nvidia" in (output or "").lower():
-            self.log(self.window._tr("log_ldconfig_warning"), "WARN")
-            return False
-        return True
-    
-    def configure_nouveau_for_nvk(self):
-        """Konfiguruje nouveau dla NVK"""
-        self.run_cmd(["rm", "-f", "/etc/modprobe.d/blacklist-nouveau.conf"], sudo=True, silent=True)
-        
-        nouveau_conf = "/etc/modprobe.d/nouveau.conf"
-        content = "# generated by nvidia-manager-v2 (NVK)\noptions nouveau modeset=1\n"
-        # Zapis przez Python
-        tmp_file = Path("/tmp/nouveau_conf.txt")
-        with open(tmp_file, "w") as f:
-            f.write(content)
-        self.run_cmd(["cp", str(tmp_file), nouveau_conf], sudo=True, silent=True)
-        tmp_file.unlink()
-        
-        # Dodaj nouveau do initramfs-tools/modules (jak w .sh – z hasłem sudo)
-        # grep -q zwraca 1 gdy nie znajdzie – to oczekiwane, nie loguj jako błąd
-        modules_file = "/etc/initramfs-tools/modules"
-        if Path(modules_file).exists():
-            rc = self.system.run_command(["grep", "-q", "^nouveau$", modules_file], sudo=False)[0]
-            if rc != 0:
-                self.run_cmd(["sh", "-c", f"echo nouveau >> {modules_file}"], sudo=True, silent=True)
-        
-        # Na Fedorze dracut wywołujemy po instalacji pakietów (z firmware), żeby initramfs zawierał GSP
-        if self.system.distro_family != "fedora":
-            self.rebuild_initramfs()
-    
-    def install_nvk_packages(self) -> bool:
-        """Instaluje pakiety NVK (Debian/Ubuntu: apt + PPA; Fedora: dnf)"""
-        if self.system.distro_family == "fedora":
-            packages = [
-                "nvidia-gpu-firmware",
-                "mesa-vulkan-drivers",
-                "mesa-dri-drivers",
-                "mesa-libEGL",
-                "mesa-libGL",
-                "vulkan-tools",
-                "xorg-x11-drv-nouveau",
-                "glx-utils",
-            ]
-            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + packages, sudo=True, timeout=3600)
-            return rc == 0
-        # Debian/Ubuntu
-        self.run_cmd(["add-apt-repository", "-y", "ppa:kisak/kisak-mesa"], sudo=True, silent=True)
-        self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
-        self.run_cmd(["dpkg", "--add-architecture", "i386"], sudo=True, silent=True)
-        self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
-        packages = [
-            "mesa-vulkan-drivers",
-            "libgl1-mesa-dri",
-            "libegl-mesa0",
-            "libgles2",
-            "libglx-mesa0",
-            "mesa-utils",
-            "vulkan-tools",
-            "xserver-xorg-video-nouveau",
-        ]
-        rc, _ = self.run_cmd(["apt-get", "install", "-y"] + packages, sudo=True)
-        return rc == 0
-    
-    def reinstall_plasma_and_mesa(self):
-        """Reinstaluje środowisko graficzne i Mesa (Plasma, Cinnamon, MATE, Xfce, GNOME). Debian: apt, Fedora: dnf."""
-        if self.system.distro_family == "fedora":
-            rc, output = self.run_cmd(["rpm", "-qa"], sudo=False, silent=True)
-            if rc == 0 and output:
-                dnf = self.system.get_dnf_cmd()
-                if "plasma-workspace" in output:
-                    self.run_cmd([dnf, "reinstall", "-y",
-                                "sddm", "plasma-workspace", "kwin-wayland",
-                                "qt6-qtbase", "qt6-qtwayland"], sudo=True, silent=True)
-                elif "cinnamon" in output:
-                    self.run_cmd([dnf, "reinstall", "-y",
-                                "cinnamon", "cinnamon-desktop-environment",
-                                "qt6-qtbase", "qt6-qtwayland"], sudo=True, silent=True)
-                elif "mate-desktop" in output:
-                    self.run_cmd([dnf, "reinstall", "-y",
-                                "mate-desktop-environment",
-                                "qt6-qtbase", "qt6-qtwayland"], sudo=True, silent=True)
-                elif "xfce4-session" in output:
-                    self.run_cmd([dnf, "reinstall", "-y",
-                                "xfce4-session", "qt6-qtbase", "qt6-qtwayland"], sudo=True, silent=True)
-                elif "gnome-shell" in output:
-                    self.run_cmd([dnf, "reinstall", "-y",
-                                "gnome-shell", "gnome-session",
-                                "qt6-qtbase", "qt6-qtwayland"], sudo=True, silent=True)
-            self.run_cmd([self.system.get_dnf_cmd(), "reinstall", "-y",
-                        "mesa-dri-drivers", "mesa-libEGL", "mesa-libGL"], sudo=True, silent=True)
-            return
-        rc, output = self.run_cmd(["dpkg", "-l"], sudo=False, silent=True)
-        if rc == 0:
-            if "plasma-workspace" in output:
-                self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                            "sddm", "plasma-workspace", "kwin-wayland",
-                            "libqt6opengl6", "qt6-qpa-plugins"], sudo=True, silent=True)
-            elif "cinnamon" in output:
-                self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                            "cinnamon", "cinnamon-desktop-environment",
-                            "libqt6opengl6", "qt6-qpa-plugins"], sudo=True, silent=True)
-            elif "mate-desktop" in output:
-                self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                            "mate-desktop-environment", "mate-desktop-environment-core",
-                            "libqt6opengl6", "qt6-qpa-plugins"], sudo=True, silent=True)
-            elif "xfce4" in output:
-                self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                            "xfce4", "xfce4-session",
-                            "libqt6opengl6", "qt6-qpa-plugins"], sudo=True, silent=True)
-            elif "gnome-shell" in output:
-                self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                            "gnome-shell", "gnome-session",
-                            "libqt6opengl6", "qt6-qpa-plugins"], sudo=True, silent=True)
-        self.run_cmd(["apt-get", "install", "-y", "--reinstall",
-                    "libgl1-mesa-dri", "libegl-mesa0", "libgles2", "libglx-mesa0"],
-                   sudo=True, silent=True)
-    
-    def configure_sddm_for_wayland(self):
-        """Konfiguruje SDDM dla Wayland (jak w .sh – backup i usunięcie Session=plasma.desktop)"""
-        sddm_conf = "/etc/sddm.conf"
-        if Path(sddm_conf).exists():
-            self.run_cmd(["cp", sddm_conf, f"{sddm_conf}.bak.{int(datetime.now().timestamp())}"],
-                        sudo=True, silent=True)
-            self.run_cmd(["sed", "-i", "/Session=plasma.desktop/d", sddm_conf], sudo=True, silent=True)
-    
-    def verify_nvk_installation(self):
-        """Weryfikuje instalację NVK (sprawdzenie pakietów NVIDIA i ldconfig). Debian: dpkg, Fedora: rpm. Na Fedorze 1 pakiet (firmware) i ldconfig → INFO zamiast WARN."""
-        if self.system.distro_family == "fedora":
-            rc, output = self.run_cmd(["rpm", "-qa"], sudo=False, silent=True)
-            if rc == 0 and output:
-                nvidia_lines = [l for l in output.split("\n") if "nvidia" in l.lower()]
-                if nvidia_lines:
-                    if len(nvidia_lines) == 1 and "nvidia-gpu-firmware" in nvidia_lines[0].lower():
-                        self.log(self.window._tr("log_nvidia_firmware_kept"), "INFO")
-                    else:
-                        self.log(self.window._tr("log_nvidia_pkgs_warning").format(len(nvidia_lines)), "WARN")
-        else:
-            rc, output = self.run_cmd(["dpkg", "-l"], sudo=False, silent=True)
-            if rc == 0 and output:
-                nvidia_lines = [l for l in output.split("\n") if l.startswith("ii") and "nvidia" in l.lower()]
-                if nvidia_lines:
-                    self.log(self.window._tr("log_nvidia_pkgs_warning").format(len(nvidia_lines)), "WARN")
-        rc2, ld_out = self.run_cmd(["ldconfig", "-p"], sudo=False, silent=True)
-        if rc2 == 0 and ld_out and "nvidia" in ld_out.lower():
-            if self.system.distro_family == "fedora":
-                self.log(self.window._tr("log_ldconfig_firmware_ok"), "INFO")
-            else:
-                self.log(self.window._tr("log_ldconfig_warning"), "WARN")
+        self.run_cmd(["sh", "-c", "rm -f /usr/share/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
+        
+        # Systemd services (brak usługi = OK, nie przerywamy)
+        services = ["nvidia-persistenced", "nvidia-powerd", "nvidia-suspend", 
+                   "nvidia-resume", "nvidia-hibernate", "nvidia-driver-install", "nvidia-run-install", "nvk-install"]
+        for svc in services:
+            self.run_cmd(["systemctl", "stop", f"{svc}.service"], sudo=True, silent=True, ignore_missing_unit=True)
+            self.run_cmd(["systemctl", "disable", f"{svc}.service"], sudo=True, silent=True, ignore_missing_unit=True)
+            self.run_cmd(["rm", "-f", f"/etc/systemd/system/{svc}.service"], sudo=True, silent=True)
+        
+        self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
         self.run_cmd(["ldconfig"], sudo=True, silent=True)
     
-    def block_nouveau(self):
-        """Blokuje nouveau"""
-        content = "blacklist nouveau\noptions nouveau modeset=0\n"
-        tmp_file = Path("/tmp/blacklist_nouveau.txt")
-        with open(tmp_file, "w") as f:
-            f.write(content)
-        self.run_cmd(["cp", str(tmp_file), "/etc/modprobe.d/blacklist-nouveau.conf"], sudo=True, silent=True)
-        tmp_file.unlink()
-    
-    def rebuild_initramfs(self):
-        """Przebudowuje initramfs (Debian/Ubuntu: update-initramfs, Fedora: dracut)"""
-        self.log(self.window._tr("log_updating_initramfs"), "INFO")
-        if self.system.distro_family == "fedora":
-            self.run_cmd(["dracut", "--force"], sudo=True, silent=True)
-        else:
-            self.run_cmd(["update-initramfs", "-u", "-k", "all"], sudo=True, silent=True)
-    
-    def generate_install_script(self, version: str, label: str, run_file: Path, log_file: Optional[str] = None):
-        """Generuje skrypt instalacyjny (Debian: 5-fazowy z DKMS; Fedora: bez DKMS, z dracut). log_file=None → LOG_DIR; przy instalacji na boot podaj np. /var/log/nvidia-run-install.log."""
-        script_path = INSTALL_SCRIPT_DIR / "run-install-v2.sh"
-        log_file_str = log_file if log_file is not None else str(LOG_DIR / "run-install-v2.log")
-        run_file_str = str(run_file)
-
+    def remove_dkms_modules(self):
+        """Usuwa moduły DKMS (brak modułu w DKMS = OK, nie przerywamy). Na Fedorze brak dkms – usuwa tylko moduły nvidia z .run z /lib/modules."""
+        kernel = _kernel_release()
         if self.system.distro_family == "fedora":
-            # Fedora: .run bez --dkms (instalator buduje moduł sam), potem dracut
-            script_content = """#!/bin/bash
-set -o pipefail
-
-RUN_FILE="{run_file}"
-VERSION="{version}"
-LABEL="{label}"
-LOG_FILE="{log_file}"
-
-mkdir -p "$(dirname "$LOG_FILE")" || true
-
-log() {{
-  local msg="$1"
-  local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-  local full_msg="[$timestamp] $msg"
-  echo "$full_msg" >> "$LOG_FILE" 2>/dev/null || true
-  echo "$full_msg"
-}}
-
-log "========================================="
-log "NVIDIA DRIVER INSTALLATION (Fedora)"
-log "========================================="
-log "Wersja: $VERSION ($LABEL)"
-log ""
-
-if [ ! -f "$RUN_FILE" ]; then
-  log "BŁĄD: Plik .run nie istnieje: $RUN_FILE"
-  exit 1
-fi
-
-systemctl disable nvidia-run-install.service 2>/dev/null || true
-
-log "FAZA 1: Przygotowanie..."
-log_command() {{
-  log "Wykonuję: $*"
-  "$@" >> "$LOG_FILE" 2>&1
-  local rc=$?
-  [ $rc -ne 0 ] && log "BŁĄD (kod $rc): $*"
-  return $rc
-}}
-
-log_command rm -f /etc/modprobe.d/blacklist-nouveau.conf /etc/modprobe.d/nvidia*.conf
-for dm in sddm gdm lightdm; do log_command systemctl stop $dm 2>/dev/null || true; done
-log_command modprobe -r nouveau 2>/dev/null || true
-
-log ""
-log "FAZA 2: Instalator NVIDIA (bez DKMS – budowa modułu wewnętrzna)..."
-log_command "$RUN_FILE" --silent --no-questions --accept-license --disable-nouveau --run-nvidia-xconfig
-install_exit=$?
-log "Instalator zakończony z kodem: $install_exit"
-
-kernel_ver=$(uname -r)
-log_command depmod -a
-
-log ""
-log "FAZA 3: Konfiguracja..."
-log_command bash -c 'echo "options nvidia-drm modeset=1 fbdev=1" | tee /etc/modprobe.d/nvidia-drm.conf > /dev/null'
-log_command bash -c 'echo -e "blacklist nouveau\\noptions nouveau modeset=0" | tee /etc/modprobe.d/blacklist-nouveau.conf > /dev/null'
-
-log "Aktualizacja initramfs (dracut)..."
-log_command dracut --force
-
-nvidia_modules=$(find /lib/modules/$kernel_ver -name "nvidia.ko*" 2>/dev/null | grep -v "i2c\\|forcedeth\\|typec\\|hid" | head -1)
-if [ -z "$nvidia_modules" ]; then
-  log "BŁĄD: Moduły NVIDIA nie są w kernelu"
-  exit 1
-fi
-log "SUKCES: Moduły w: $nvidia_modules"
-
-if [ -f /etc/X11/xorg.conf ]; then
-  log_command cp /etc/X11/xorg.conf /etc/X11/xorg.conf.nvidia-boot-backup
-  log_command rm -f /etc/X11/xorg.conf
-fi
-
-log_command systemctl disable nvidia-run-install.service 2>/dev/null || true
-log "Restart za 5 sekund..."
-sleep 5
-reboot
-""".format(run_file=run_file_str, version=version, label=label, log_file=log_file_str)
-        else:
-            # Debian/Ubuntu: pełny skrypt 5-fazowy z DKMS
-            script_content = """#!/bin/bash
-set -o pipefail
-
-RUN_FILE="{run_file}"
-VERSION="{version}"
-LABEL="{label}"
-LOG_FILE="{log_file}"
-
-mkdir -p "$(dirname "$LOG_FILE")" || true
-
-log() {{
-  local msg="$1"
-  local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-  local full_msg="[$timestamp] $msg"
-  echo "$full_msg" >> "$LOG_FILE" 2>/dev/null || true
-  echo "$full_msg"
-}}
-
-log "========================================="
-log "NVIDIA DRIVER INSTALLATION v2"
-log "========================================="
-log "Wersja: $VERSION ($LABEL)"
-log "Plik: $RUN_FILE"
-log ""
-
-if [ ! -f "$RUN_FILE" ]; then
-  log "BŁĄD: Plik .run nie istnieje: $RUN_FILE"
-  exit 1
-fi
-
-# Od razu wyłącz serwis, żeby przy następnym starcie nie uruchomił się ponownie (zapobiega zapętleniu)
-log "Wyłączanie serwisu nvidia-run-install (jednorazowe uruchomienie)..."
-systemctl disable nvidia-run-install.service 2>/dev/null || true
-
-# FAZA 1: Przygotowanie
-log "FAZA 1: Przygotowanie systemu..."
-log_command() {{
-  log "Wykonuję: $*"
-  local output
-  output=$("$@" >> "$LOG_FILE" 2>&1)
-  local rc=$?
-  if [ $rc -ne 0 ]; then
-    log "BŁĄD (kod $rc): $*"
-    [ -n "$output" ] && echo "$output" | while IFS= read -r line; do
-      if ! echo "$line" | grep -qE "Unit.*not loaded|Unit.*does not exist"; then
-        log "  $line"
-      fi
-    done
-    return $rc
-  fi
-  return 0
-}}
-
-log_command rm -f /etc/modprobe.d/blacklist-nouveau.conf /etc/modprobe.d/nvidia*.conf
-log_command sh -c 'systemctl stop display-manager 2>/dev/null || true'
-for dm in sddm gdm3 gdm lightdm; do
-  log_command sh -c "systemctl stop $dm 2>/dev/null || true"
-done
-log_command sh -c 'modprobe -r nouveau 2>/dev/null || true'
-
-# FAZA 2: Instalacja
-log ""
-log "FAZA 2: Uruchamianie instalatora NVIDIA..."
-log_command "$RUN_FILE" --silent --no-questions --accept-license --dkms --disable-nouveau --run-nvidia-xconfig
-install_exit=$?
-log "Instalator zakończony z kodem: $install_exit"
-
-# FAZA 3: Weryfikacja i naprawa
-log ""
-log "FAZA 3: Weryfikacja instalacji..."
-
-if [ ! -d "/usr/src/nvidia-$VERSION" ]; then
-  log "Źródła nie są w /usr/src - wyodrębnianie..."
-  extract_dir=$(mktemp -d)
-  if "$RUN_FILE" --extract-only --target "$extract_dir" >> "$LOG_FILE" 2>&1; then
-    if [ -f "$extract_dir/kernel-open/dkms.conf" ]; then
-      log "Kopiowanie źródeł do /usr/src/nvidia-$VERSION..."
-      log_command mkdir -p "/usr/src/nvidia-$VERSION"
-      log_command cp -r "$extract_dir/kernel-open"/* "/usr/src/nvidia-$VERSION/"
-      log_command rm -rf "$extract_dir"
-      if ! dkms status 2>/dev/null | grep -q "nvidia/$VERSION"; then
-        log "Rejestrowanie w DKMS..."
-        log_command dkms add "/usr/src/nvidia-$VERSION"
-      fi
-    fi
-  fi
-fi
-
-dkms_status=$(dkms status 2>/dev/null | grep nvidia | head -1)
-if [ -z "$dkms_status" ]; then
-  log "BŁĄD: Moduły nie są zarejestrowane w DKMS"
-  log "Instalacja nie powiodła się"
-  exit 1
-fi
-
-log "DKMS status: $dkms_status"
-dkms_ver=$(echo "$dkms_status" | awk '{{print $2}}' | cut -d',' -f1)
-kernel_ver=$(uname -r)
-
-log "Sprawdzanie czy moduły są zbudowane..."
-dkms_built=0
-if [ -d "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver" ]; then
-  arch=$(uname -m)
-  if [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/$arch/module/nvidia.ko" ] || \\
-     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/$arch/module/nvidia.ko.xz" ] || \\
-     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/x86_64/module/nvidia.ko" ] || \\
-     [ -f "/var/lib/dkms/nvidia/$dkms_ver/$kernel_ver/x86_64/module/nvidia.ko.xz" ]; then
-    dkms_built=1
-    log "Moduły są zbudowane w DKMS"
-  fi
-fi
-
-nvidia_modules=$(find /lib/modules/$kernel_ver -name "nvidia.ko*" 2>/dev/null | grep -v "i2c\\|forcedeth\\|typec\\|hid" | head -1)
-if [ -z "$nvidia_modules" ]; then
-  log "Moduły NIE są w kernelu - wymuszam budowanie..."
-  if [ $dkms_built -eq 0 ]; then
-    log "Budowanie modułów przez DKMS..."
-    log_command dkms build "nvidia/$dkms_ver" -k "$kernel_ver"
-    build_rc=$?
-    if [ $build_rc -ne 0 ]; then
-      log "BŁĄD podczas budowania modułów (kod: $build_rc)"
-      log "Sprawdź czy linux-headers-$kernel_ver są zainstalowane"
-      exit 1
-    fi
-  fi
-  log "Instalowanie modułów do kernela..."
-  log_command dkms install "nvidia/$dkms_ver" -k "$kernel_ver"
-  install_rc=$?
-  if [ $install_rc -ne 0 ]; then
-    log "BŁĄD podczas instalacji modułów (kod: $install_rc)"
-    exit 1
-  fi
-  sleep 2
-  nvidia_modules=$(find /lib/modules/$kernel_ver -name "nvidia.ko*" 2>/dev/null | grep -v "i2c\\|forcedeth\\|typec\\|hid" | head -1)
-  if [ -z "$nvidia_modules" ]; then
-    log "BŁĄD: Moduły nadal nie są w kernelu po instalacji DKMS"
-    exit 1
-  fi
-fi
-
-log "Moduły są w kernelu: $nvidia_modules"
-
-# FAZA 4: Konfiguracja
-log ""
-log "FAZA 4: Konfiguracja systemu..."
-log_command bash -c 'echo "options nvidia-drm modeset=1 fbdev=1" | tee /etc/modprobe.d/nvidia-drm.conf > /dev/null'
-
-# Blokowanie nouveau na kolejny start (w FAZIE 1 usunęliśmy blacklist; teraz go przywracamy)
-log "Blokowanie nouveau na kolejny start..."
-log_command bash -c 'echo -e "blacklist nouveau\\noptions nouveau modeset=0" | tee /etc/modprobe.d/blacklist-nouveau.conf > /dev/null'
-
-log "Aktualizacja initramfs..."
-if [ -f /etc/initramfs-tools/modules ]; then
-  sed -i '/^nouveau$/d' /etc/initramfs-tools/modules 2>/dev/null || true
-  for mod in nvidia nvidia_drm nvidia_modeset nvidia_uvm; do
-    if ! grep -q "^$mod$" /etc/initramfs-tools/modules 2>/dev/null; then
-      echo "$mod" >> /etc/initramfs-tools/modules
-    fi
-  done
-fi
-log_command update-initramfs -u -k all >/dev/null 2>&1 || true
-
-# FAZA 5: Weryfikacja końcowa
-log ""
-log "FAZA 5: Weryfikacja końcowa..."
-final_modules=$(find /lib/modules/$kernel_ver -name "nvidia.ko*" 2>/dev/null | grep -v "i2c\\|forcedeth\\|typec\\|hid" | head -1)
-if [ -n "$final_modules" ]; then
-  log "SUKCES: Moduły NVIDIA są zainstalowane"
-  log "Lokalizacja: $final_modules"
-else
-  log "BŁĄD: Moduły NVIDIA nie są zainstalowane"
-  exit 1
-fi
-
-log ""
-log "========================================="
-log "INSTALACJA ZAKOŃCZONA POMYŚLNIE"
-log "========================================="
-log ""
+            # Fedora: .run instaluje moduły do /lib/modules/$kernel – usuń je przy przejściu na NVK
+            self.run_cmd(["find", f"/lib/modules/{kernel}", "-name", "nvidia*.ko*", "-delete"], sudo=True, silent=True)
+            self.run_cmd(["depmod", "-a"], sudo=True, silent=True)
+            return
+        rc, output = self.run_cmd(["dkms", "status"], sudo=False, silent=True)
+        if rc == 0:
+            for line in output.split("\n"):
+                if "nvidia" in line.lower():
+                    entry = line.split(",")[0].strip()
+                    if entry:
+                        self.run_cmd(
+                            ["dkms", "remove", entry, "--all"],
+                            sudo=True,
+                            silent=True,
+                            ignore_stderr_contains="not located in the DKMS tree",
+                        )
+        
+        self.run_cmd(["rm", "-rf", "/var/lib/dkms/nvidia*", "/usr/src/nvidia*", "/usr/src/NVIDIA*"], 
+                    sudo=True, silent=True)
+        self.run_cmd(["find", f"/lib/modules/{kernel}", "-name", "nvidia*.ko*", 
+                     "!", "-path", "*/updates/dkms/*", "-delete"], sudo=True, silent=True)
+        self.run_cmd(["depmod", "-a"], sudo=True, silent=True)
+    
+    def purge_nvidia_packages(self):
+        """Usuwa pakiety NVIDIA"""
+        packages = self.system.get_installed_nvidia_packages()
+        if not packages:
+            return
+        if self.system.distro_family == "fedora":
+            self.run_cmd([self.system.get_dnf_cmd(), "remove", "-y"] + packages, sudo=True, silent=True)
+        else:
+            self.run_cmd(["apt-get", "remove", "--purge", "-y"] + packages, sudo=True, silent=True)
+            self.run_cmd(["apt-get", "autoremove", "--purge", "-y"], sudo=True, silent=True)
+    
+    def remove_nvidia_configs(self):
+        """Usuwa konfiguracje NVIDIA (zgodnie z driver-manager-v2.sh)"""
+        configs = [
+            "/etc/modprobe.d/nvidia*.conf",
+            "/etc/modprobe.d/blacklist-nouveau.conf",
+            "/etc/modprobe.d/disable-nvidia.conf",
+            "/etc/X11/xorg.conf",
+            "/etc/X11/xorg.conf.nvidia-xconfig-original",
+        ]
+        for cfg in configs:
+            self.run_cmd(["rm", "-f", cfg], sudo=True, silent=True)
+        self.run_cmd(["sh", "-c", "rm -f /etc/ld.so.conf.d/*nvidia*"], sudo=True, silent=True)
+        self.run_cmd(["sh", "-c", "rm -f /etc/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
+        self.run_cmd(["sh", "-c", "rm -f /usr/share/X11/xorg.conf.d/*nvidia*"], sudo=True, silent=True)
 
-# xorg.conf z --run-nvidia-xconfig powstał przy starcie (bez monitora) i wymusza niską rozdzielczość.
-# Usuwamy go, żeby po restarcie X/Wayland wykrył monitor i ustawił natywną rozdzielczość.
-if [ -f /etc/X11/xorg.conf ]; then
-  log "Kopia xorg.conf -> xorg.conf.nvidia-boot-backup (przywróć ręcznie jeśli potrzeba)"
-  log_command cp /etc/X11/xorg.conf /etc/X11/xorg.conf.nvidia-boot-backup
-  log_command rm -f /etc/X11/xorg.conf
-  log "Usunięto xorg.conf – po restarcie rozdzielczość będzie wykryta automatycznie."
-fi
+    def remove_nvidia_libraries(self):
+        """Usuwa biblioteki NVIDIA (zgodnie z driver-manager-v2.sh – pełna lista). Na Fedorze także /usr/lib64 (instalator .run)."""
+        paths_rf = [
+            "/usr/lib/x86_64-linux-gnu/libnvidia*",
+            "/usr/lib/i386-linux-gnu/libnvidia*",
+            "/usr/lib32/libnvidia*",
+            "/usr/lib/nvidia*",
+            "/usr/lib32/nvidia*",
+            "/lib/x86_64-linux-gnu/libnvidia*",
+            "/lib/i386-linux-gnu/libnvidia*",
+        ]
+        is_fedora = self.system.distro_family == "fedora"
+        if is_fedora:
+            paths_rf.extend(["/usr/lib64/libnvidia*", "/usr/lib64/nvidia*"])
+        for path in paths_rf:
+            self.run_cmd(["rm", "-rf", path], sudo=True, silent=True)
+        paths_f = [
+            "/lib/x86_64-linux-gnu/*nvidia*.so*",
+            "/lib/i386-linux-gnu/*nvidia*.so*",
+            "/usr/lib/x86_64-linux-gnu/*nvidia*.so*",
+            "/usr/lib/i386-linux-gnu/*nvidia*.so*",
+            "/lib/x86_64-linux-gnu/libvdpau_nvidia*",
+            "/lib/i386-linux-gnu/libvdpau_nvidia*",
+            "/usr/lib/x86_64-linux-gnu/vdpau/libvdpau_nvidia*",
+            "/usr/lib/i386-linux-gnu/vdpau/libvdpau_nvidia*",
+            "/lib/libGL.so*",
+            "/lib/libEGL.so*",
+            "/lib/libGLX.so*",
+            "/lib/libGLES*.so*",
+            "/usr/bin/nvidia*",
+            "/usr/sbin/nvidia*",
+        ]
+        if is_fedora:
+            paths_f.extend(["/usr/lib64/*nvidia*.so*", "/usr/lib64/libvdpau_nvidia*"])
+        for path in paths_f:
+            self.run_cmd(["sh", "-c", f"rm -f {path}"], sudo=True, silent=True)
+        self.run_cmd(["ldconfig"], sudo=True, silent=True)
 
-log_command sh -c 'systemctl disable nvidia-run-install.service 2>/dev/null || true'
-log "Restart systemu za 5 sekund..."
-sleep 5
-reboot
-""".format(run_file=run_file_str, version=version, label=label, log_file=log_file_str)
+    def verify_nvidia_removal(self) -> bool:
+        """Weryfikuje usunięcie NVIDIA (ldconfig) – jak w .sh. Zwraca True jeśli OK."""
+        self.run_cmd(["ldconfig"], sudo=True, silent=True)
+        rc, output = self.run_cmd(["ldconfig", "-p"], sudo=False, silent=True)
+        if rc == 0 and "nvidia" in (output or "").lower():
+            self.log(self.window._tr("log_ldconfig_warning"), "WARN")
+            return False
+        return True
+    
+    def configure_nouveau_for_nvk(self):
+        """Konfiguruje nouveau dla NVK"""
+        self.run_cmd(["rm", "-f", "/etc/modprobe.d/blacklist-nouveau.conf"], sudo=True, silent=True)
+        
+        nouveau_conf = "/etc/modprobe.d/nouveau.conf"
+        content = "# generated by nvidia-manager-v2 (NVK)\noptions nouveau modeset=1\n"
+        self._install_file(content, nouveau_conf, "644")
+        
+        # Dodaj nouveau do initramfs-tools/modules (jak w .sh – z hasłem sudo)
+        # grep -q zwraca 1 gdy nie znajdzie – to oczekiwane, nie loguj jako błąd
+        modules_file = "/etc/initramfs-tools/modules"
+        if Path(modules_file).exists():
+            rc = self.system.run_command(["env", "LC_ALL=C", "grep", "-Fxq", "-m", "1", "nouveau", modules_file], sudo=False)[0]
+            if rc != 0:
+                self.run_cmd(["sh", "-c", f"echo nouveau >> {modules_file}"], sudo=True, silent=True)
+        
+        # Na Fedorze dracut wywołujemy po instalacji pakietów (z firmware), żeby initramfs zawierał GSP
+        if self.system.distro_family != "fedora":
+            self.rebuild_initramfs()
+    
+    def install_nvk_packages(self) -> bool:
+        """Instaluje pakiety NVK (Debian/Ubuntu: apt + PPA; Fedora: dnf)"""
+        if self.system.distro_family == "fedora":
+            packages = [
+                "nvidia-gpu-firmware",
+                "mesa-vulkan-drivers",
+                "mesa-dri-drivers",
+                "mesa-libEGL",
+                "mesa-libGL",
+                "vulkan-tools",
+                "xorg-x11-drv-nouveau",
+                "glx-utils",
+            ]
+            rc, _ = self.run_cmd([self.system.get_dnf_cmd(), "install", "-y"] + packages, sudo=True, timeout=3600)
+            return rc == 0
+        # Debian/Ubuntu: PPA bez własnego apt update (-n) i architektura i386 (tylko plik konfiguracyjny),
+        # potem jeden apt-get update – indeks pobierany raz i już z i386
+        self.run_cmd(["add-apt-repository", "-y", "-n", "ppa:kisak/kisak-mesa"], sudo=True, silent=True)
+        self.run_cmd(["dpkg", "--add-architecture", "i386"], sudo=True, silent=True)
+        self.run_cmd(["apt-get", "update", "-y"], sudo=True, silent=True)
+        packages = [
+            "mesa-vulkan-drivers",
+            "libgl1-mesa-dri",
+            "libegl-mesa0",
+            "libgles2",
+            "libglx-mesa0",
+            "mesa-utils",
+            "vulkan-tools",
+            "xserver-xorg-video-nouveau",
+        ]
+        rc, _ = self.run_cmd(["apt-get", "install", "-y"] + packages, sudo=True)
+        return rc == 0
+    
+    def _installed_package_names(self, is_fedora: bool) -> List[str]:
+        """Nazwy zainstalowanych pakietów (bez wersji i opisów): rpm --qf na Fedorze, dpkg-query na Debianie
+        (z kwalifikatorem :arch dla pakietów innej architektury, np. libgl1:i386)."""
+        if is_fedora:
+            rc, output = self.run_cmd(["rpm", "-qa", "--qf", "%{NAME}\n"], sudo=False, silent=True)
+            return output.split() if rc == 0 and output else []
+        rc, output = self.run_cmd(["dpkg-query", "-W", "-f=${db:Status-Abbrev}${binary:Package}\n"], sudo=False, silent=True)
+        if rc != 0 or not output:
+            return []
+        return [line[3:] for line in output.split("\n") if line.startswith("ii")]
 
-        tmp_script = Path("/tmp/install_script.sh")
-        with open(tmp_script, "w", encoding="utf-8") as f:
-            f.write(script_content)
-        self.run_cmd(["cp", str(tmp_script), str(script_path)], sudo=True, silent=True)
-        self.run_cmd(["chmod", "+x", str(script_path)], sudo=True, silent=True)
-        try:
-            tmp_script.unlink()
-        except OSError:
-            pass
+    def reinstall_plasma_and_mesa(self):
+        """Reinstaluje środowisko graficzne i Mesa (Plasma, Cinnamon, MATE, Xfce, GNOME). Debian: apt, Fedora: dnf. Jedna transakcja na środowisko + Mesa."""
+        distro = "fedora" if self.system.distro_family == "fedora" else "debian"
+        # Markery środowisk porównujemy z gołą nazwą – bez kwalifikatora :arch
+        names = [name.partition(":")[0] for name in self._installed_package_names(distro == "fedora")]
+        pkgs = []
+        for marker, de_pkgs in self._DE_TABLE[distro]:
+            if any(name.startswith(marker) for name in names):
+                pkgs.extend(de_pkgs)
+                break
+        pkgs.extend(self._MESA_REINSTALL[distro])
+        if distro == "fedora":
+            self.run_cmd([self.system.get_dnf_cmd(), "reinstall", "-y"] + pkgs, sudo=True, silent=True)
+        else:
+            self.run_cmd(["apt-get", "install", "-y", "--reinstall"] + pkgs, sudo=True, silent=True)
+    
+    def configure_sddm_for_wayland(self):
+        """Konfiguruje SDDM dla Wayland (jak w .sh – backup i usunięcie Session=plasma.desktop)"""
+        sddm_conf = "/etc/sddm.conf"
+        if Path(sddm_conf).exists():
+            self.run_cmd(["cp", sddm_conf, f"{sddm_conf}.bak.{int(time.time())}"],
+                        sudo=True, silent=True)
+            self.run_cmd(["sed", "-i", "/Session=plasma.desktop/d", sddm_conf], sudo=True, silent=True)
+    
+    def verify_nvk_installation(self):
+        """Weryfikuje instalację NVK (sprawdzenie pakietów NVIDIA i ldconfig). Debian: dpkg, Fedora: rpm. Na Fedorze 1 pakiet (firmware) i ldconfig → INFO zamiast WARN."""
+        is_fedora = self.system.distro_family == "fedora"
+        nvidia_pkgs = self.system.query_installed_packages("*nvidia*")
+        if nvidia_pkgs:
+            if is_fedora and len(nvidia_pkgs) == 1 and "nvidia-gpu-firmware" in nvidia_pkgs[0]:
+                self.log(self.window._tr("log_nvidia_firmware_kept"), "INFO")
+            else:
+                self.log(self.window._tr("log_nvidia_pkgs_warning").format(len(nvidia_pkgs)), "WARN")
+        rc2, ld_out = self.run_cmd(["ldconfig", "-p"], sudo=False, silent=True)
+        if rc2 == 0 and ld_out and "nvidia" in ld_out.lower():
+            if is_fedora:
+                self.log(self.window._tr("log_ldconfig_firmware_ok"), "INFO")
+            else:
+                self.log(self.window._tr("log_ldconfig_warning"), "WARN")
+        self.run_cmd(["ldconfig"], sudo=True, silent=True)
+    
+    def block_nouveau(self):
+        """Blokuje nouveau"""
+        content = "blacklist nouveau\noptions nouveau modeset=0\n"
+        self._install_file(content, "/etc/modprobe.d/blacklist-nouveau.conf", "644")
+    
+    def rebuild_initramfs(self):
+        """Przebudowuje initramfs (Debian/Ubuntu: update-initramfs, Fedora: dracut)"""
+        self.log(self.window._tr("log_updating_initramfs"), "INFO")
+        if self.system.distro_family == "fedora":
+            self.run_cmd(["dracut", "--force"], sudo=True, silent=True)
+        else:
+            self.run_cmd(["update-initramfs", "-u", "-k", "all"], sudo=True, silent=True)
+    
+    def generate_install_script(self, version: str, label: str, run_file: Path, log_file: Optional[str] = None):
+        """Generuje skrypt instalacyjny (Debian: 5-fazowy z DKMS; Fedora: bez DKMS, z dracut). log_file=None → LOG_DIR; przy instalacji na boot podaj np. /var/log/nvidia-run-install.log."""
+        script_path = INSTALL_SCRIPT_DIR / "run-install-v2.sh"
+        log_file_str = log_file if log_file is not None else str(LOG_DIR / "run-install-v2.log")
+        tmpl = _FEDORA_SCRIPT_TMPL if self.system.distro_family == "fedora" else _DEBIAN_SCRIPT_TMPL
+        script_content = tmpl.substitute(run_file=str(run_file), version=version, label=label, log_file=log_file_str)
+        self._install_file(script_content, str(script_path), "755")
 
     def generate_systemd_service(self):
         """Generuje systemd service – ExecStart wskazuje skrypt w katalogu systemowym (SELinux)."""
@@ -2281,15 +2547,10 @@ Environment=HOME=/root
 WantedBy=multi-user.target
 """
         
-        tmp_service = Path("/tmp/nvidia_service.service")
-        with open(tmp_service, "w") as f:
-            f.write(service_content)
-        
-        self.run_cmd(["cp", str(tmp_service), service_path], sudo=True, silent=True)
-        self.run_cmd(["chmod", "644", service_path], sudo=True, silent=True)
-        self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
-        self.run_cmd(["systemctl", "enable", "nvidia-run-install.service"], sudo=True, silent=True)
-        tmp_service.unlink()
+        # Ta sama treść unitu → bez zapisu i daemon-reload; enable sprawdzane osobno (skrypt sam wyłącza serwis po uruchomieniu)
+        if self._install_file(service_content, service_path, "644") is not None:
+            self.run_cmd(["systemctl", "daemon-reload"], sudo=True, silent=True)
+        self._enable_unit("nvidia-run-install.service")
 
 
 # ============================================================================
@@ -2299,9 +2560,24 @@ WantedBy=multi-user.target
 class ScalableLogoLabel(QLabel):
     """QLabel z logo – przy zmianie rozmiaru skaluje pixmapę, zachowując proporcje."""
     
+    _CACHE_SIZE = 3  # ostatnie rozmiary (np. przełączanie maksymalizacji w tę i z powrotem)
+    
     def __init__(self, pixmap: QPixmap, parent=None):
         super().__init__(parent)
         self._original = pixmap
+        self._cache: Dict[Tuple[int, int], QPixmap] = {}  # tylko wersje wygładzone
+        self._last_size: Optional[Tuple[int, int]] = None
+        self._last_smooth = False
+        # Zdarzenia resize podczas przeciągania łączone w jedno szybkie skalowanie na klatkę (~60 Hz)
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(16)
+        self._resize_timer.timeout.connect(lambda: self._update_pixmap(smooth=False))
+        # Po 80 ms bez zmian rozmiaru – końcowe, wygładzone skalowanie
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(80)
+        self._settle_timer.timeout.connect(self._update_pixmap)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("padding: 8px;")
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -2310,26 +2586,108 @@ class ScalableLogoLabel(QLabel):
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self._update_pixmap()
+        self._resize_timer.start()
+        self._settle_timer.start()
     
-    def _update_pixmap(self):
-        if self._original.isNull():
-            return
-        w = max(40, self.width() - 16)
-        h = max(30, self.height() - 16)
-        scaled = self._original.scaled(
-            w, h,
-            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        # Wycięcie środka, żeby wypełnić cały obszar (cover)
+    def _scaled(self, w: int, h: int, mode) -> QPixmap:
+        scaled = self._original.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatioByExpanding, mode)
+        # Wycięcie środka, żeby wypełnić cały obszar (cover); przy pasujących proporcjach bez kopii
         if scaled.width() > w or scaled.height() > h:
             x = max(0, (scaled.width() - w) // 2)
             y = max(0, (scaled.height() - h) // 2)
             scaled = scaled.copy(x, y, w, h)
+        return scaled
+    
+    def _update_pixmap(self, smooth: bool = True):
+        if self._original.isNull():
+            return
+        w = max(40, self.width() - 16)
+        h = max(30, self.height() - 16)
+        size = (w, h)
+        if size == self._last_size and (self._last_smooth or not smooth):
+            return
+        scaled = self._cache.pop(size, None)
+        if scaled is not None:
+            smooth = True
+        elif smooth:
+            scaled = self._scaled(w, h, Qt.TransformationMode.SmoothTransformation)
+            if len(self._cache) >= self._CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+        else:
+            # W trakcie przeciągania różnica jakości jest niewidoczna – najbliższy sąsiad, bez cache
+            scaled = self._scaled(w, h, Qt.TransformationMode.FastTransformation)
+        if smooth:
+            self._cache[size] = scaled  # na koniec słownika = najświeższy (LRU)
+        self._last_size = size
+        self._last_smooth = smooth
         self.setPixmap(scaled)
 
 
+# ============================================================================
+# USTAWIENIA – QSettings z pamięcią podręczną
+# ============================================================================
+
+class CachedSettings:
+    """QSettings wczytane raz do słownika; setValue zmienia tylko pamięć, zapis do pliku dopiero w flush()."""
+    
+    def __init__(self, organization: str, application: str):
+        self._qs = QSettings(organization, application)
+        self._values: Dict[str, object] = {key: self._qs.value(key) for key in self._qs.allKeys()}
+        self._dirty = set()
+    
+    @staticmethod
+    def _coerce(val, type_):
+        # Backend INI zwraca napisy ("true", "1200") – konwersja jak w QSettings.value(..., type=...)
+        if type_ is bool and isinstance(val, str):
+            return val.strip().lower() in ("true", "1")
+        return type_(val)
+    
+    def value(self, key: str, default=None, type=None):
+        val = self._values.get(key)
+        if val is None:
+            return default
+        if type is None or isinstance(val, type):
+            return val
+        try:
+            return self._coerce(val, type)
+        except (TypeError, ValueError):
+            return default
+    
+    def child_items(self, group: str) -> Dict[str, object]:
+        """Klucze bezpośrednio w grupie (jak beginGroup + childKeys) z pełnymi nazwami – jeden przebieg po pamięci."""
+        prefix = group + "/"
+        return {
+            key: val for key, val in self._values.items()
+            if val is not None and key.startswith(prefix) and "/" not in key[len(prefix):]
+        }
+    
+    def setValue(self, key: str, val):
+        old = self._values.get(key)
+        if old is not None:
+            try:
+                if old == val or self._coerce(old, type(val)) == val:
+                    return
+            except (TypeError, ValueError):
+                pass
+        self._values[key] = val
+        self._dirty.add(key)
+    
+    def clear(self):
+        self._values.clear()
+        self._dirty.clear()
+        self._qs.clear()
+        self._qs.sync()
+    
+    def flush(self):
+        """Zapisuje zmienione klucze do QSettings i robi jeden sync()."""
+        if not self._dirty:
+            return
+        for key in self._dirty:
+            self._qs.setValue(key, self._values[key])
+        self._dirty.clear()
+        self._qs.sync()
+
+
 # ============================================================================
 # GŁÓWNE OKNO APLIKACJI
 # ============================================================================
@@ -2337,31 +2695,94 @@ class ScalableLogoLabel(QLabel):
 class DriverManagerWindow(QMainWindow):
     """Główne okno aplikacji"""
     
+    error_report_saved = Signal(str, str)  # (ścieżka, błąd) – z _ErrorReportRunnable
+    backups_pruned = Signal(list)  # nazwy usuniętych backupów – z _PruneBackupsRunnable
+    diagnostic_done = Signal(str, str)  # (plik, błąd) – z _DiagnosticRunnable
+    log_saved = Signal(str, str)  # (plik, błąd) – z _SaveLogRunnable
+    # poziom: (kolor, prefiks)
+    _LEVELS = {
+        "INFO": ("#2196F3", "ℹ"),
+        "SUCCESS": ("#4CAF50", "✓"),
+        "WARN": ("#FFC107", "⚠"),
+        "ERROR": ("#F44336", "✗"),
+        "DEBUG": ("#00BCD4", "[DEBUG]"),
+    }
+    # Stałe fragmenty linii logu HTML: (początek przed znacznikiem czasu, środek przed wiadomością)
+    _LEVEL_TEMPLATE = {
+        lvl: (f'<span style="color: {c};">[', f'] [{lvl}] {p} ') for lvl, (c, p) in _LEVELS.items()
+    }
+    _ts_cache_key = -1
+    _ts_cache = ""
+    
     def __init__(self):
         super().__init__()
         self.system = SystemManager()
+        self._error_probe_cache: Optional[Tuple[float, Dict]] = None  # (time.monotonic(), dkms/lsmod) dla raportów błędów
+        self._last_err_ts = 0.0
+        self._askpass_path: Optional[str] = None  # skrypt askpass dla sudo -A (jeden na sesję)
+        self.error_report_saved.connect(self._on_error_report_saved)
+        self.backups_pruned.connect(self._on_backups_pruned)
+        self.diagnostic_done.connect(self._on_diagnostic_done)
+        self.log_saved.connect(self._on_log_saved)
+        self._async_procs = set()  # QProcess uruchomione przez _run_async (zatrzymywane przy zamknięciu)
         self.versions = {}
         self.current_log_file = None
-        self.settings = QSettings("NVIDIADriverManager", "DriverManager")
-        self._lang = self.settings.value("language", "en", type=str)
-        if self._lang not in TRANSLATIONS:
-            self._lang = "en"
+        self._log_fh = None  # otwarty raz w start_log (bufor 64 KB), flush przy WARN/ERROR i zamknięciu
+        self._log_file_broken = False  # zapis do pliku logu się nie powiódł – pomijamy do następnego start_log
+        # Linie do okna logów zbierane i dopisywane jednym appendHtml co 33 ms (~30 fps) – seria z instalatora = jeden layout
+        self._log_buffer = deque()
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(33)
+        self._log_flush_timer.timeout.connect(self._flush_log_buffer)
+        self.settings = CachedSettings("NVIDIADriverManager", "DriverManager")
+        # Zmiany z menu (język, czcionka, motyw, przełączniki) – do QSettings dopiero w save_settings()
+        self._pending_settings: Dict[str, object] = {}
+        lang = self.settings.value("language", "en", type=str)
+        self._set_lang(lang if lang in TRANSLATIONS else "en")
+        self._repo_ver = self._repo_latest = None  # wersje sterownika z repo – znane po load_system_info
         self._install_thread = None  # wątek instalacji – czekamy na niego przy zamykaniu
-        self._sudo_password = None  # hasło z okna Qt – przekazywane do wątku (sudo -S), czyszczone po zakończeniu
+        self.install_progress_bar: Optional[QProgressBar] = None  # tworzony w create_right_panel
+        self._install_ctx: Tuple[Optional[Tuple[str, str]], Optional[str]] = (None, None)  # (historia, komunikat) dla _on_install_finished
+        self._sysinfo_thread: Optional[SystemInfoThread] = None
+        self._apt_cache = None  # apt.Cache (python-apt) dla _check_new_versions; False – niedostępny
+        self._apt_cache_ts = 0.0
+        # check_requirements: (typ, kernel, rodzina) -> (ok, problemy); czyszczone po instalacji i przy odświeżeniu
+        self._req_cache: Dict[Tuple[str, str, str], Tuple[bool, List[str]]] = {}
+        self._sudo_password: Optional[str] = None  # hasło z okna Qt – przekazywane do wątku (sudo -S), czyszczone po zakończeniu
+        # Przeładowanie informacji po zmianie języka – seria kliknięć łączona w jedno, świeże dane (< 5 s) nie są sondowane ponownie
+        self._last_sysinfo_ts = 0.0
+        self._sysinfo_reload_timer = QTimer(self)
+        self._sysinfo_reload_timer.setSingleShot(True)
+        self._sysinfo_reload_timer.setInterval(150)
+        self._sysinfo_reload_timer.timeout.connect(self._maybe_reload_sysinfo)
         self.init_ui()
         self.load_settings()
+        # Monitoring GPU – jeden długo działający `nvidia-smi -lms 2000` (próbki czytane przez QSocketNotifier);
+        # timer co 2 s tylko pilnuje procesu. Można wstrzymać w menu Ustawienia.
+        self._smi_proc: Optional[subprocess.Popen] = None
+        self._smi_notifier: Optional[QSocketNotifier] = None
+        self._smi_pending = b""  # niepełna linia z nvidia-smi
+        self._gpu_sample: Optional[Tuple[str, str, str, str, str]] = None  # (temp, użycie, VRAM użyte, VRAM razem, moc)
+        self._last_gpu_values = None  # (próbka, formaty) ostatnio pokazane w etykietach
+        self._nvml_handle = None  # uchwyt GPU 0 z pynvml (gdy dostępne) – wtedy bez procesu nvidia-smi
+        self._nvml_tried = False
+        self._gpu_monitor_timer = QTimer(self)
+        self._gpu_monitor_timer.timeout.connect(self._update_gpu_monitor)
+        self._deferred_done = False  # showEvent przed _deferred_init nie uruchamia jeszcze monitora
+        # Sondy systemu i monitor GPU startują w _deferred_init – po pierwszym narysowaniu okna (main)
+    
+    def _deferred_init(self):
+        """Dalsza inicjalizacja po pokazaniu okna: informacje o systemie, monitor GPU, sprawdzanie wersji."""
         self.load_system_info()
         # Sprawdzenie nowych wersji w tle (po 8 s)
         if not DEMO_MODE:
             QTimer.singleShot(8000, self._check_new_versions)
-        # Monitoring GPU – odświeżanie co 2 s (można wstrzymać w menu Ustawienia)
-        self._gpu_monitor_timer = QTimer(self)
-        self._gpu_monitor_timer.timeout.connect(self._update_gpu_monitor)
-        QTimer.singleShot(500, self._update_gpu_monitor)
-        self._gpu_monitor_timer.start(2000)
+        self._deferred_done = True
         if self.settings.value("gpu_monitor_paused", False, type=bool):
-            self._gpu_monitor_timer.stop()
             self._set_gpu_monitor_na()
+        else:
+            self._sync_gpu_monitor_timer()
     
     def init_ui(self):
         """Inicjalizuje interfejs użytkownika"""
@@ -2405,6 +2826,7 @@ class DriverManagerWindow(QMainWindow):
         self.statusBar().addWidget(self.status_update_label, 1)
         self.statusBar().addWidget(QWidget(), 1)
         self.status_update_label.hide()
+        self._register_widgets()
     
     def _set_status_update_message(self, text: str):
         """Ustawia lub czyści wyśrodkowany komunikat o aktualizacji w pasku statusu."""
@@ -2424,16 +2846,23 @@ class DriverManagerWindow(QMainWindow):
     
     def _tr(self, key: str) -> str:
         """Zwraca tłumaczenie dla bieżącego języka."""
-        return TRANSLATIONS.get(self._lang, TRANSLATIONS["en"]).get(key, key)
+        return self._tr_table.get(key, key)
+    
+    def _set_lang(self, lang: str):
+        """Ustawia bieżący język i wiąże jego tabelę tłumaczeń."""
+        self._lang = lang
+        self._tr_table = _TR_TABLES[lang]
+        # Formaty etykiet monitora GPU – używane przy każdej próbce
+        t = self._tr_table
+        self._gpu_fmts = (t["gpu_temp_fmt"], t["gpu_usage_fmt"], t["gpu_vram_fmt"], t["gpu_power_fmt"])
     
     def _set_language(self, lang: str):
         """Ustawia język UI i odświeża menu oraz panele."""
         if lang not in TRANSLATIONS or lang == self._lang:
             return
-        self._lang = lang
-        self.settings.setValue("language", lang)
-        self.menuBar().clear()
-        self.create_menu_bar()
+        self._set_lang(lang)
+        self._pending_settings["language"] = lang
+        self._retranslate_menus()
         self.setWindowTitle(self._tr("window_title"))
         # Wyczyść komunikat o aktualizacji w środku paska statusu
         self._set_status_update_message("")
@@ -2444,178 +2873,215 @@ class DriverManagerWindow(QMainWindow):
         """Odświeża panele w nowym języku, czyści log i przeładowuje informacje (jak „Odśwież informacje”)."""
         self._retranslate_panels()
         # Wyczyść okno logów i przeładuj informacje – wtedy wszystkie komunikaty i etykiety są w nowym języku
-        if hasattr(self, "log_text"):
-            self.log_text.clear()
+        self._clear_log_view()
+        self._sysinfo_reload_timer.start()
+    
+    def _maybe_reload_sysinfo(self):
+        """load_system_info po zmianie języka – pomijane, gdy dane mają mniej niż 5 s (etykiety odświeżył już _retranslate_panels)."""
+        if time.monotonic() - self._last_sysinfo_ts < 5:
+            return
         self.load_system_info()
-        # Wymuś przerysowanie
-        self.update()
-        QApplication.processEvents()
     
     def _retranslate_panels(self):
         """Odświeża tytuły grup, przyciski i status po zmianie języka."""
-        if hasattr(self, "info_group"):
-            self.info_group.setTitle(self._tr("group_info"))
-        if hasattr(self, "gpu_monitor_group"):
-            self.gpu_monitor_group.setTitle(self._tr("group_gpu_params"))
-        if hasattr(self, "install_group"):
-            self.install_group.setTitle(self._tr("group_install"))
-        if hasattr(self, "log_group"):
-            self.log_group.setTitle(self._tr("group_logs"))
-        if hasattr(self, "btn_clear_log"):
-            self.btn_clear_log.setText(self._tr("btn_clear_log"))
-            self.btn_clear_log.setToolTip(self._tr("tt_clear_log"))
-        if hasattr(self, "btn_save_log"):
-            self.btn_save_log.setText(self._tr("btn_save_log"))
-            self.btn_save_log.setToolTip(self._tr("tt_save_log"))
-        if hasattr(self, "btn_open_log_dir"):
-            self.btn_open_log_dir.setText(self._tr("btn_open_log_dir"))
-            self.btn_open_log_dir.setToolTip(self._tr("tt_open_log_dir"))
-        if hasattr(self, "statusBar"):
+        with self._updates_frozen():
+            for setter, key, arg_getter in self._retranslatable:
+                if arg_getter is None:
+                    setter(self._tr(key))
+                    continue
+                arg = arg_getter()
+                if arg is not None:  # wersja jeszcze nieznana – zostaje tekst z „…”
+                    setter(self._tr(key).format(arg))
             self.statusBar().showMessage(self._tr("status_ready"))
-        if hasattr(self, "distro_label") and hasattr(self, "system"):
             self._update_system_info_labels()
-        if hasattr(self, "gpu_temp_label"):
             self._update_gpu_monitor()
-        # Przyciski instalacji (NVK, repo, .run)
-        if hasattr(self, "btn_nvk"):
-            self.btn_nvk.setText(self._tr("btn_nvk_text"))
-        if hasattr(self, "btn_repo") and getattr(self, "_repo_ver", None) is not None:
-            self.btn_repo.setText(self._tr("btn_repo_fmt").format(self._repo_ver))
-            self.btn_repo.setToolTip(self._tr("tt_repo_ver").format(self._repo_ver))
-        if hasattr(self, "btn_repo_latest") and getattr(self, "_repo_latest", None) is not None:
-            self.btn_repo_latest.setText(self._tr("btn_repo_latest_fmt").format(self._repo_latest))
-            self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest_ver").format(self._repo_latest))
-        if hasattr(self, "versions") and self.versions:
-            if hasattr(self, "btn_run_prod"):
-                self.btn_run_prod.setText(self._tr("btn_run_prod_fmt").format(self.versions.get("production", "")))
-                self.btn_run_prod.setToolTip(self._tr("tt_run_prod_ver").format(self.versions.get("production", "")))
-            if hasattr(self, "btn_run_newf"):
-                self.btn_run_newf.setText(self._tr("btn_run_newf_fmt").format(self.versions.get("new_feature", "")))
-                self.btn_run_newf.setToolTip(self._tr("tt_run_newf_ver").format(self.versions.get("new_feature", "")))
-            if hasattr(self, "btn_run_beta"):
-                self.btn_run_beta.setText(self._tr("btn_run_beta_fmt").format(self.versions.get("beta", "")))
-                self.btn_run_beta.setToolTip(self._tr("tt_run_beta_ver").format(self.versions.get("beta", "")))
-            if hasattr(self, "btn_run_legacy"):
-                self.btn_run_legacy.setText(self._tr("btn_run_legacy_fmt").format(self.versions.get("legacy", "")))
-                self.btn_run_legacy.setToolTip(self._tr("tt_run_legacy_ver").format(self.versions.get("legacy", "")))
+    
+    @contextmanager
+    def _updates_frozen(self):
+        """Wstrzymuje odświeżanie okna i menu na czas serii zmian – jeden repaint na końcu. Zagnieżdżone wywołanie nie odmraża za wcześnie."""
+        widgets = [w for w in (self.centralWidget(), self.menuBar()) if w.updatesEnabled()]
+        for w in widgets:
+            w.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            for w in widgets:
+                w.setUpdatesEnabled(True)
+    
+    def _register_widgets(self):
+        """Tabele widżetów do tłumaczenia (setter, klucz, źródło argumentu formatu) i do zmiany czcionki – budowane raz w init_ui."""
+        def run_ver(kind):
+            return lambda: self.versions.get(kind)
+        self._retranslatable = [
+            (self.info_group.setTitle, "group_info", None),
+            (self.gpu_monitor_group.setTitle, "group_gpu_params", None),
+            (self.install_group.setTitle, "group_install", None),
+            (self.log_group.setTitle, "group_logs", None),
+            (self.btn_clear_log.setText, "btn_clear_log", None),
+            (self.btn_clear_log.setToolTip, "tt_clear_log", None),
+            (self.btn_save_log.setText, "btn_save_log", None),
+            (self.btn_save_log.setToolTip, "tt_save_log", None),
+            (self.btn_open_log_dir.setText, "btn_open_log_dir", None),
+            (self.btn_open_log_dir.setToolTip, "tt_open_log_dir", None),
+            # Przyciski instalacji (NVK, repo, .run)
+            (self.btn_nvk.setText, "btn_nvk_text", None),
+            (self.btn_repo.setText, "btn_repo_fmt", lambda: self._repo_ver),
+            (self.btn_repo.setToolTip, "tt_repo_ver", lambda: self._repo_ver),
+            (self.btn_repo_latest.setText, "btn_repo_latest_fmt", lambda: self._repo_latest),
+            (self.btn_repo_latest.setToolTip, "tt_repo_latest_ver", lambda: self._repo_latest),
+            (self.btn_run_prod.setText, "btn_run_prod_fmt", run_ver("production")),
+            (self.btn_run_prod.setToolTip, "tt_run_prod_ver", run_ver("production")),
+            (self.btn_run_newf.setText, "btn_run_newf_fmt", run_ver("new_feature")),
+            (self.btn_run_newf.setToolTip, "tt_run_newf_ver", run_ver("new_feature")),
+            (self.btn_run_beta.setText, "btn_run_beta_fmt", run_ver("beta")),
+            (self.btn_run_beta.setToolTip, "tt_run_beta_ver", run_ver("beta")),
+            (self.btn_run_legacy.setText, "btn_run_legacy_fmt", run_ver("legacy")),
+            (self.btn_run_legacy.setToolTip, "tt_run_legacy_ver", run_ver("legacy")),
+        ]
+        # Jawna czcionka na przyciskach i etykietach (StyleSheet może nadpisywać dziedziczenie)
+        self._fontable = [
+            self.log_text,
+            self.gpu_label, self.driver_label, self.distro_label, self.kernel_label,
+            self.btn_nvk, self.btn_repo, self.btn_repo_latest,
+            self.btn_run_prod, self.btn_run_newf, self.btn_run_beta, self.btn_run_legacy,
+            self.btn_clear_log, self.btn_save_log, self.btn_open_log_dir,
+        ]
     
     def create_menu_bar(self):
         """Tworzy menu bar z ustawieniami"""
         menubar = self.menuBar()
+        # (QAction, klucz tekstu, klucz podpowiedzi) – przy zmianie języka tłumaczone w miejscu, bez przebudowy menu
+        self._menu_items = []
+        add_menu = self._add_menu
+        add_action = self._add_menu_action
         
         # Menu Ustawienia
-        settings_menu = menubar.addMenu(self._tr("menu_settings"))
+        settings_menu = add_menu(menubar, "menu_settings")
         settings_menu.setToolTipsVisible(True)
         
         # Wybór czcionki
-        font_action = settings_menu.addAction(self._tr("menu_font"))
-        font_action.triggered.connect(self.choose_font)
-        font_action.setToolTip(self._tr("font_tooltip"))
+        add_action(settings_menu, "menu_font", self.choose_font, "font_tooltip")
         
         # Motyw kolorystyczny
-        theme_menu = settings_menu.addMenu(self._tr("menu_theme"))
-        light_action = theme_menu.addAction(self._tr("theme_light"))
-        light_action.triggered.connect(lambda: self.set_theme("light"))
-        light_action.setToolTip(self._tr("theme_light_tt"))
-        
-        dark_action = theme_menu.addAction(self._tr("theme_dark"))
-        dark_action.triggered.connect(lambda: self.set_theme("dark"))
-        dark_action.setToolTip(self._tr("theme_dark_tt"))
+        theme_menu = add_menu(settings_menu, "menu_theme")
+        add_action(theme_menu, "theme_light", lambda: self.set_theme("light"), "theme_light_tt")
+        add_action(theme_menu, "theme_dark", lambda: self.set_theme("dark"), "theme_dark_tt")
         
         # Język
-        lang_menu = settings_menu.addMenu(self._tr("menu_language"))
-        pl_action = lang_menu.addAction(self._tr("lang_pl"))
-        pl_action.triggered.connect(lambda: self._set_language("pl"))
-        en_action = lang_menu.addAction(self._tr("lang_en"))
-        en_action.triggered.connect(lambda: self._set_language("en"))
+        lang_menu = add_menu(settings_menu, "menu_language")
+        add_action(lang_menu, "lang_pl", lambda: self._set_language("pl"))
+        add_action(lang_menu, "lang_en", lambda: self._set_language("en"))
         
         settings_menu.addSeparator()
         
         # Sprawdzaj aktualizacje w tle (zapisywane w ustawieniach) – domyślnie włączone
-        self._action_check_updates = settings_menu.addAction(self._tr("action_check_updates"))
+        self._action_check_updates = add_action(settings_menu, "action_check_updates", self._toggle_check_updates,
+                                                "action_check_updates_tt")
         self._action_check_updates.setCheckable(True)
         self._action_check_updates.setChecked(True)  # domyślnie zaznaczone (nadpisze load_settings jeśli brak klucza)
-        self._action_check_updates.triggered.connect(self._toggle_check_updates)
-        self._action_check_updates.setToolTip(self._tr("action_check_updates_tt"))
         
         # Wstrzymaj monitoring GPU (zapisywane w ustawieniach)
-        self._action_gpu_monitor_paused = settings_menu.addAction(self._tr("action_gpu_paused"))
+        self._action_gpu_monitor_paused = add_action(settings_menu, "action_gpu_paused", self._toggle_gpu_monitor,
+                                                     "action_gpu_paused_tt")
         self._action_gpu_monitor_paused.setCheckable(True)
-        self._action_gpu_monitor_paused.triggered.connect(self._toggle_gpu_monitor)
-        self._action_gpu_monitor_paused.setToolTip(self._tr("action_gpu_paused_tt"))
         
         settings_menu.addSeparator()
         
         # Export/Import konfiguracji
-        export_action = settings_menu.addAction(self._tr("export_config"))
-        export_action.triggered.connect(self.export_config)
-        export_action.setToolTip(self._tr("export_config_tt"))
-        import_action = settings_menu.addAction(self._tr("import_config"))
-        import_action.triggered.connect(self.import_config)
-        import_action.setToolTip(self._tr("import_config_tt"))
-        
-        save_action = settings_menu.addAction(self._tr("save_settings"))
-        save_action.triggered.connect(self._save_settings_now)
-        save_action.setToolTip(self._tr("save_settings_tt"))
+        add_action(settings_menu, "export_config", self.export_config, "export_config_tt")
+        add_action(settings_menu, "import_config", self.import_config, "import_config_tt")
+        add_action(settings_menu, "save_settings", self._save_settings_now, "save_settings_tt")
         
         settings_menu.addSeparator()
         
         # Resetuj ustawienia
-        reset_action = settings_menu.addAction(self._tr("reset_settings"))
-        reset_action.triggered.connect(self.reset_settings)
-        reset_action.setToolTip(self._tr("reset_settings_tt"))
+        add_action(settings_menu, "reset_settings", self.reset_settings, "reset_settings_tt")
         
         settings_menu.addSeparator()
         
         # Informacje
-        about_action = settings_menu.addAction(self._tr("about_action"))
-        about_action.triggered.connect(self.show_about)
-        about_action.setToolTip(self._tr("about_action_tt"))
-        
-        # Menu Narzędzia
-        tools_menu = menubar.addMenu(self._tr("menu_tools"))
-        tools_menu.setToolTipsVisible(True)
-        a8 = tools_menu.addAction(self._tr("tool_status"))
-        a8.triggered.connect(self.show_status)
-        a8.setToolTip(self._tr("tool_status_tt"))
-        a9 = tools_menu.addAction(self._tr("tool_diagnostic"))
-        a9.triggered.connect(self.run_diagnostic)
-        a9.setToolTip(self._tr("tool_diagnostic_tt"))
-        a10 = tools_menu.addAction(self._tr("tool_deps"))
-        a10.triggered.connect(self.check_and_install_dependencies)
-        a10.setToolTip(self._tr("tool_deps_tt"))
-        a11 = tools_menu.addAction(self._tr("tool_history"))
-        a11.triggered.connect(self.show_install_history)
-        a11.setToolTip(self._tr("tool_history_tt"))
-        a12 = tools_menu.addAction(self._tr("tool_refresh"))
-        a12.triggered.connect(self.load_system_info)
-        a12.setToolTip(self._tr("tool_refresh_tt"))
-        a13 = tools_menu.addAction(self._tr("tool_backup"))
-        a13.triggered.connect(self.show_backup_dialog)
-        a13.setToolTip(self._tr("tool_backup_tt"))
-        a14 = tools_menu.addAction(self._tr("tool_uninstall"))
-        a14.triggered.connect(self.uninstall_nvidia_only)
-        a14.setToolTip(self._tr("tool_uninstall_tt"))
-        a15 = tools_menu.addAction(self._tr("tool_upgrade_repo"))
-        a15.triggered.connect(self.upgrade_repo_driver)
-        a15.setToolTip(self._tr("tool_upgrade_repo_tt"))
+        add_action(settings_menu, "about_action", self.show_about, "about_action_tt")
+        
+        # Menu Narzędzia – akcje dodawane przy pierwszym otwarciu
+        self._tools_menu = add_menu(menubar, "menu_tools")
+        self._tools_menu.setToolTipsVisible(True)
+        self._tools_menu.aboutToShow.connect(self._populate_tools_menu_once)
+    
+    def _add_menu(self, parent, key: str):
+        menu = parent.addMenu(self._tr(key))
+        self._menu_items.append((menu.menuAction(), key, None))
+        return menu
+    
+    def _add_menu_action(self, menu, key: str, slot, tt_key: Optional[str] = None):
+        action = menu.addAction(self._tr(key))
+        action.triggered.connect(slot)
+        if tt_key:
+            action.setToolTip(self._tr(tt_key))
+        self._menu_items.append((action, key, tt_key))
+        return action
+    
+    def _populate_tools_menu_once(self):
+        """Wypełnia menu Narzędzia przy pierwszym otwarciu (w bieżącym języku) i odłącza się od aboutToShow."""
+        self._tools_menu.aboutToShow.disconnect(self._populate_tools_menu_once)
+        for key, slot in (
+            ("tool_status", self.show_status),
+            ("tool_diagnostic", self.run_diagnostic),
+            ("tool_deps", self.check_and_install_dependencies),
+            ("tool_history", self.show_install_history),
+            ("tool_refresh", self._refresh_system_info),
+            ("tool_backup", self.show_backup_dialog),
+            ("tool_uninstall", self.uninstall_nvidia_only),
+            ("tool_upgrade_repo", self.upgrade_repo_driver),
+        ):
+            self._add_menu_action(self._tools_menu, key, slot, f"{key}_tt")
+    
+    def _retranslate_menus(self):
+        """Podmienia teksty i podpowiedzi istniejących akcji menu (bez niszczenia akcji i ponownego łączenia sygnałów)."""
+        for action, key, tt_key in self._menu_items:
+            action.setText(self._tr(key))
+            if tt_key:
+                action.setToolTip(self._tr(tt_key))
     
     def _toggle_check_updates(self):
-        """Włącza/wyłącza sprawdzanie aktualizacji w tle (zapis w ustawieniach)."""
-        on = self._action_check_updates.isChecked()
-        self.settings.setValue("check_updates", on)
+        """Włącza/wyłącza sprawdzanie aktualizacji w tle (zapis w ustawieniach przy zamknięciu)."""
+        self._pending_settings["check_updates"] = self._action_check_updates.isChecked()
     
     def _toggle_gpu_monitor(self):
-        """Wstrzymuje/wznawia monitoring GPU (zapis w ustawieniach)."""
+        """Wstrzymuje/wznawia monitoring GPU (zapis w ustawieniach przy zamknięciu)."""
         paused = self._action_gpu_monitor_paused.isChecked()
-        self.settings.setValue("gpu_monitor_paused", paused)
+        self._pending_settings["gpu_monitor_paused"] = paused
         if hasattr(self, "_gpu_monitor_timer"):
             if paused:
                 self._gpu_monitor_timer.stop()
+                self._stop_smi_proc()
                 self._set_gpu_monitor_na()
             else:
-                self._gpu_monitor_timer.start(2000)
-                self._update_gpu_monitor()
+                self._sync_gpu_monitor_timer()
+    
+    def _sync_gpu_monitor_timer(self):
+        """Monitoring GPU działa tylko, gdy okno jest widoczne, niezminimalizowane i monitoring nie jest wstrzymany."""
+        if not getattr(self, "_deferred_done", False):
+            return
+        active = self.isVisible() and not self.isMinimized() and not self._action_gpu_monitor_paused.isChecked()
+        if active and not self._gpu_monitor_timer.isActive():
+            self._gpu_monitor_timer.start(2000)
+            self._update_gpu_monitor()  # od razu świeże dane po przywróceniu okna
+        elif not active and self._gpu_monitor_timer.isActive():
+            self._gpu_monitor_timer.stop()
+            self._stop_smi_proc()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sync_gpu_monitor_timer()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._sync_gpu_monitor_timer()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._sync_gpu_monitor_timer()
     
     def load_settings(self):
         """Ładuje zapisane ustawienia"""
@@ -2630,20 +3096,20 @@ class DriverManagerWindow(QMainWindow):
         if x > 0 and y > 0:
             self.move(x, y)
         
-        # Czcionka
-        font_family = self.settings.value("font/family", "Ubuntu", type=str)
-        font_size = self.settings.value("font/size", 12, type=int)
+        # Czcionka (ta i kolejne zmiany z menu przez _setting – niezapisana wartość ma pierwszeństwo)
+        font_family = self._setting("font/family", "Ubuntu", str)
+        font_size = self._setting("font/size", 12, int)
         font = QFont(font_family, font_size)
         self.apply_font(font)
         
         # Motyw
-        theme = self.settings.value("theme/name", "light", type=str)
+        theme = self._setting("theme/name", "light", str)
         self.set_theme(theme, apply_styles=True, silent=True)
         
         # Język (ładowany w __init__ przed create_menu_bar)
-        _lang = self.settings.value("language", "en", type=str)
-        if _lang in TRANSLATIONS and hasattr(self, "_lang"):
-            self._lang = _lang
+        _lang = self._setting("language", "en", str)
+        if _lang in TRANSLATIONS:
+            self._set_lang(_lang)
         
         # Proporcje splittera
         if hasattr(self, 'splitter'):
@@ -2654,11 +3120,11 @@ class DriverManagerWindow(QMainWindow):
         # Sprawdzaj aktualizacje w tle / Wstrzymaj monitoring GPU
         if hasattr(self, '_action_check_updates'):
             self._action_check_updates.setChecked(
-                self.settings.value("check_updates", True, type=bool)
+                self._setting("check_updates", True, bool)
             )
         if hasattr(self, '_action_gpu_monitor_paused'):
             self._action_gpu_monitor_paused.setChecked(
-                self.settings.value("gpu_monitor_paused", False, type=bool)
+                self._setting("gpu_monitor_paused", False, bool)
             )
     
     def save_settings(self):
@@ -2680,20 +3146,21 @@ class DriverManagerWindow(QMainWindow):
                 self.settings.setValue("splitter/left", sizes[0])
                 self.settings.setValue("splitter/right", sizes[1])
         
-        # Czcionka (zapisana w apply_font)
-        # Motyw (zapisany w set_theme)
-        # Język
-        if hasattr(self, "_lang"):
-            self.settings.setValue("language", self._lang)
-        # Sprawdzaj aktualizacje / Wstrzymaj monitoring GPU
-        if hasattr(self, "_action_check_updates"):
-            self.settings.setValue("check_updates", self._action_check_updates.isChecked())
-        if hasattr(self, "_action_gpu_monitor_paused"):
-            self.settings.setValue("gpu_monitor_paused", self._action_gpu_monitor_paused.isChecked())
+        # Czcionka, motyw, język, przełączniki z menu (zebrane w pamięci od ostatniego zapisu)
+        for key, val in self._pending_settings.items():
+            self.settings.setValue(key, val)
+        self._pending_settings.clear()
+    
+    def _setting(self, key: str, default, type_):
+        """Bieżąca wartość ustawienia: niezapisana zmiana z menu albo wartość z QSettings."""
+        if key in self._pending_settings:
+            return self._pending_settings[key]
+        return self.settings.value(key, default, type=type_)
     
     def _save_settings_now(self):
         """Zapisuje ustawienia od razu (wywołane z menu) i pokazuje potwierdzenie."""
         self.save_settings()
+        self.settings.flush()
         self.statusBar().showMessage(self._tr("status_ready"))
         self.log(self._tr("log_settings_saved"), "INFO")
     
@@ -2702,28 +3169,19 @@ class DriverManagerWindow(QMainWindow):
         app = QApplication.instance()
         if app is not None:
             app.setFont(font)
-        if hasattr(self, 'log_text'):
-            self.log_text.setFont(font)
-        # Jawnie ustaw czcionkę na przyciskach i etykietach (StyleSheet może nadpisywać dziedziczenie)
-        for name in (
-            "gpu_label", "driver_label", "distro_label", "kernel_label",
-            "btn_nvk", "btn_repo", "btn_repo_latest",
-            "btn_run_prod", "btn_run_newf", "btn_run_beta", "btn_run_legacy",
-            "btn_clear_log", "btn_save_log", "btn_open_log_dir",
-        ):
-            w = getattr(self, name, None)
-            if w is not None and hasattr(w, "setFont"):
+        with self._updates_frozen():
+            for w in self._fontable:
                 w.setFont(font)
-        self.settings.setValue("font/family", font.family())
-        self.settings.setValue("font/size", font.pointSize())
+        self._pending_settings["font/family"] = font.family()
+        self._pending_settings["font/size"] = font.pointSize()
         if hasattr(self, 'log'):
             self.log(self._tr("log_font_changed").format(font.family(), font.pointSize()), "INFO")
     
     def choose_font(self):
         """Otwiera dialog wyboru czcionki"""
         current_font = QFont(
-            self.settings.value("font/family", "Ubuntu", type=str),
-            self.settings.value("font/size", 12, type=int)
+            self._setting("font/family", "Ubuntu", str),
+            self._setting("font/size", 12, int)
         )
         
         font, ok = QFontDialog.getFont(current_font, self, self._tr("menu_font"))
@@ -2732,7 +3190,7 @@ class DriverManagerWindow(QMainWindow):
     
     def set_theme(self, theme: str, apply_styles: bool = True, silent: bool = False):
         """Ustawia motyw kolorystyczny. Fusion + paleta = ten sam układ co jasny, tylko kolory."""
-        self.settings.setValue("theme/name", theme)
+        self._pending_settings["theme/name"] = theme
         app = QApplication.instance()
         if app is None:
             return
@@ -2757,23 +3215,26 @@ class DriverManagerWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            self.settings.clear()
-            self._lang = "en"
-            
-            # Resetuj rozmiar okna
-            self.resize(1200, 800)
-            
-            # Resetuj czcionkę
-            default_font = QFont("Ubuntu", 12)
-            self.apply_font(default_font)
-            
-            # Resetuj motyw
-            self.set_theme("light")
-            
-            # Odśwież menu (język domyślny)
-            self.menuBar().clear()
-            self.create_menu_bar()
-            self.setWindowTitle(self._tr("window_title"))
+            with self._updates_frozen():
+                self.settings.clear()
+                self._pending_settings.clear()
+                self._set_lang("en")
+                
+                # Resetuj rozmiar okna
+                self.resize(1200, 800)
+                
+                # Resetuj czcionkę
+                default_font = QFont("Ubuntu", 12)
+                self.apply_font(default_font)
+                
+                # Resetuj motyw
+                self.set_theme("light")
+                
+                # Odśwież menu (język domyślny) i przełączniki do wartości domyślnych
+                self._retranslate_menus()
+                self._action_check_updates.setChecked(True)
+                self._action_gpu_monitor_paused.setChecked(False)
+                self.setWindowTitle(self._tr("window_title"))
             
             self.log(self._tr("log_settings_reset"), "SUCCESS")
             QMessageBox.information(
@@ -2803,10 +3264,24 @@ class DriverManagerWindow(QMainWindow):
             if reply != QMessageBox.StandardButton.Yes:
                 event.ignore()
                 return
+        if self._sysinfo_thread is not None and self._sysinfo_thread.isRunning():
+            self._sysinfo_thread.wait(30000)
         fedora_thread = getattr(self, "_fedora_repo_thread", None)
         if fedora_thread is not None and fedora_thread.isRunning():
             fedora_thread.wait(65000)
+        self._stop_smi_proc()
+        for proc in list(self._async_procs):
+            proc.kill()
+            proc.waitForFinished(1000)
+        if self._nvml_handle is not None:
+            try:
+                pynvml.nvmlShutdown()
+            except pynvml.NVMLError:
+                pass
         self.save_settings()
+        self.settings.flush()
+        QThreadPool.globalInstance().waitForDone(5000)  # raporty błędów w toku
+        self._close_log_file()
         event.accept()
     
     def create_left_panel(self) -> QWidget:
@@ -2862,84 +3337,49 @@ class DriverManagerWindow(QMainWindow):
         
         # NVK
         self.btn_nvk = QPushButton(self._tr("btn_nvk_text"))
-        self.btn_nvk.setStyleSheet(
-            "QPushButton { background-color: #4CAF50; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #81C784; border: 3px solid #1B5E20; } "
-            "QPushButton:pressed { background-color: #2E7D32; padding: 8px 4px 4px 8px; border: 3px solid #1B5E20; }"
-        )
+        self.btn_nvk.setProperty("role", "nvk")
         self.btn_nvk.clicked.connect(self.install_nvk)
         install_layout.addWidget(self.btn_nvk)
         self.btn_nvk.setToolTip(self._tr("tt_nvk"))
         
         # Repo - przedostatnia
         self.btn_repo = QPushButton(self._tr("btn_repo_fmt").format("…"))
-        self.btn_repo.setStyleSheet(
-            "QPushButton { background-color: #FFC107; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #FFE082; border: 3px solid #E65100; } "
-            "QPushButton:pressed { background-color: #FF8F00; padding: 8px 4px 4px 8px; border: 3px solid #E65100; }"
-        )
+        self.btn_repo.setProperty("role", "repo")
         self.btn_repo.clicked.connect(self.install_repo)
         install_layout.addWidget(self.btn_repo)
         self.btn_repo.setToolTip(self._tr("tt_repo"))
         
         # Repo - najnowsza
         self.btn_repo_latest = QPushButton(self._tr("btn_repo_latest_fmt").format("…"))
-        self.btn_repo_latest.setStyleSheet(
-            "QPushButton { background-color: #FFC107; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #FFE082; border: 3px solid #E65100; } "
-            "QPushButton:pressed { background-color: #FF8F00; padding: 8px 4px 4px 8px; border: 3px solid #E65100; }"
-        )
+        self.btn_repo_latest.setProperty("role", "repo")
         self.btn_repo_latest.clicked.connect(self.install_repo_latest)
         install_layout.addWidget(self.btn_repo_latest)
         self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest"))
         
         # .run Production
         self.btn_run_prod = QPushButton(self._tr("btn_run_prod_fmt").format(PRODUCTION_VERSION))
-        self.btn_run_prod.setStyleSheet(
-            "QPushButton { background-color: #2196F3; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #64B5F6; border: 3px solid #0D47A1; } "
-            "QPushButton:pressed { background-color: #1565C0; padding: 8px 4px 4px 8px; border: 3px solid #0D47A1; }"
-        )
+        self.btn_run_prod.setProperty("role", "run")
         self.btn_run_prod.clicked.connect(lambda: self.install_nvidia_run("production"))
         install_layout.addWidget(self.btn_run_prod)
         self.btn_run_prod.setToolTip(self._tr("tt_run_prod"))
         
         # .run New Feature
         self.btn_run_newf = QPushButton(self._tr("btn_run_newf_fmt").format(NEW_FEATURE_VERSION))
-        self.btn_run_newf.setStyleSheet(
-            "QPushButton { background-color: #2196F3; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #64B5F6; border: 3px solid #0D47A1; } "
-            "QPushButton:pressed { background-color: #1565C0; padding: 8px 4px 4px 8px; border: 3px solid #0D47A1; }"
-        )
+        self.btn_run_newf.setProperty("role", "run")
         self.btn_run_newf.clicked.connect(lambda: self.install_nvidia_run("new_feature"))
         install_layout.addWidget(self.btn_run_newf)
         self.btn_run_newf.setToolTip(self._tr("tt_run_newf"))
         
         # .run Beta
         self.btn_run_beta = QPushButton(self._tr("btn_run_beta_fmt").format(BETA_VERSION))
-        self.btn_run_beta.setStyleSheet(
-            "QPushButton { background-color: #2196F3; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #64B5F6; border: 3px solid #0D47A1; } "
-            "QPushButton:pressed { background-color: #1565C0; padding: 8px 4px 4px 8px; border: 3px solid #0D47A1; }"
-        )
+        self.btn_run_beta.setProperty("role", "run")
         self.btn_run_beta.clicked.connect(lambda: self.install_nvidia_run("beta"))
         install_layout.addWidget(self.btn_run_beta)
         self.btn_run_beta.setToolTip(self._tr("tt_run_beta"))
         
         # .run Legacy
         self.btn_run_legacy = QPushButton(self._tr("btn_run_legacy_fmt").format(LEGACY_VERSION))
-        self.btn_run_legacy.setStyleSheet(
-            "QPushButton { background-color: #2196F3; color: black; font-weight: bold; border-radius: 6px; "
-            "border: 3px solid transparent; padding: 6px; } "
-            "QPushButton:hover { background-color: #64B5F6; border: 3px solid #0D47A1; } "
-            "QPushButton:pressed { background-color: #1565C0; padding: 8px 4px 4px 8px; border: 3px solid #0D47A1; }"
-        )
+        self.btn_run_legacy.setProperty("role", "run")
         self.btn_run_legacy.clicked.connect(lambda: self.install_nvidia_run("legacy"))
         install_layout.addWidget(self.btn_run_legacy)
         self.btn_run_legacy.setToolTip(self._tr("tt_run_legacy"))
@@ -2949,9 +3389,13 @@ class DriverManagerWindow(QMainWindow):
         
         # Logo NVIDIA z pliku – skaluje się z oknem i wypełnia miejsce
         # BUNDLE_DIR = katalog z wyekstrahowanymi plikami przy kompilacji (Nuitka/PyInstaller)
-        logo_path = BUNDLE_DIR / "nvidia_logo.png" if (BUNDLE_DIR / "nvidia_logo.png").exists() else SCRIPT_DIR / "nvidia_logo.png"
-        if logo_path.exists():
-            pm = QPixmap(str(logo_path))
+        logo_path = next(
+            (p for p in (os.path.join(BUNDLE_DIR, "nvidia_logo.png"), os.path.join(SCRIPT_DIR, "nvidia_logo.png"))
+             if os.path.isfile(p)),
+            None,
+        )
+        if logo_path:
+            pm = QPixmap(logo_path)
             if not pm.isNull():
                 self.nvidia_logo_label = ScalableLogoLabel(pm)
                 layout.addWidget(self.nvidia_logo_label, 1)
@@ -2970,8 +3414,10 @@ class DriverManagerWindow(QMainWindow):
         self.log_group.setObjectName("logGroup")
         log_layout = QVBoxLayout()
         
-        self.log_text = QTextEdit()
+        # QPlainTextEdit: append bez przeliczania całego dokumentu, najstarsze linie odcinane po 5000
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(5000)
         self.log_text.setFont(QFont("Ubuntu", 12))
         log_layout.addWidget(self.log_text)
         
@@ -2984,7 +3430,7 @@ class DriverManagerWindow(QMainWindow):
         log_buttons = QHBoxLayout(log_buttons_widget)
         log_buttons.setContentsMargins(0, 10, 0, 6)
         self.btn_clear_log = QPushButton(self._tr("btn_clear_log"))
-        self.btn_clear_log.clicked.connect(self.log_text.clear)
+        self.btn_clear_log.clicked.connect(self._clear_log_view)
         self.btn_clear_log.setToolTip(self._tr("tt_clear_log"))
         log_buttons.addWidget(self.btn_clear_log)
         
@@ -3016,12 +3462,33 @@ class DriverManagerWindow(QMainWindow):
     
     def start_log(self, name: str):
         """Rozpoczyna nowy log"""
-        self.current_log_file = LOG_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.log"
+        self._close_log_file()
+        self._log_file_broken = False
+        self.current_log_file = LOG_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.log"
         try:
-            self.current_log_file.touch()
-        except:
+            self._log_fh = open(self.current_log_file, "a", buffering=65536, encoding="utf-8")
+        except OSError:
+            self._log_fh = None
+    
+    def _sync_log_file(self):
+        """Zrzuca log sesji na dysk (jeden fsync na koniec instalacji zamiast flush przy każdym wpisie)."""
+        if self._log_fh is None:
+            return
+        try:
+            self._log_fh.flush()
+            os.fsync(self._log_fh.fileno())
+        except (OSError, ValueError):
             pass
     
+    def _close_log_file(self):
+        """Zamyka bieżący plik logu (zrzuca bufor)."""
+        if self._log_fh is not None:
+            try:
+                self._log_fh.close()
+            except OSError:
+                pass
+            self._log_fh = None
+    
     def collect_error_report(self, error_message: str, context: str = "") -> Dict:
         """Zbiera szczegółowe informacje o błędzie"""
         report = {
@@ -3031,7 +3498,7 @@ class DriverManagerWindow(QMainWindow):
             "system": {
                 "distro": self.system.distro_name,
                 "distro_family": self.system.distro_family,
-                "kernel": os.uname().release if not DEMO_MODE else "Unknown",
+                "kernel": _kernel_release() if not DEMO_MODE else "Unknown",
                 "arch": self.system.nvidia_arch,
                 "gpu": self.system.gpu_model if self.system.gpu_present else "Nie wykryto"
             },
@@ -3044,85 +3511,126 @@ class DriverManagerWindow(QMainWindow):
             }
         }
         
-        # Dodaj dodatkowe informacje jeśli dostępne (na Fedorze brak dkms)
+        # Dodaj dodatkowe informacje jeśli dostępne (na Fedorze brak dkms); seria błędów nie uruchamia
+        # dkms/lsmod przy każdej linii – wynik ważny 30 s
         if not DEMO_MODE and self.system.distro_family != "fedora":
-            try:
-                result = self.system.run_command(["dkms", "status"], sudo=False)
-                if result[0] == 0:
-                    report["dkms_status"] = result[1]
-            except:
-                pass
-            
-            try:
-                # Załadowane moduły
-                result = self.system.run_command(["lsmod"], sudo=False)
-                if result[0] == 0:
-                    nvidia_modules = [l for l in result[1].split("\n") if "nvidia" in l.lower()]
-                    report["loaded_modules"] = nvidia_modules
-            except:
-                pass
+            now = time.monotonic()
+            if self._error_probe_cache is None or now - self._error_probe_cache[0] >= 30:
+                probes = {}
+                try:
+                    result = self.system.run_command(["dkms", "status"], sudo=False)
+                    if result[0] == 0:
+                        probes["dkms_status"] = result[1]
+                except:
+                    pass
+                
+                try:
+                    # Załadowane moduły
+                    result = self.system.run_command(["lsmod"], sudo=False)
+                    if result[0] == 0:
+                        probes["loaded_modules"] = _NVIDIA_LSMOD_RE.findall(result[1])
+                except:
+                    pass
+                self._error_probe_cache = (now, probes)
+            report.update(self._error_probe_cache[1])
         
         return report
     
-    def save_error_report(self, report: Dict):
-        """Zapisuje raport błędu do pliku"""
+    def _write_error_report(self, report: Dict) -> str:
+        """Zapisuje raport błędu do pliku i zwraca ścieżkę. Bez logowania – można wołać spoza wątku GUI."""
         error_dir = ERROR_LOG_DIR
         error_dir.mkdir(exist_ok=True)
         
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
         error_file = error_dir / f"error-report-{timestamp}.json"
-        
+        _write_bytes(error_file, json.dumps(report, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        return str(error_file)
+    
+    def save_error_report(self, report: Dict):
+        """Zapisuje raport błędu do pliku"""
         try:
-            with open(error_file, "w", encoding="utf-8") as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
-            self.log(self._tr("log_error_report_saved").format(error_file), "INFO")
-            return str(error_file)
+            error_file = self._write_error_report(report)
         except Exception as e:
             self.log(self._tr("log_error_report_failed").format(e), "ERROR")
             return None
+        self.log(self._tr("log_error_report_saved").format(error_file), "INFO")
+        return error_file
+    
+    def _on_error_report_saved(self, path: str, error: str):
+        """Wynik _ErrorReportRunnable (w wątku GUI)."""
+        if path:
+            self.log(self._tr("log_error_report_saved").format(path), "INFO")
+        else:
+            self.log(self._tr("log_error_report_failed").format(error), "ERROR")
     
     def log(self, message: str, level: str = "INFO"):
         """Dodaje wiadomość do logów"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        prefix = {
-            "INFO": "ℹ",
-            "SUCCESS": "✓",
-            "WARN": "⚠",
-            "ERROR": "✗",
-            "DEBUG": "[DEBUG]"
-        }.get(level, "")
-        
-        color = {
-            "INFO": "#2196F3",
-            "SUCCESS": "#4CAF50",
-            "WARN": "#FFC107",
-            "ERROR": "#F44336",
-            "DEBUG": "#00BCD4"
-        }.get(level, "#000000")
-        
-        formatted = f'<span style="color: {color};">[{timestamp}] [{level}] {prefix} {message}</span>'
-        self.log_text.append(formatted)
-        
-        # Auto-scroll do końca
-        cursor = self.log_text.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.log_text.setTextCursor(cursor)
-        
-        # Zapis do pliku
-        if self.current_log_file:
+        self.log_lines((message,), level)
+    
+    def log_lines(self, messages, level: str = "INFO"):
+        """Dodaje serię wiadomości jednego poziomu (np. wyjście inxi) – jeden znacznik czasu i jeden zapis do pliku."""
+        if not messages:
+            return
+        # Znacznik czasu formatowany najwyżej raz na sekundę
+        now = int(time.time())
+        if now != self._ts_cache_key:
+            self._ts_cache_key = now
+            self._ts_cache = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        timestamp = self._ts_cache
+        tmpl = self._LEVEL_TEMPLATE.get(level)
+        if tmpl is None:
+            tmpl = ('<span style="color: #000000;">[', f'] [{level}]  ')
+        start, mid = tmpl
+        self._log_buffer.extend(start + timestamp + mid + m + "</span>" for m in messages)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+        
+        # Zapis do pliku (buforowany; WARN/ERROR od razu na dysk). Po pierwszym błędzie (np. pełny dysk)
+        # plik jest pomijany do następnego start_log – jedno ostrzeżenie zamiast wyjątku na każdej linii
+        if not self._log_file_broken:
             try:
-                with open(self.current_log_file, "a", encoding="utf-8") as f:
-                    f.write(f"[{timestamp}] [{level}] {message}\n")
-            except:
-                pass
-        
-        # Automatyczne zbieranie raportów błędów
+                text = "".join(f"[{timestamp}] [{level}] {m}\n" for m in messages)
+                if self._log_fh is not None:
+                    self._log_fh.write(text)
+                    if level in ("ERROR", "WARN"):
+                        self._log_fh.flush()
+                elif self.current_log_file is not None:
+                    # Nie udało się otworzyć pliku w start_log – dopisujemy pojedynczy rekord
+                    _atomic_append(self.current_log_file, text.encode("utf-8"))
+            except (OSError, ValueError) as e:
+                self._log_file_broken = True
+                self._close_log_file()
+                start, mid = self._LEVEL_TEMPLATE["WARN"]
+                self._log_buffer.append(start + timestamp + mid + self._tr("log_file_write_failed").format(e) + "</span>")
+        
+        # Automatyczne zbieranie raportów błędów – w puli wątków; seria linii błędu (< 2 s) = jeden raport
         if level == "ERROR":
-            try:
-                report = self.collect_error_report(message, "Log error")
-                self.save_error_report(report)
-            except:
-                pass
+            now = time.monotonic()
+            if now - self._last_err_ts >= 2:
+                self._last_err_ts = now
+                QThreadPool.globalInstance().start(_ErrorReportRunnable(self, messages[0]))
+    
+    def _flush_log_buffer(self):
+        """Dopisuje zebrane linie do okna logów (przewija do końca, gdy widok był na dole).
+        Każda linia to osobny blok – limit setMaximumBlockCount liczy linie, nie paczki; repaint raz na paczkę."""
+        if not self._log_buffer:
+            return
+        view = self.log_text
+        frozen = view.updatesEnabled()
+        if frozen:
+            view.setUpdatesEnabled(False)
+        try:
+            append = view.appendHtml
+            while self._log_buffer:
+                append(self._log_buffer.popleft())
+        finally:
+            if frozen:
+                view.setUpdatesEnabled(True)
+    
+    def _clear_log_view(self):
+        """Czyści okno logów razem z liniami czekającymi na dopisanie."""
+        self._log_buffer.clear()
+        self.log_text.clear()
     
     def _update_system_info_labels(self):
         """Ustawia etykiety informacji o systemie z aktualnych danych (używa _tr)."""
@@ -3137,38 +3645,47 @@ class DriverManagerWindow(QMainWindow):
         elif self.system.current_driver != "brak":
             driver_text += self._tr("sys_driver_nvidia")
         self.driver_label.setText(driver_text)
-        try:
-            kernel_ver = os.uname().release if not DEMO_MODE else "—"
-            self.kernel_label.setText(self._tr("sys_kernel_fmt").format(kernel_ver))
-        except Exception:
-            self.kernel_label.setText(self._tr("sys_kernel_dash"))
+        kernel_ver = _kernel_release() if not DEMO_MODE else "—"
+        self.kernel_label.setText(self._tr("sys_kernel_fmt").format(kernel_ver))
+    
+    def _invalidate_probes(self):
+        """Unieważnia zapamiętane sondy systemu i wyniki check_requirements."""
+        self.system.invalidate()
+        self._req_cache.clear()
+    
+    def _refresh_system_info(self):
+        """„Odśwież informacje” z menu – wymusza ponowne sondowanie systemu."""
+        self._invalidate_probes()
+        self.load_system_info()
     
     def load_system_info(self):
-        """Ładuje informacje o systemie"""
+        """Ładuje informacje o systemie (sondy w SystemInfoThread, wynik w _on_system_info_ready)."""
+        self._last_sysinfo_ts = time.monotonic()
+        if self._sysinfo_thread is not None and self._sysinfo_thread.isRunning():
+            return  # wynik trwającego wykrywania i tak zaraz przyjdzie
         self._set_status_update_message("")
         self.log(self._tr("log_detecting_system"), "INFO")
-        
-        # Wykryj dystrybucję
-        self.system.detect_distro()
-        
-        # Wykryj GPU
-        self.system.check_gpu()
+        self._sysinfo_thread = SystemInfoThread(self.system)
+        self._sysinfo_thread.info_ready.connect(self._on_system_info_ready)
+        self._sysinfo_thread.start()
+    
+    def _on_system_info_ready(self, info: Dict):
+        """Ustawia etykiety i przyciski z wyników SystemInfoThread."""
+        self._last_sysinfo_ts = time.monotonic()
         if self.system.gpu_present:
             self.log(self._tr("log_gpu_detected").format(self.system.gpu_model), "SUCCESS")
         else:
             self.log(self._tr("log_gpu_not_detected"), "WARN")
         
         # Aktualny sterownik
-        self.system.current_driver = self.system.get_current_driver()
+        self.system.current_driver = info["driver"]
         
         # Ustaw etykiety (z tłumaczeniami)
         self._update_system_info_labels()
         
-        # Kernel (już ustawiony w _update_system_info_labels)
-        
-        # Pobierz wersje
+        # Wersje .run
         self.log(self._tr("log_fetching_versions"), "INFO")
-        self.versions = self.system.fetch_versions()
+        self.versions = info["versions"]
         
         # Aktualizuj przyciski (zachowaj tooltips - wieloliniowy format)
         self.btn_run_prod.setText(self._tr("btn_run_prod_fmt").format(self.versions['production']))
@@ -3185,21 +3702,19 @@ class DriverManagerWindow(QMainWindow):
         
         # Aktualizuj wersje repo (tekst przycisku i tooltip z nazwą + wersją jak w opcjach .run)
         if self.system.distro_family == "fedora":
-            self._repo_ver = self._repo_latest = "580"
-            self.btn_repo.setText(self._tr("btn_repo_fmt").format(self._repo_ver))
-            self.btn_repo.setToolTip(self._tr("tt_repo_ver").format(self._repo_ver))
-            self.btn_repo_latest.setText(self._tr("btn_repo_latest_fmt").format(self._repo_latest))
-            self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest_ver").format(self._repo_latest))
-            self._fedora_repo_thread = FetchFedoraRepoThread(self.system)
-            self._fedora_repo_thread.version_ready.connect(self._on_fedora_repo_version_ready)
-            self._fedora_repo_thread.start()
+            self._repo_ver = self._repo_latest = self.system._fedora_repo_version_cache or "580"
+            fedora_thread = getattr(self, "_fedora_repo_thread", None)
+            if fedora_thread is None or not fedora_thread.isRunning():
+                self._fedora_repo_thread = FetchFedoraRepoThread(self.system)
+                self._fedora_repo_thread.version_ready.connect(self._on_fedora_repo_version_ready)
+                self._fedora_repo_thread.start()
         else:
-            self._repo_ver = self.system.highest_repo_driver()
-            self._repo_latest = self.system.highest_repo_driver_latest()
-            self.btn_repo.setText(self._tr("btn_repo_fmt").format(self._repo_ver))
-            self.btn_repo.setToolTip(self._tr("tt_repo_ver").format(self._repo_ver))
-            self.btn_repo_latest.setText(self._tr("btn_repo_latest_fmt").format(self._repo_latest))
-            self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest_ver").format(self._repo_latest))
+            self._repo_ver = info["repo_ver"]
+            self._repo_latest = info["repo_latest"]
+        self.btn_repo.setText(self._tr("btn_repo_fmt").format(self._repo_ver))
+        self.btn_repo.setToolTip(self._tr("tt_repo_ver").format(self._repo_ver))
+        self.btn_repo_latest.setText(self._tr("btn_repo_latest_fmt").format(self._repo_latest))
+        self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest_ver").format(self._repo_latest))
         
         self.log(self._tr("log_system_info_loaded"), "SUCCESS")
         if getattr(sys, "frozen", False):
@@ -3208,13 +3723,13 @@ class DriverManagerWindow(QMainWindow):
 
     def _on_install_progress(self, percent: int):
         """Aktualizuje pasek postępu instalacji (testowo)."""
-        if hasattr(self, "install_progress_bar"):
+        if self.install_progress_bar is not None:
             self.install_progress_bar.setVisible(True)
             self.install_progress_bar.setValue(percent)
 
     def _hide_install_progress_bar(self):
         """Ukrywa pasek postępu po zakończeniu instalacji."""
-        if hasattr(self, "install_progress_bar"):
+        if self.install_progress_bar is not None:
             self.install_progress_bar.setValue(0)
             self.install_progress_bar.setVisible(False)
 
@@ -3238,7 +3753,7 @@ class DriverManagerWindow(QMainWindow):
             ["dnf", "install", "-y", "dnf5"],
             sudo=True,
             timeout=120,
-            sudo_password=getattr(self, "_sudo_password", None),
+            sudo_password=self._sudo_password,
         )
         if rc == 0:
             self.system._dnf_cmd = "dnf5"
@@ -3256,7 +3771,18 @@ class DriverManagerWindow(QMainWindow):
         self.btn_repo_latest.setToolTip(self._tr("tt_repo_latest_ver").format(self._repo_latest))
     
     def _get_sudo_askpass(self) -> Optional[str]:
-        """Zwraca ścieżkę do programu askpass (okienko na hasło) dla sudo -A. None jeśli brak."""
+        """Zwraca ścieżkę do programu askpass (okienko na hasło) dla sudo -A. None jeśli brak.
+        Plik tworzony raz na sesję, usuwany przy wyjściu (atexit)."""
+        if self._askpass_path and os.path.isfile(self._askpass_path):
+            return self._askpass_path
+        path = self._create_sudo_askpass()
+        if path:
+            self._askpass_path = path
+            atexit.register(_unlink_quiet, path)
+        return path
+
+    def _create_sudo_askpass(self) -> Optional[str]:
+        """Tworzy skrypt askpass w katalogu tymczasowym."""
         # zenity (GNOME) lub kdialog (KDE) – okienko na hasło (pełne ścieżki dla skompilowanej aplikacji)
         def try_askpass(path: str, is_zenity: bool) -> Optional[str]:
             if not path or not os.path.isfile(path):
@@ -3283,24 +3809,9 @@ class DriverManagerWindow(QMainWindow):
                     pass
                 return None
 
+        search_path = "/usr/bin:/bin:" + os.environ.get("PATH", "")
         for cmd, is_zenity in [("zenity", True), ("kdialog", False)]:
-            path = None
-            try:
-                r = subprocess.run(
-                    ["which", cmd],
-                    capture_output=True,
-                    text=True,
-                    timeout=2,
-                    env={**os.environ, "PATH": "/usr/bin:/bin:" + os.environ.get("PATH", "")},
-                )
-                if r.returncode == 0 and r.stdout.strip():
-                    path = r.stdout.strip()
-            except Exception:
-                pass
-            if not path and cmd == "zenity":
-                path = "/usr/bin/zenity" if os.path.isfile("/usr/bin/zenity") else None
-            elif not path and cmd == "kdialog":
-                path = "/usr/bin/kdialog" if os.path.isfile("/usr/bin/kdialog") else None
+            path = shutil.which(cmd, path=search_path)
             if path:
                 result = try_askpass(path, is_zenity)
                 if result:
@@ -3468,18 +3979,11 @@ except Exception:
                     text=True,
                     timeout=60,
                 )
-                try:
-                    os.unlink(askpass_path)
-                except OSError:
-                    pass
                 if r.returncode == 0:
                     self.log(self._tr("log_sudo_granted"), "SUCCESS")
                     return True
             except (subprocess.TimeoutExpired, Exception):
-                try:
-                    os.unlink(askpass_path)
-                except OSError:
-                    pass
+                pass
         
         # 3. Fallback: terminal
         self.log(self._tr("log_opening_terminal"), "INFO")
@@ -3499,24 +4003,18 @@ except Exception:
         btn_cancel = QPushButton(self._tr("btn_cancel"))
         btn_cancel.clicked.connect(wait_dlg.reject)
         layout.addWidget(btn_cancel)
-        poll_timer = QTimer(wait_dlg)
+        poller = SudoPollerThread()
+        poller.sudo_ready.connect(wait_dlg.accept)
         timeout_timer = QTimer(wait_dlg)
-
-        def on_poll():
-            r = subprocess.run(["sudo", "-n", "true"], capture_output=True, text=True, timeout=5)
-            if r.returncode == 0:
-                poll_timer.stop()
-                timeout_timer.stop()
-                wait_dlg.accept()
-
-        def on_timeout():
-            poll_timer.stop()
-            wait_dlg.reject()
-
-        poll_timer.timeout.connect(on_poll)
-        poll_timer.start(1500)
-        timeout_timer.singleShot(120 * 1000, lambda: (poll_timer.stop(), wait_dlg.reject()))
-        if wait_dlg.exec() == QDialog.DialogCode.Accepted:
+        timeout_timer.setSingleShot(True)
+        timeout_timer.timeout.connect(wait_dlg.reject)
+        poller.start()
+        timeout_timer.start(120 * 1000)
+        accepted = wait_dlg.exec() == QDialog.DialogCode.Accepted
+        timeout_timer.stop()
+        poller.stop()
+        poller.wait()
+        if accepted:
             self.log(self._tr("log_sudo_granted"), "SUCCESS")
             return True
         self.log(self._tr("log_sudo_failed"), "ERROR")
@@ -3545,10 +4043,10 @@ except Exception:
         try:
             current_driver = self.system.get_current_driver()
             packages = self.system.get_installed_nvidia_packages()
-            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            backup_id = f"backup-{stamp}"
+            now = datetime.now()  # jeden odczyt zegara – nazwa pliku i "date" spójne
+            backup_id = f"backup-{now:%Y%m%d-%H%M%S}"
             data = {
-                "date": datetime.now().isoformat(),
+                "date": now.isoformat(),
                 "backup_id": backup_id,
                 "previous_driver": current_driver,
                 "packages": packages,
@@ -3556,34 +4054,38 @@ except Exception:
                 "target_version": target_version,
             }
             path = BACKUP_DIR / f"{backup_id}.json"
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            _write_bytes(path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
             self.log(self._tr("log_backup_created").format(path.name), "INFO")
-            # Trzymaj tylko MAX_BACKUPS najnowszych; usuń najstarsze
-            all_backups = sorted(BACKUP_DIR.glob("backup-*.json"))
-            if len(all_backups) > MAX_BACKUPS:
-                for old_path in all_backups[: len(all_backups) - MAX_BACKUPS]:
-                    try:
-                        old_path.unlink()
-                        self.log(self._tr("log_backup_removed_old").format(old_path.name), "INFO")
-                    except OSError:
-                        pass
+            # Trzymaj tylko MAX_BACKUPS najnowszych – usuwanie starszych w puli wątków (nowy backup jest już na dysku)
+            QThreadPool.globalInstance().start(_PruneBackupsRunnable(self))
             return path
         except Exception as e:
             self.log(self._tr("log_backup_create_failed").format(e), "WARN")
             return None
 
+    def _on_backups_pruned(self, names: List[str]):
+        """Loguje backupy usunięte przez _PruneBackupsRunnable."""
+        for name in names:
+            self.log(self._tr("log_backup_removed_old").format(name), "INFO")
+
     def list_backups(self) -> List[Dict]:
-        """Zwraca listę backupów (posortowane od najnowszego)."""
+        """Zwraca listę backupów (posortowane od najnowszego, najwyżej MAX_BACKUPS)."""
         out = []
-        if not BACKUP_DIR.exists():
+        try:
+            with os.scandir(BACKUP_DIR) as it:
+                # backup-RRRRMMDD-GGMMSS.json – nazwa sortuje się chronologicznie, stat() zbędny
+                entries = sorted(
+                    (e for e in it if e.name.startswith("backup-") and e.name.endswith(".json")),
+                    key=lambda e: e.name, reverse=True,
+                )
+        except OSError:
             return out
-        for p in sorted(BACKUP_DIR.glob("backup-*.json"), reverse=True):
+        for e in entries[:MAX_BACKUPS]:
             try:
-                with open(p, "r", encoding="utf-8") as f:
-                    d = json.load(f)
-                d["_path"] = str(p)
-                d["_filename"] = p.name
+                with open(e.path, "rb") as f:
+                    d = json.loads(f.read())
+                d["_path"] = e.path
+                d["_filename"] = e.name
                 out.append(d)
             except Exception:
                 pass
@@ -3616,49 +4118,70 @@ except Exception:
             return 0, ""
         cmd = ["apt-get", "install", "-y"] + packages
         result = self.system.run_command(cmd, sudo=True, timeout=300,
-                                        sudo_password=getattr(self, "_sudo_password", None))
+                                        sudo_password=self._sudo_password)
         return result[0], result[1] or ""
 
     def append_install_history(self, install_type: str, version: str, success: bool = True):
-        """Dodaje wpis do historii instalacji."""
+        """Dodaje wpis do historii instalacji (dopisanie jednej linii, bez przepisywania pliku)."""
+        entry = {
+            "date": datetime.now().isoformat(),
+            "type": install_type,
+            "version": version,
+            "success": success,
+        }
+        try:
+            self._migrate_legacy_history()
+            _atomic_append(HISTORY_FILE, (json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+        except Exception:
+            pass
+
+    def _migrate_legacy_history(self):
+        """Jednorazowo przepisuje starą historię (tablica JSON) do formatu JSON Lines."""
+        if HISTORY_FILE.exists() or not LEGACY_HISTORY_FILE.exists():
+            return
         try:
-            history = []
-            if HISTORY_FILE.exists():
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            history.append({
-                "date": datetime.now().isoformat(),
-                "type": install_type,
-                "version": version,
-                "success": success,
-            })
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+                history = json.load(f)
+            _write_bytes(HISTORY_FILE, "".join(
+                json.dumps(e, separators=(",", ":"), ensure_ascii=False) + "\n" for e in history
+            ).encode("utf-8"))
+            LEGACY_HISTORY_FILE.unlink()
         except Exception:
             pass
 
-    def load_install_history(self) -> List[Dict]:
-        """Ładuje historię instalacji."""
+    def load_install_history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Ładuje historię instalacji – od najnowszego wpisu; limit: tylko N ostatnich (parsowane są tylko one)."""
+        self._migrate_legacy_history()
         if not HISTORY_FILE.exists():
             return []
+        history = []
         try:
             with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+                lines = deque(f, maxlen=limit)
         except Exception:
             return []
+        while lines:
+            try:
+                history.append(json.loads(lines.pop()))
+            except ValueError:
+                pass  # urwana linia (np. przerwany zapis) – pomijamy
+        return history
     
     def check_requirements(self, install_type: str) -> tuple[bool, List[str]]:
-        """Sprawdza wymagania przed instalacją"""
+        """Sprawdza wymagania przed instalacją (wynik zapamiętany do instalacji lub „Odśwież informacje”)."""
+        key = (install_type, _kernel_release(), self.system.distro_family)
+        cached = self._req_cache.get(key)
+        if cached is not None:
+            return cached[0], list(cached[1])
         issues = []
         
         if install_type == "nvk":
             # Sprawdź kernel
-            try:
-                kernel_major = int(os.uname().release.split(".")[0])
-                if kernel_major < 6:
-                    issues.append(f"Kernel {os.uname().release} - wymagany 6.0+ dla NVK")
-            except:
+            kernel_major = _kernel_major()
+            if kernel_major is None:
                 issues.append("Nie można sprawdzić wersji kernela")
+            elif kernel_major < 6:
+                issues.append(f"Kernel {_kernel_release()} - wymagany 6.0+ dla NVK")
             
             # Sprawdź czy nouveau jest dostępny
             result = self.system.run_command(["modinfo", "nouveau"], sudo=False)
@@ -3666,25 +4189,71 @@ except Exception:
                 issues.append("Moduł nouveau nie jest dostępny")
         
         elif install_type in ["repo", "run"]:
-            if self.system.distro_family == "fedora":
+            distro_family = self.system.distro_family
+            if distro_family == "fedora":
                 # Na Fedorze repo używa akmod, .run buduje moduł wewnętrznie – bez sprawdzania dkms/headers
                 pass
             else:
-                try:
-                    kernel = os.uname().release
-                except:
-                    kernel = "unknown"
-                result = self.system.run_command(["dpkg", "-l", f"linux-headers-{kernel}"], sudo=False)
-                if result[0] != 0:
-                    issues.append(f"Brak linux-headers-{kernel} - wymagane do kompilacji modułów")
-                result = self.system.run_command(["which", "dkms"], sudo=False)
-                if result[0] != 0:
-                    issues.append("DKMS nie jest zainstalowany - wymagany do kompilacji modułów")
-                result = self.system.run_command(["dpkg", "-l", "build-essential"], sudo=False)
-                if result[0] != 0:
-                    issues.append("build-essential nie jest zainstalowany - wymagany do kompilacji")
-        
-        return len(issues) == 0, issues
+                # Najpierw pliki na dysku (bez fork/exec); dpkg pyta tylko, gdy ich nie ma – nietypowe ścieżki
+                kernel = _kernel_release()
+                search_path = "/usr/sbin:/sbin:/usr/bin:/bin:" + os.environ.get("PATH", "")
+                # (komunikat, polecenie dpkg do potwierdzenia braku lub None – brak bez pytania dpkg)
+                checks = []
+                if not (os.path.isdir(f"/lib/modules/{kernel}/build")
+                        or os.path.isdir(f"/usr/src/linux-headers-{kernel}")):
+                    checks.append((f"Brak linux-headers-{kernel} - wymagane do kompilacji modułów",
+                                   ("dpkg", "-l", f"linux-headers-{kernel}")))
+                if not shutil.which("dkms", path=search_path):
+                    checks.append(("DKMS nie jest zainstalowany - wymagany do kompilacji modułów", None))
+                if not (shutil.which("gcc", path=search_path) and shutil.which("make", path=search_path)):
+                    checks.append(("build-essential nie jest zainstalowany - wymagany do kompilacji",
+                                   ("dpkg", "-l", "build-essential")))
+                # Pozostałe zapytania dpkg są niezależne – równolegle
+                cmds = [cmd for _, cmd in checks if cmd]
+                rcs = {}
+                if cmds:
+                    with ThreadPoolExecutor(max_workers=len(cmds)) as pool:
+                        rcs = dict(zip(cmds, pool.map(lambda c: self.system.run_command(list(c), sudo=False)[0], cmds)))
+                issues.extend(msg for msg, cmd in checks if cmd is None or rcs[cmd] != 0)
+        
+        self._req_cache[key] = (len(issues) == 0, issues)
+        return len(issues) == 0, list(issues)
+    
+    def _start_install(self, kind: str, params: Dict, *, log_name: Optional[str] = None,
+                       backup: Optional[Tuple[str, str]] = None, history: Optional[Tuple[str, str]] = None,
+                       done_key: Optional[str] = None):
+        """Uruchamia InstallationThread z typowym okablowaniem (log, restart, postęp).
+        log_name – nowy plik logu sesji (otwarty raz, przed backupem – wpis o backupie trafia do niego);
+        backup – (typ, wersja) do create_backup; history – (typ, wersja) do historii po sukcesie;
+        done_key – komunikat SUCCESS po zakończeniu."""
+        if log_name:
+            self.start_log(log_name)
+        if backup is not None:
+            self.create_backup(*backup)
+        thread = InstallationThread(self, kind, {**params, "sudo_password": self._sudo_password})
+        self._install_thread = thread
+        self._install_ctx = (history, done_key)
+        thread.output.connect(self.log)
+        thread.ask_restart.connect(self.ask_restart)
+        thread.progress.connect(self._on_install_progress)
+        thread.finished.connect(self._on_install_finished)
+        if self.install_progress_bar is not None:
+            self.install_progress_bar.setValue(0)
+            self.install_progress_bar.setVisible(True)
+        thread.start()
+    
+    def _on_install_finished(self, code: int):
+        """Wspólne zakończenie instalacji: historia, komunikat, czyszczenie hasła i sond."""
+        history, done_key = self._install_ctx
+        if code == 0 and history is not None:
+            self.append_install_history(history[0], history[1], success=True)
+        if done_key:
+            self.log(self._tr(done_key), "SUCCESS")
+        self._sync_log_file()
+        self._install_thread = None
+        self._sudo_password = None
+        self._invalidate_probes()  # sterownik i zależności mogły się zmienić
+        QTimer.singleShot(1500, self._hide_install_progress_bar)
     
     def install_nvk(self):
         """Instaluje NVK"""
@@ -3697,21 +4266,17 @@ except Exception:
             return
         
         # Ostrzeżenie: kernel za stary dla NVK
-        try:
-            kernel_ver = os.uname().release
-            kernel_major = int(kernel_ver.split(".")[0])
-            if kernel_major < 6:
-                reply = QMessageBox.warning(
-                    self,
-                    self._tr("title_nvk_kernel"),
-                    self._tr("msg_nvk_kernel").format(kernel_ver),
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-        except Exception:
-            pass
+        kernel_major = _kernel_major()
+        if kernel_major is not None and kernel_major < 6:
+            reply = QMessageBox.warning(
+                self,
+                self._tr("title_nvk_kernel"),
+                self._tr("msg_nvk_kernel").format(_kernel_release()),
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.No:
+                return
         
         # Sprawdź wymagania
         self.log(self._tr("log_checking_requirements"), "INFO")
@@ -3733,27 +4298,8 @@ except Exception:
         
         self._offer_install_dnf5()
         self.log(self._tr("log_starting_nvk"), "INFO")
-        self.create_backup("nvk", "NVK")
-        self.start_log("nvk")
-        
-        # Wątek instalacji
-        thread = InstallationThread(self, "nvk", {"sudo_password": getattr(self, "_sudo_password", None)})
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_nvk_finished(code):
-            if code == 0:
-                self.append_install_history("nvk", "NVK", success=True)
-            self.log(self._tr("log_nvk_done"), "SUCCESS")
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_nvk_finished)
-        thread.start()
+        self._start_install("nvk", {}, log_name="nvk", backup=("nvk", "NVK"),
+                            history=("nvk", "NVK"), done_key="log_nvk_done")
     
     def install_repo(self):
         """Instaluje z repo (przedostatnia)"""
@@ -3778,31 +4324,11 @@ except Exception:
         pkg = f"nvidia-driver-{ver_series}-open"
         
         self.log(self._tr("log_starting_repo").format(ver), "INFO")
-        self.create_backup("repo", ver)
-        self.start_log("repo")
-        
-        thread = InstallationThread(self, "repo", {
+        self._start_install("repo", {
             "version": ver,
             "package": pkg,
             "latest": False,
-            "sudo_password": getattr(self, "_sudo_password", None),
-        })
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_repo_finished(code):
-            if code == 0:
-                self.append_install_history("repo", ver, success=True)
-            self.log(self._tr("log_install_done_restart"), "SUCCESS")
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_repo_finished)
-        thread.start()
+        }, log_name="repo", backup=("repo", ver), history=("repo", ver), done_key="log_install_done_restart")
     
     def install_repo_latest(self):
         """Instaluje z repo (najnowsza)"""
@@ -3827,31 +4353,11 @@ except Exception:
         pkg = f"nvidia-driver-{ver_series}-open"
         
         self.log(self._tr("log_starting_repo").format(ver), "INFO")
-        self.create_backup("repo", ver)
-        self.start_log("repo-latest")
-        
-        thread = InstallationThread(self, "repo", {
+        self._start_install("repo", {
             "version": ver,
             "package": pkg,
             "latest": True,
-            "sudo_password": getattr(self, "_sudo_password", None),
-        })
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_repo_latest_finished(code):
-            if code == 0:
-                self.append_install_history("repo", ver, success=True)
-            self.log(self._tr("log_install_done_restart"), "SUCCESS")
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_repo_latest_finished)
-        thread.start()
+        }, log_name="repo-latest", backup=("repo", ver), history=("repo", ver), done_key="log_install_done_restart")
     
     def install_nvidia_run(self, version_type: str):
         """Instaluje sterownik .run"""
@@ -3871,39 +4377,14 @@ except Exception:
             self.log(self._tr("log_deps_auto_install"), "INFO")
         
         version = self.versions.get(version_type, PRODUCTION_VERSION)
-        label = {
-            "production": "Production",
-            "new_feature": "New Feature",
-            "beta": "Beta",
-            "legacy": "Legacy"
-        }.get(version_type, "Production")
+        label = _VERSION_LABELS.get(version_type, "Production")
         
         self.log(self._tr("log_starting_run").format(label, version), "INFO")
-        self.create_backup("run", version)
-        self.start_log(f"run-v2-{version}")
-        
-        thread = InstallationThread(self, "run", {
+        self._start_install("run", {
             "version": version,
             "label": label,
             "version_type": version_type,
-            "sudo_password": getattr(self, "_sudo_password", None),
-        })
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_run_finished(code):
-            if code == 0:
-                self.append_install_history("run", version, success=True)
-            self.log(self._tr("log_prepare_done"), "SUCCESS")
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_run_finished)
-        thread.start()
+        }, log_name=f"run-v2-{version}", backup=("run", version), history=("run", version), done_key="log_prepare_done")
     
     def uninstall_nvidia_only(self):
         """Usuwa sterownik NVIDIA i przywraca nouveau (bez instalacji NVK)."""
@@ -3915,21 +4396,7 @@ except Exception:
         if not self.confirm_action(self._tr("msg_uninstall_confirm")):
             return
         self.log(self._tr("log_removing_nvidia"), "INFO")
-        self.start_log("uninstall-nvidia")
-        thread = InstallationThread(self, "uninstall", {"sudo_password": getattr(self, "_sudo_password", None)})
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_finished(code):
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_finished)
-        thread.start()
+        self._start_install("uninstall", {}, log_name="uninstall-nvidia")
     
     def upgrade_repo_driver(self):
         """Aktualizuje sterownik NVIDIA z repo (apt update + upgrade)."""
@@ -3945,58 +4412,145 @@ except Exception:
             return
         self._offer_install_dnf5()
         self.log(self._tr("log_updating_pkg").format(pkg), "INFO")
-        self.start_log("upgrade-repo")
-        thread = InstallationThread(self, "upgrade_repo", {"sudo_password": getattr(self, "_sudo_password", None)})
-        self._install_thread = thread
-        thread.output.connect(self.log)
-        thread.ask_restart.connect(lambda: self.ask_restart())
-        thread.progress.connect(self._on_install_progress)
-        if hasattr(self, "install_progress_bar"):
-            self.install_progress_bar.setValue(0)
-            self.install_progress_bar.setVisible(True)
-        def _on_finished(code):
-            self._install_thread = None
-            self._sudo_password = None
-            QTimer.singleShot(1500, self._hide_install_progress_bar)
-        thread.finished.connect(_on_finished)
-        thread.start()
+        self._start_install("upgrade_repo", {}, log_name="upgrade-repo")
+    
+    _SMI_CMD = [
+        "nvidia-smi",
+        "--query-gpu=index,temperature.gpu,utilization.gpu,memory.used,memory.total,power.draw",
+        "--format=csv,noheader,nounits",
+        "-lms", "2000",
+    ]
     
     def _update_gpu_monitor(self):
-        """Odświeża parametry GPU (temperatura, użycie, VRAM, pobór mocy) z nvidia-smi."""
+        """Odświeża parametry GPU (temperatura, użycie, VRAM, pobór mocy). Dane z procesu nvidia-smi -lms –
+        tu tylko ostatnia próbka i ponowne uruchomienie procesu, gdy się zakończył."""
         if DEMO_MODE:
-            self.gpu_temp_label.setText(self._tr("gpu_temp_fmt").format("42"))
-            self.gpu_usage_label.setText(self._tr("gpu_usage_fmt").format("5"))
-            self.gpu_vram_label.setText(self._tr("gpu_vram_fmt").format("1024", "8192"))
-            self.gpu_power_label.setText(self._tr("gpu_power_fmt").format("25.0"))
+            self._gpu_sample = ("42", "5", "1024", "8192", "25.0")
+            self._show_gpu_sample()
+            return
+        if not self._gpu_monitor_timer.isActive():
+            # Monitoring wstrzymany / okno ukryte – nie uruchamiamy procesu
+            self._set_gpu_monitor_na()
+            return
+        if self._nvml_ready():
+            self._gpu_sample = self._read_nvml_sample()
+            self._show_gpu_sample()
             return
+        if self._smi_proc is None or self._smi_proc.poll() is not None:
+            self._start_smi_proc()
+        self._show_gpu_sample()
+    
+    def _nvml_ready(self) -> bool:
+        """Inicjalizuje NVML raz (pynvml); False – brak modułu lub sterownika, używamy nvidia-smi."""
+        if not self._nvml_tried:
+            self._nvml_tried = True
+            if pynvml is not None:
+                try:
+                    pynvml.nvmlInit()
+                    self._nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+                except pynvml.NVMLError:
+                    self._nvml_handle = None
+        return self._nvml_handle is not None
+    
+    def _read_nvml_sample(self) -> Tuple[str, str, str, str, str]:
+        """Próbka GPU 0 z NVML w jednostkach jak nvidia-smi nounits (°C, %, MiB, W); brak wartości = „—”."""
+        h = self._nvml_handle
+        def read(fn):
+            try:
+                return fn()
+            except pynvml.NVMLError:
+                return None
+        temp = read(lambda: pynvml.nvmlDeviceGetTemperature(h, pynvml.NVML_TEMPERATURE_GPU))
+        util = read(lambda: pynvml.nvmlDeviceGetUtilizationRates(h).gpu)
+        mem = read(lambda: pynvml.nvmlDeviceGetMemoryInfo(h))
+        power = read(lambda: pynvml.nvmlDeviceGetPowerUsage(h))  # mW
+        return (
+            str(temp) if temp is not None else "—",
+            str(util) if util is not None else "—",
+            str(mem.used >> 20) if mem is not None else "—",
+            str(mem.total >> 20) if mem is not None else "—",
+            f"{power / 1000:.2f}" if power is not None else "—",
+        )
+    
+    def _start_smi_proc(self):
+        """Uruchamia nvidia-smi w trybie pętli; każda nowa linia budzi _on_smi_readable."""
+        self._stop_smi_proc()
         try:
-            result = self.system.run_command([
-                "nvidia-smi",
-                "--query-gpu=temperature.gpu,utilization.gpu,memory.used,memory.total,power.draw",
-                "--format=csv,noheader,nounits"
-            ], sudo=False, timeout=5)
-            if result[0] != 0 or not result[1].strip():
-                self._set_gpu_monitor_na()
-                return
-            line = result[1].strip().split("\n")[0]
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) < 5:
-                self._set_gpu_monitor_na()
-                return
-            temp = parts[0] if parts[0] not in ("N/A", "") else "—"
-            util = parts[1] if parts[1] not in ("N/A", "") else "—"
-            mem_used = parts[2] if len(parts) > 2 and parts[2] not in ("N/A", "") else "—"
-            mem_total = parts[3] if len(parts) > 3 and parts[3] not in ("N/A", "") else "—"
-            power = parts[4] if len(parts) > 4 and parts[4] not in ("N/A", "") else "—"
-            self.gpu_temp_label.setText(self._tr("gpu_temp_fmt").format(temp))
-            self.gpu_usage_label.setText(self._tr("gpu_usage_fmt").format(util))
-            self.gpu_vram_label.setText(self._tr("gpu_vram_fmt").format(mem_used, mem_total))
-            self.gpu_power_label.setText(self._tr("gpu_power_fmt").format(power))
-        except Exception:
+            self._smi_proc = subprocess.Popen(
+                self._SMI_CMD,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            self._smi_proc = None
+            self._gpu_sample = None
+            return
+        self._smi_notifier = QSocketNotifier(self._smi_proc.stdout.fileno(), QSocketNotifier.Type.Read, self)
+        self._smi_notifier.activated.connect(self._on_smi_readable)
+    
+    def _stop_smi_proc(self):
+        """Zatrzymuje proces nvidia-smi (pauza, ukrycie okna, zamknięcie)."""
+        if self._smi_notifier is not None:
+            self._smi_notifier.setEnabled(False)
+            self._smi_notifier.deleteLater()
+            self._smi_notifier = None
+        proc, self._smi_proc = self._smi_proc, None
+        self._smi_pending = b""
+        if proc is None:
+            return
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        proc.stdout.close()
+    
+    def _on_smi_readable(self, *_):
+        """Czyta dostępne dane z nvidia-smi (bez blokowania) i pokazuje ostatnią pełną próbkę GPU 0."""
+        proc = self._smi_proc
+        if proc is None:
+            return
+        try:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+        except OSError:
+            chunk = b""
+        if not chunk:
+            # Proces się zakończył (brak sterownika nvidia itp.) – timer spróbuje ponownie
+            self._stop_smi_proc()
+            self._gpu_sample = None
+            self._set_gpu_monitor_na()
+            return
+        *lines, self._smi_pending = (self._smi_pending + chunk).split(b"\n")
+        for line in lines:
+            parts = [p.strip() for p in line.decode("utf-8", "replace").split(",")]
+            if len(parts) < 6 or parts[0] != "0":
+                continue
+            self._gpu_sample = tuple(p if p not in ("N/A", "") else "—" for p in parts[1:6])
+        self._show_gpu_sample()
+    
+    def _show_gpu_sample(self):
+        """Ustawia etykiety GPU z ostatniej próbki (lub „brak danych”)."""
+        if self._gpu_sample is None:
             self._set_gpu_monitor_na()
+            return
+        # Te same wartości w tym samym języku – etykiety bez zmian, bez setText/repaint
+        shown = (self._gpu_sample, self._gpu_fmts)
+        if shown == self._last_gpu_values:
+            return
+        self._last_gpu_values = shown
+        temp, util, mem_used, mem_total, power = self._gpu_sample
+        fmt_temp, fmt_usage, fmt_vram, fmt_power = self._gpu_fmts
+        self.gpu_temp_label.setText(fmt_temp.format(temp))
+        self.gpu_usage_label.setText(fmt_usage.format(util))
+        self.gpu_vram_label.setText(fmt_vram.format(mem_used, mem_total))
+        self.gpu_power_label.setText(fmt_power.format(power))
 
     def _set_gpu_monitor_na(self):
         """Ustawia parametry GPU na „brak danych”."""
+        self._last_gpu_values = None
         self.gpu_temp_label.setText(self._tr("gpu_temp_na"))
         self.gpu_usage_label.setText(self._tr("gpu_usage_na"))
         self.gpu_vram_label.setText(self._tr("gpu_vram_na"))
@@ -4004,6 +4558,8 @@ except Exception:
 
     def open_log_dir(self):
         """Otwiera katalog z logami w menedżerze plików."""
+        if self._log_fh is not None:
+            self._log_fh.flush()  # plik bieżącego logu ma być kompletny
         path = LOG_DIR.resolve()
         if not path.exists():
             try:
@@ -4033,17 +4589,18 @@ except Exception:
         if self.system.distro_family == "fedora":
             rc, out = self.system.run_command(
                 [self.system.get_dnf_cmd(), "install", "-y"] + missing, sudo=True, timeout=300,
-                sudo_password=getattr(self, "_sudo_password", None))
+                sudo_password=self._sudo_password)
         else:
             rc, _ = self.system.run_command(
                 ["apt-get", "update", "-y"], sudo=True, timeout=120,
-                sudo_password=getattr(self, "_sudo_password", None))
+                sudo_password=self._sudo_password)
             if rc != 0:
                 self.log(self._tr("log_update_repo_failed"), "WARN")
             rc, out = self.system.run_command(
                 ["apt-get", "install", "-y"] + missing, sudo=True, timeout=300,
-                sudo_password=getattr(self, "_sudo_password", None))
+                sudo_password=self._sudo_password)
         if rc == 0:
+            self._req_cache.clear()
             self.log(self._tr("log_deps_install_ok"), "SUCCESS")
             QMessageBox.information(self, self._tr("title_deps"), self._tr("msg_deps_installed_ok"))
         else:
@@ -4089,22 +4646,22 @@ except Exception:
         layout.addWidget(close_btn)
         dlg.exec()
 
+    HISTORY_DIALOG_LIMIT = 500  # tyle najnowszych wpisów pokazuje dialog historii
+    
     def show_install_history(self):
         """Dialog z historią instalacji."""
-        history = self.load_install_history()
+        history = self.load_install_history(limit=self.HISTORY_DIALOG_LIMIT)
         dlg = QDialog(self)
         dlg.setWindowTitle(self._tr("install_history_title"))
         layout = QVBoxLayout(dlg)
         layout.addWidget(QLabel(self._tr("install_history_label")))
         list_w = QListWidget()
-        for h in reversed(history):
-            date_short = (h.get("date") or "")[:19].replace("T", " ")
-            typ = h.get("type", "?")
-            ver = h.get("version", "?")
-            ok = "OK" if h.get("success", True) else "błąd"
-            list_w.addItem(QListWidgetItem(f"{date_short}  |  {typ}  {ver}  |  {ok}"))
-        if not history:
-            list_w.addItem(QListWidgetItem("(brak wpisów)"))
+        # Jedno addItems zamiast addItem w pętli
+        list_w.addItems([
+            f"{(h.get('date') or '')[:19].replace('T', ' ')}  |  {h.get('type', '?')}  {h.get('version', '?')}  |  "
+            f"{'OK' if h.get('success', True) else 'błąd'}"
+            for h in history
+        ] or ["(brak wpisów)"])
         list_w.setMinimumHeight(250)
         layout.addWidget(list_w)
         close_btn = QPushButton("Zamknij")
@@ -4116,12 +4673,8 @@ except Exception:
         """Eksportuje ustawienia (okno, czcionka, motyw, splitter) do pliku JSON."""
         self.save_settings()
         data = {}
-        for key in ["window/width", "window/height", "window/x", "window/y",
-                    "font/family", "font/size", "theme/name",
-                    "splitter/left", "splitter/right"]:
-            val = self.settings.value(key)
-            if val is not None:
-                data[key] = val
+        for group in ("window", "font", "theme", "splitter"):
+            data.update(self.settings.child_items(group))
         path, _ = QFileDialog.getSaveFileName(
             self, self._tr("title_export"),
             str(SCRIPT_DIR / "nvidia-driver-manager-config.json"),
@@ -4129,7 +4682,7 @@ except Exception:
         if path:
             try:
                 with open(path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                    json.dump(data, f, separators=(",", ":"))  # plik do ponownego importu – zwarty zapis
                 self.log(self._tr("log_config_saved").format(path), "SUCCESS")
                 QMessageBox.information(self, self._tr("title_export"), self._tr("msg_export_ok"))
             except Exception as e:
@@ -4147,6 +4700,7 @@ except Exception:
                     data = json.load(f)
                 for key, val in data.items():
                     self.settings.setValue(key, val)
+                    self._pending_settings.pop(key, None)  # import wygrywa z niezapisaną zmianą z menu
                 self.load_settings()
                 self.log(self._tr("log_config_loaded").format(path), "SUCCESS")
                 QMessageBox.information(self, self._tr("title_import"), self._tr("msg_import_ok"))
@@ -4156,40 +4710,38 @@ except Exception:
 
     def _check_new_versions(self):
         """Sprawdza w tle: aktualizacja z repo lub nowsza wersja .run; wyświetla komunikat wyśrodkowany w pasku statusu."""
-        if DEMO_MODE or not self.settings.value("check_updates", True, type=bool):
+        if DEMO_MODE or not self._setting("check_updates", True, bool):
             return
         self._set_status_update_message("")
         try:
             # 1. Sterownik z repo – czy apt ma aktualizację?
             pkg = self.system.get_installed_nvidia_driver_package()
             if pkg:
-                rc, out = self.system.run_command(
-                    ["apt", "list", "--upgradable"],
-                    sudo=False,
-                    timeout=15
-                )
-                if rc == 0 and out and pkg in out:
+                upgradable = self._apt_pkg_upgradable(pkg)
+                if upgradable is None:
+                    # Brak python-apt – jak dotąd przez apt list
+                    rc, out = self.system.run_command(
+                        ["apt", "list", "--upgradable"],
+                        sudo=False,
+                        timeout=15
+                    )
+                    upgradable = rc == 0 and bool(out) and pkg in out
+                if upgradable:
                     self._set_status_update_message(
                         "Dostępna aktualizacja sterownika z repo. Użyj przycisku 15. Aktualizuj sterownik z repo."
                     )
                     return
             # 2. Nowsza wersja .run z serwera NVIDIA?
-            versions = self.system.fetch_versions()
+            # Wersje pobrane już przez SystemInfoThread – bez ponownego zapytania do serwera
+            versions = self.versions or self.system.fetch_versions()
             current = self.system.get_current_driver()
             if current in ("brak", "nouveau", ""):
                 return
-            def parse_ver(v):
-                try:
-                    parts = v.split(".")
-                    return tuple(int(x) for x in parts[:3])
-                except Exception:
-                    return (0, 0, 0)
-            cur_t = parse_ver(current)
+            cur_t = _parse_ver(current)
             for name, ver in versions.items():
                 if not ver:
                     continue
-                t = parse_ver(ver)
-                if t > cur_t:
+                if _parse_ver(ver) > cur_t:
                     self._set_status_update_message(
                         f"Dostępna nowa wersja sterownika .run: {ver} (np. {name}). Kliknij Odśwież."
                     )
@@ -4198,8 +4750,31 @@ except Exception:
             pass
         self._set_status_update_message("")
 
+    APT_CACHE_TTL = 300.0  # s – po tym czasie cache python-apt jest otwierany ponownie
+    
+    def _apt_pkg_upgradable(self, pkg: str) -> Optional[bool]:
+        """Czy pakiet ma aktualizację – przez cache python-apt (bez apt list). None, gdy python-apt niedostępny."""
+        if self._apt_cache is False or self.system.distro_family == "fedora":
+            return None
+        try:
+            now = time.monotonic()
+            if self._apt_cache is None:
+                import apt  # python3-apt – tylko Debian/Ubuntu, ładowany przy pierwszym użyciu
+                self._apt_cache = apt.Cache()
+                self._apt_cache_ts = now
+            elif now - self._apt_cache_ts >= self.APT_CACHE_TTL:
+                self._apt_cache.open(None)
+                self._apt_cache_ts = now
+            if pkg not in self._apt_cache:
+                return False
+            p = self._apt_cache[pkg]
+            return p.is_installed and p.is_upgradable
+        except Exception:
+            self._apt_cache = False  # brak modułu lub uszkodzony cache – zostaje apt list
+            return None
+
     def show_status(self):
-        """Pokazuje status systemu"""
+        """Pokazuje status systemu (inxi przez QProcess – GUI nie czeka)"""
         if DEMO_MODE:
             self.log(self._tr("log_status_system"), "INFO")
             self.log(self._tr("sys_gpu_fmt").format("NVIDIA GeForce RTX 3060"), "INFO")
@@ -4209,100 +4784,119 @@ except Exception:
         
         self.log(self._tr("log_checking_status"), "INFO")
         # -c 0 wyłącza kolory ANSI (w skompilowanym programie brak TTY → inxi i tak wysyła kody)
-        result = self.system.run_command(["inxi", "-G", "-c", "0"], sudo=False)
-        if result[0] == 0:
+        self._run_async(["inxi", "-G", "-c", "0"], self._on_inxi_done)
+    
+    def _on_inxi_done(self, code: int, out: str, after_install: bool = False):
+        """Wynik inxi; przy pierwszej porażce doinstalowuje inxi i próbuje ponownie."""
+        if code == 0:
             self.log(self._tr("log_status_system"), "INFO")
-            for line in result[1].split("\n"):
-                if line.strip():
-                    self.log(strip_ansi(line), "INFO")
+            self.log_lines([strip_ansi(line) for line in out.splitlines() if line.strip()], "INFO")
+            return
+        if after_install:
+            return
+        self.log(self._tr("log_inxi_installing"), "INFO")
+        if self.system.distro_family == "fedora":
+            install_cmd = ["sudo", self.system.get_dnf_cmd(), "install", "-y", "inxi"]
         else:
-            self.log(self._tr("log_inxi_installing"), "INFO")
-            if self.system.distro_family == "fedora":
-                install_cmd = ["sudo", self.system.get_dnf_cmd(), "install", "-y", "inxi"]
-            else:
-                install_cmd = ["sudo", "apt-get", "install", "-y", "inxi"]
-            result = self.system.run_command(install_cmd, sudo=False)
-            if result[0] == 0:
-                self.log(self._tr("log_inxi_installed"), "SUCCESS")
-                result = self.system.run_command(["inxi", "-G", "-c", "0"], sudo=False)
-                if result[0] == 0:
-                    self.log(self._tr("log_status_system"), "INFO")
-                    for line in result[1].split("\n"):
-                        if line.strip():
-                            self.log(strip_ansi(line), "INFO")
-            else:
-                self.log(self._tr("log_inxi_failed"), "ERROR")
+            install_cmd = ["sudo", "apt-get", "install", "-y", "inxi"]
+        self._run_async(install_cmd, self._on_inxi_installed)
+    
+    def _on_inxi_installed(self, code: int, _out: str):
+        if code != 0:
+            self.log(self._tr("log_inxi_failed"), "ERROR")
+            return
+        self.log(self._tr("log_inxi_installed"), "SUCCESS")
+        self._run_async(["inxi", "-G", "-c", "0"],
+                        lambda c, o: self._on_inxi_done(c, o, after_install=True))
+    
+    def _run_async(self, cmd: List[str], on_done):
+        """Uruchamia komendę przez QProcess bez blokowania GUI; on_done(kod, stdout) po zakończeniu (127 – nie wystartowała)."""
+        proc = QProcess(self)
+        self._async_procs.add(proc)
+        
+        def finish(code: int):
+            if proc not in self._async_procs:
+                return  # errorOccurred i finished mogą przyjść oba
+            self._async_procs.discard(proc)
+            out = bytes(proc.readAllStandardOutput()).decode("utf-8", "replace")
+            proc.deleteLater()
+            on_done(code, out)
+        
+        proc.finished.connect(lambda code, _status: finish(code))
+        proc.errorOccurred.connect(
+            lambda err: finish(127) if err == QProcess.ProcessError.FailedToStart else None)
+        proc.start(cmd[0], cmd[1:])
     
     def run_diagnostic(self):
-        """Uruchamia diagnostykę"""
+        """Uruchamia diagnostykę (zbieranie i zapis w puli wątków)"""
         if DEMO_MODE:
             self.log(self._tr("log_diag_linux_only"), "WARN")
             return
         
         self.log(self._tr("log_running_diag"), "INFO")
-        diag_file = LOG_DIR / f"diagnostic-manual-{datetime.now().strftime('%Y%m%d-%H%M%S')}.log"
-        
-        try:
-            with open(diag_file, "w", encoding="utf-8") as f:
-                f.write(f"=== DIAGNOSTYKA: manual ===\n")
-                f.write(f"Data: {datetime.now()}\n")
-                try:
-                    f.write(f"Kernel: {os.uname().release}\n\n")
-                except:
-                    f.write(f"Kernel: Unknown\n\n")
-                
-                # DKMS status
-                f.write("=== DKMS STATUS ===\n")
-                result = self.system.run_command(["dkms", "status"], sudo=False)
-                if result[0] == 0:
-                    nvidia_lines = [l for l in result[1].split("\n") if "nvidia" in l.lower()]
-                    if nvidia_lines:
-                        f.write("\n".join(nvidia_lines) + "\n")
-                    else:
-                        f.write("Brak modułów NVIDIA w DKMS\n")
-                f.write("\n")
-                
-                # Moduły w kernelu
-                f.write("=== MODUŁY W KERNELU ===\n")
-                try:
-                    kernel_ver = os.uname().release
-                except:
-                    kernel_ver = "Unknown"
-                modules_path = Path(f"/lib/modules/{kernel_ver}")
-                if modules_path.exists():
-                    nvidia_modules = list(modules_path.rglob("nvidia.ko*"))
-                    nvidia_modules = [str(m) for m in nvidia_modules if "i2c" not in str(m) and "forcedeth" not in str(m)]
-                    if nvidia_modules:
-                        f.write("\n".join(nvidia_modules) + "\n")
-                    else:
-                        f.write("Brak modułów NVIDIA w kernelu\n")
-                f.write("\n")
-                
-                # Załadowane moduły
-                f.write("=== ZAŁADOWANE MODUŁY ===\n")
-                result = self.system.run_command(["lsmod"], sudo=False)
-                if result[0] == 0:
-                    nvidia_lines = [l for l in result[1].split("\n") if "nvidia" in l.lower() or "nouveau" in l.lower()]
-                    if nvidia_lines:
-                        f.write("\n".join(nvidia_lines) + "\n")
-                    else:
-                        f.write("Brak załadowanych modułów\n")
-                f.write("\n")
-                
-                # Źródła w /usr/src
-                f.write("=== ŹRÓDŁA W /usr/src ===\n")
-                src_path = Path("/usr/src")
-                if src_path.exists():
-                    nvidia_src = [str(p) for p in src_path.iterdir() if "nvidia" in p.name.lower()]
-                    if nvidia_src:
-                        f.write("\n".join(nvidia_src) + "\n")
-                    else:
-                        f.write("Brak źródeł NVIDIA w /usr/src\n")
-                f.write("\n")
+        diag_file = LOG_DIR / f"diagnostic-manual-{time.strftime('%Y%m%d-%H%M%S')}.log"
+        QThreadPool.globalInstance().start(_DiagnosticRunnable(self, str(diag_file)))
+    
+    def _on_diagnostic_done(self, path: str, error: str):
+        """Wynik _DiagnosticRunnable (w wątku GUI)."""
+        if error:
+            self.log(self._tr("log_diag_error").format(error), "ERROR")
+        else:
+            self.log(self._tr("log_diag_saved").format(path), "SUCCESS")
+    
+    def _write_diagnostic(self, diag_file: str):
+        """Zbiera diagnostykę (DKMS, moduły, źródła) i zapisuje do pliku. Bez Qt – wołane z puli wątków."""
+        with open(diag_file, "w", encoding="utf-8") as f:
+            f.write(f"=== DIAGNOSTYKA: manual ===\n")
+            f.write(f"Data: {datetime.now()}\n")
+            f.write(f"Kernel: {_kernel_release()}\n\n")
             
-            self.log(self._tr("log_diag_saved").format(diag_file), "SUCCESS")
-        except Exception as e:
-            self.log(self._tr("log_diag_error").format(e), "ERROR")
+            # DKMS status
+            f.write("=== DKMS STATUS ===\n")
+            result = self.system.run_command(["dkms", "status"], sudo=False)
+            if result[0] == 0:
+                nvidia_lines = [l for l in result[1].split("\n") if "nvidia" in l.lower()]
+                if nvidia_lines:
+                    f.write("\n".join(nvidia_lines) + "\n")
+                else:
+                    f.write("Brak modułów NVIDIA w DKMS\n")
+            f.write("\n")
+            
+            # Moduły w kernelu
+            f.write("=== MODUŁY W KERNELU ===\n")
+            modules_path = f"/lib/modules/{_kernel_release()}"
+            if os.path.isdir(modules_path):
+                nvidia_modules = _find_nvidia_modules(modules_path)
+                if nvidia_modules:
+                    f.write("\n".join(nvidia_modules) + "\n")
+                else:
+                    f.write("Brak modułów NVIDIA w kernelu\n")
+            f.write("\n")
+            
+            # Załadowane moduły
+            f.write("=== ZAŁADOWANE MODUŁY ===\n")
+            # /proc/modules to źródło lsmod – czytamy bez uruchamiania procesu
+            try:
+                with open("/proc/modules", "r") as pm:
+                    nvidia_lines = [l for l in pm if "nvidia" in l or "nouveau" in l]
+                if nvidia_lines:
+                    f.writelines(nvidia_lines)
+                else:
+                    f.write("Brak załadowanych modułów\n")
+            except OSError:
+                pass
+            f.write("\n")
+            
+            # Źródła w /usr/src
+            f.write("=== ŹRÓDŁA W /usr/src ===\n")
+            src_path = Path("/usr/src")
+            if src_path.exists():
+                nvidia_src = [str(p) for p in src_path.iterdir() if "nvidia" in p.name.lower()]
+                if nvidia_src:
+                    f.write("\n".join(nvidia_src) + "\n")
+                else:
+                    f.write("Brak źródeł NVIDIA w /usr/src\n")
+            f.write("\n")
     
     def ask_restart(self):
         """Pyta użytkownika o restart"""
@@ -4317,7 +4911,7 @@ except Exception:
             self.system.run_command(
                 ["reboot"],
                 sudo=True,
-                sudo_password=getattr(self, "_sudo_password", None),
+                sudo_password=self._sudo_password,
             )
     
     def save_log(self):
@@ -4325,64 +4919,106 @@ except Exception:
         filename, _ = QFileDialog.getSaveFileName(
             self,
             self._tr("save_log_title"),
-            str(LOG_DIR / f"log-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"),
-            "Text Files (*.txt);;All Files (*)"
+            _SAVE_LOG_PREFIX + time.strftime("%Y%m%d-%H%M%S") + ".txt",
+            _SAVE_LOG_FILTER
         )
         if filename:
-            try:
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(self.log_text.toPlainText())
-                self.log(self._tr("log_logs_saved").format(filename), "SUCCESS")
-            except Exception as e:
-                self.log(self._tr("log_config_save_error").format(e), "ERROR")
+            self._flush_log_buffer()
+            # Dokument serializowany przez Qt do pamięci (bez kopii tekstu po stronie Pythona) – w wątku GUI,
+            # zapis na dysk przez QSaveFile w puli wątków
+            buf = QBuffer()
+            buf.open(QIODevice.OpenModeFlag.WriteOnly)
+            if not QTextDocumentWriter(buf, b"plaintext").write(self.log_text.document()):
+                self.log(self._tr("log_config_save_error").format(buf.errorString()), "ERROR")
+                return
+            QThreadPool.globalInstance().start(_SaveLogRunnable(self, filename, buf.data()))
+    
+    def _on_log_saved(self, path: str, error: str):
+        """Wynik _SaveLogRunnable (w wątku GUI)."""
+        if error:
+            self.log(self._tr("log_config_save_error").format(error), "ERROR")
+        else:
+            self.log(self._tr("log_logs_saved").format(path), "SUCCESS")
 
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
+# Style przycisków instalacji – jeden arkusz aplikacji, przyciski wybierają go właściwością "role"
+_BUTTON_QSS = """
+QPushButton[role="nvk"], QPushButton[role="repo"], QPushButton[role="run"] {
+    color: black; font-weight: bold; border-radius: 6px; border: 3px solid transparent; padding: 6px;
+}
+QPushButton[role="nvk"]:pressed, QPushButton[role="repo"]:pressed, QPushButton[role="run"]:pressed {
+    padding: 8px 4px 4px 8px;
+}
+QPushButton[role="nvk"] { background-color: #4CAF50; }
+QPushButton[role="nvk"]:hover { background-color: #81C784; border: 3px solid #1B5E20; }
+QPushButton[role="nvk"]:pressed { background-color: #2E7D32; border: 3px solid #1B5E20; }
+QPushButton[role="repo"] { background-color: #FFC107; }
+QPushButton[role="repo"]:hover { background-color: #FFE082; border: 3px solid #E65100; }
+QPushButton[role="repo"]:pressed { background-color: #FF8F00; border: 3px solid #E65100; }
+QPushButton[role="run"] { background-color: #2196F3; }
+QPushButton[role="run"]:hover { background-color: #64B5F6; border: 3px solid #0D47A1; }
+QPushButton[role="run"]:pressed { background-color: #1565C0; border: 3px solid #0D47A1; }
+"""
+
+
+# Role i kolory palety ciemnej (QColor tworzone raz przy imporcie)
+_R = QPalette.ColorRole
+_DARK_ROLES = (
+    (_R.Window, QColor(43, 43, 43)),
+    (_R.WindowText, QColor(255, 255, 255)),
+    (_R.Base, QColor(30, 30, 30)),
+    (_R.Text, QColor(255, 255, 255)),
+    (_R.Button, QColor(64, 64, 64)),
+    (_R.ButtonText, QColor(255, 255, 255)),
+    (_R.Light, QColor(80, 80, 80)),
+    (_R.Midlight, QColor(56, 56, 56)),
+    (_R.Dark, QColor(35, 35, 35)),
+    (_R.Mid, QColor(74, 74, 74)),
+    (_R.Shadow, QColor(26, 26, 26)),
+    (_R.Highlight, QColor(64, 64, 64)),
+    (_R.HighlightedText, QColor(255, 255, 255)),
+    (_R.PlaceholderText, QColor(160, 160, 160)),
+)
+del _R
+
+
+@functools.lru_cache(maxsize=1)
 def _dark_palette():
-    """Paleta ciemna – ten sam układ co Fusion jasny, tylko kolory ciemne."""
+    """Paleta ciemna – ten sam układ co Fusion jasny, tylko kolory ciemne (budowana raz)."""
     p = QPalette()
-    p.setColor(QPalette.ColorRole.Window, QColor(43, 43, 43))
-    p.setColor(QPalette.ColorRole.WindowText, QColor(255, 255, 255))
-    p.setColor(QPalette.ColorRole.Base, QColor(30, 30, 30))
-    p.setColor(QPalette.ColorRole.Text, QColor(255, 255, 255))
-    p.setColor(QPalette.ColorRole.Button, QColor(64, 64, 64))
-    p.setColor(QPalette.ColorRole.ButtonText, QColor(255, 255, 255))
-    p.setColor(QPalette.ColorRole.Light, QColor(80, 80, 80))
-    p.setColor(QPalette.ColorRole.Midlight, QColor(56, 56, 56))
-    p.setColor(QPalette.ColorRole.Dark, QColor(35, 35, 35))
-    p.setColor(QPalette.ColorRole.Mid, QColor(74, 74, 74))
-    p.setColor(QPalette.ColorRole.Shadow, QColor(26, 26, 26))
-    p.setColor(QPalette.ColorRole.Highlight, QColor(64, 64, 64))
-    p.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255))
-    p.setColor(QPalette.ColorRole.PlaceholderText, QColor(160, 160, 160))
+    for role, color in _DARK_ROLES:
+        p.setColor(role, color)
     return p
 
 
 def main():
     os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.services=false")
+    # Styl i zaokrąglanie skali HiDPI przed konstruktorem – bez ponownego stylowania/układania po starcie
+    QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+    QApplication.setStyle("Fusion")
     app = QApplication(sys.argv)
-    app.setStyle("Fusion")
+    app.setStyleSheet(_BUTTON_QSS)
     
     # Ikona okna i paska zadań (zamiast domyślnej „karteczki”)
-    icon_path = _get_app_icon_path()
-    app_icon = None
-    if icon_path:
-        app_icon = QIcon(str(icon_path))
-        if app_icon.isNull():
-            app_icon = None
-    if app_icon:
+    icon_path = _get_app_icon_path()  # tylko istniejący plik – bez wczytywania QIcon na próbę
+    app_icon = QIcon(str(icon_path)) if icon_path is not None else None
+    if app_icon is not None:
         app.setWindowIcon(app_icon)
     
     # Nie sprawdzamy sudo przy starcie - będzie sprawdzane przed każdą instalacją
     # Windows - bez sprawdzania sudo
     
     window = DriverManagerWindow()
-    if app_icon:
+    if app_icon is not None:
         window.setWindowIcon(app_icon)
     window.show()
+    QTimer.singleShot(0, window._deferred_init)
+    # Qt trzyma własne kopie ikony (setWindowIcon); `window` zostaje – to jedyna referencja do okna
+    del app_icon, icon_path
     
     sys.exit(app.exec())
 